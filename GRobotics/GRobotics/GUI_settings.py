@@ -1,6 +1,8 @@
 from PyQt5.QtGui import QPalette, QColor, QFont
 from PyQt5.QtCore import Qt
 
+import tracing
+
 # Existing dark theme function
 def set_dark_theme(widget):
     dark_palette = QPalette()
@@ -144,7 +146,7 @@ def set_common_stylesheet(theme='dark'):
     if theme == 'dark':
         return """
             QWidget { background-color: #2b2b2b; color: #ffffff; }
-            QLineEdit, QTextEdit { background-color: #3b3b3b; border: 1px solid #555555; }
+            QLineEdit, QTextEdit, QPlainTextEdit { background-color: #3b3b3b; border: 1px solid #555555; }
             QPushButton { background-color: #1565c0; padding: 5px; }
             QPushButton:hover { background-color: #1976d2; }
             QComboBox { background-color: #3b3b3b; border: 1px solid #555555; padding: 5px; }
@@ -154,7 +156,7 @@ def set_common_stylesheet(theme='dark'):
     else:
         return """
             QWidget { background-color: #f0f0f0; color: #000000; }
-            QLineEdit, QTextEdit { background-color: #ffffff; border: 1px solid #cccccc; }
+            QLineEdit, QTextEdit, QPlainTextEdit { background-color: #ffffff; border: 1px solid #cccccc; }
             QPushButton { background-color: #2196f3; padding: 5px; }
             QPushButton:hover { background-color: #42a5f5; }
             QComboBox { background-color: #ffffff; border: 1px solid #cccccc; padding: 5px; }
@@ -165,7 +167,7 @@ def set_common_stylesheet(theme='dark'):
 def set_output_text_style(widget, theme='dark'):
     if theme == 'dark':
         widget.setStyleSheet("""
-            QTextEdit, QListWidget {
+            QTextEdit, QListWidget, QListView {
                 background-color: #3b3b3b;
                 border: 1px solid #555555;
                 color: white;
@@ -174,7 +176,7 @@ def set_output_text_style(widget, theme='dark'):
         """)
     else:
         widget.setStyleSheet("""
-            QTextEdit, QListWidget {
+            QTextEdit, QListWidget, QListView {
                 background-color: #ffffff;
                 border: 1px solid #cccccc;
                 color: black;
@@ -182,4 +184,4 @@ def set_output_text_style(widget, theme='dark'):
             }
         """)
 
-print("GUI_settings module loaded")  # Debug print
+tracing.event('gui_settings.loaded')
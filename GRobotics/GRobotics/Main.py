@@ -1,13 +1,14 @@
 import sys
-import logging
 import os
+import multiprocessing
 import webbrowser
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QPushButton, QLabel, QMessageBox, QMenuBar, QMenu, QAction,
                              QStatusBar, QHBoxLayout, QVBoxLayout, QGridLayout, QLineEdit,
                              QToolBar, QSizePolicy, QFrame, QTabWidget, QCheckBox, QTabBar,
-                             QStylePainter, QStyleOptionTab, QStyle, QMdiArea, QMdiSubWindow)
-from PyQt5.QtCore import Qt, QTimer, QDateTime, QRect, QPoint, QSize, pyqtSignal, QEvent, QMimeData
+                             QStylePainter, QStyleOptionTab, QStyle, QMdiArea, QMdiSubWindow, QFileDialog,
+                             QInputDialog)
+from PyQt5.QtCore import Qt, QTimer, QDateTime, QRect, QPoint, QSize, pyqtSignal, QMimeData
 from PyQt5.QtGui import QKeySequence, QIcon, QPixmap, QColor, QMouseEvent, QPalette, QBrush, QDrag
 
 from GUI_settings import (set_dark_theme, set_light_theme, set_button_style, set_title_font,
@@ -16,6 +17,13 @@ from GUI_settings import (set_dark_theme, set_light_theme, set_button_style, set
 from Target_converter import TargetConverterApp
 from ip_configurator import IPConfiguratorApp
 from Robot_Mov_Parser import RobotMovementParser
+from job_panel import JobPanel, is_job_source
+from perf_monitor import MONITOR
+from perf_panel import PerfPanel
+import tracing
+import profiling
+from tool_lifecycle import ToolManager
+from app_logging import LOG_BUFFER, setup_logging, get_logger
 
 # Add the parent directory of GRobotics to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -23,6 +31,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Now you can import from GRobotics
 from GRobotics.orientation_converter import OrientationConverter
 
+logger = get_logger('main')
+
 # At the top of your file, after imports
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CLOSE_ICON_PATH = os.path.join(SCRIPT_DIR, "close.png")
@@ -111,6 +121,8 @@ class DetachableTabBar(QTabBar):
         super().mouseReleaseEvent(event)
 
 class DetachableTabWidget(QTabWidget):
+    tabClosed = pyqtSignal(str)  # Name of a tab the user closed
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.tabBar = DetachableTabBar(self)
@@ -120,7 +132,7 @@ class DetachableTabWidget(QTabWidget):
         self.tabCloseRequested.connect(self.closeTab)
         self.detachedTabs = {}
         self.hiddenTabs = {}
-        print("DetachableTabWidget initialized")
+        tracing.event('tabs.init')
 
     def closeTab(self, index):
         if index != 0 and self.count() > 1:
@@ -128,14 +140,17 @@ class DetachableTabWidget(QTabWidget):
             if widget in self.detachedTabs:
                 self.detachedTabs[widget].close()
                 del self.detachedTabs[widget]
+            name = self.tabText(index)
             self.removeTab(index)
-            print(f"Tab at index {index} closed")
+            tracing.event('tabs.close', index=index)
+            self.tabClosed.emit(name)
 
     def tabInserted(self, index):
         if index == 0:
             self.tabBar.setTabButton(0, QTabBar.RightSide, None)
-            print("Home tab inserted, close button removed")
+            tracing.event('tabs.home_inserted')
 
+    @tracing.traced('tabs.detach')
     def detachTab(self, index, point):
         if index == 0:  # Prevent detaching home tab
             return
@@ -146,60 +161,87 @@ class DetachableTabWidget(QTabWidget):
         # Get the content widget
         content_widget = self.widget(index)
         
-        # Create a new instance of the content widget
-        new_content_widget = content_widget.__class__()
+        # Remember where the tab was and take it out of the tab widget
+        self.hiddenTabs[content_widget] = {'index': index, 'name': name, 'icon': icon}
+        self.removeTab(index)
         
-        # Create a new DetachedTab
-        detached_tab = DetachedTab(new_content_widget, name, self, content_widget)
+        # Move the live widget into its own window, so its state and loaded data come along
+        detached_tab = DetachedTab(content_widget, name, self)
         detached_tab.setWindowIcon(icon)
         detached_tab.move(point)
         detached_tab.show()
-        
-        # Store reference and hide the tab
         self.detachedTabs[content_widget] = detached_tab
-        self.hiddenTabs[content_widget] = {'index': index, 'name': name, 'icon': icon}
-        self.removeTab(index)
         
-        print(f"Tab '{name}' detached")
-
-    def attachTab(self, original_widget, name):
-        if original_widget in self.detachedTabs:
-            detached_tab = self.detachedTabs[original_widget]
-            del self.detachedTabs[original_widget]
-            detached_tab.close()
-
-        if original_widget in self.hiddenTabs:
-            hidden_info = self.hiddenTabs[original_widget]
-            index = self.insertTab(hidden_info['index'], original_widget, hidden_info['icon'], hidden_info['name'])
-            del self.hiddenTabs[original_widget]
+        tracing.event('tabs.detached', name=name)
+
+    @tracing.traced('tabs.attach')
+    def attachTab(self, content_widget, name):
+        detached_tab = self.detachedTabs.pop(content_widget, None)
+        if detached_tab is not None and detached_tab.content_widget is not None:
+            detached_tab.release()
+
+        hidden_info = self.hiddenTabs.pop(content_widget, None)
+        if hidden_info is not None:
+            index = self.insertTab(min(hidden_info['index'], self.count()), content_widget,
+                                   hidden_info['icon'], hidden_info['name'])
         else:
-            index = self.addTab(original_widget, name)
+            index = self.addTab(content_widget, name)
         
         self.setCurrentIndex(index)
-        print(f"Tab '{name}' reattached")
+        tracing.event('tabs.reattached', name=name)
+
+    def attachAll(self):
+        for content_widget, detached_tab in list(self.detachedTabs.items()):
+            self.attachTab(content_widget, detached_tab.windowTitle())
+
+    def showTab(self, name):
+        """Brings the tab or detached window called name to the front; returns its widget, or None."""
+        for i in range(self.count()):
+            if self.tabText(i) == name:
+                self.setCurrentIndex(i)
+                return self.widget(i)
+        for content_widget, detached_tab in self.detachedTabs.items():
+            if detached_tab.windowTitle() == name:
+                detached_tab.showNormal()
+                detached_tab.raise_()
+                detached_tab.activateWindow()
+                return content_widget
+        return None
 
 class DetachedTab(QMainWindow):
-    def __init__(self, content_widget, name, parent_tabwidget, original_widget):
+    """Window holding a tool widget taken out of its tab; closing it puts the widget back."""
+
+    def __init__(self, content_widget, name, parent_tabwidget):
         super().__init__(None)
+        self.setAttribute(Qt.WA_DeleteOnClose)
         self.setWindowTitle(name)
         self.content_widget = content_widget
         self.parent_tabwidget = parent_tabwidget
-        self.original_widget = original_widget
         self.setCentralWidget(content_widget)
+        content_widget.show()  # The tab widget hid it when the tab was removed
         self.resize(800, 600)
-        self.installEventFilter(self)
-        print(f"DetachedTab '{name}' created")
+        tracing.event('tabs.detached_window_created', name=name)
+
+    def release(self):
+        """Hands the content widget back without destroying it and closes the window."""
+        content_widget, self.content_widget = self.content_widget, None
+        self.takeCentralWidget()
+        self.close()
+        return content_widget
 
-    def eventFilter(self, obj, event):
-        if event.type() == QEvent.Close:
-            print(f"DetachedTab '{self.windowTitle()}' closing, reattaching")
-            self.parent_tabwidget.attachTab(self.original_widget, self.windowTitle())
-            return True
-        return super().eventFilter(obj, event)
+    def closeEvent(self, event):
+        if self.content_widget is not None:
+            tracing.event('tabs.detached_window_closing', name=self.windowTitle())
+            content_widget = self.release()
+            self.parent_tabwidget.attachTab(content_widget, self.windowTitle())
+        super().closeEvent(event)
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        # Before any tool is built, so every record goes through the background writer
+        setup_logging()
+        self.log_version = LOG_BUFFER.version
         self.setWindowTitle("GEngineering Robotics App")
         self.setGeometry(100, 100, 800, 600)
         
@@ -210,6 +252,9 @@ class MainWindow(QMainWindow):
         self.ip_configurator = None
         self.robot_movement_parser = None
 
+        # Module files and folders dropped anywhere on the window become batch jobs
+        self.setAcceptDrops(True)
+
         self.create_menu_bar()
         self.create_search_bar()
         self.create_central_widget()
@@ -221,9 +266,16 @@ class MainWindow(QMainWindow):
 
         self.statusBar().showMessage("Ready")
 
-        logging.basicConfig(filename='app.log', level=logging.INFO)
-
-        self.tool_instances = {}
+        # Tools are created on first use; closed ones are released when over the memory budget
+        self.tool_instances = ToolManager({
+            "Target Converter": TargetConverterApp,
+            "Orientation Converter": OrientationConverter,
+            "IP Configurator": IPConfiguratorApp,
+            "Robot Movement Parser": RobotMovementParser,
+            "Performance Monitor": PerfPanel,
+            "Job Queue": JobPanel,
+        })
+        self.central_widget.tabClosed.connect(self.tool_instances.closed)
 
     def create_menu_bar(self):
         menubar = self.menuBar()
@@ -254,6 +306,14 @@ class MainWindow(QMainWindow):
         robot_movement_parser_action = QAction('Robot Movement Parser', self)
         robot_movement_parser_action.triggered.connect(self.open_robot_movement_parser)
         tools_menu.addAction(robot_movement_parser_action)
+
+        job_queue_action = QAction('Job Queue', self)
+        job_queue_action.triggered.connect(self.open_job_queue)
+        tools_menu.addAction(job_queue_action)
+
+        performance_monitor_action = QAction('Performance Monitor', self)
+        performance_monitor_action.triggered.connect(self.open_performance_monitor)
+        tools_menu.addAction(performance_monitor_action)
         
         # Settings menu
         settings_menu = menubar.addMenu('Settings')
@@ -272,6 +332,30 @@ class MainWindow(QMainWindow):
         light_theme_action.triggered.connect(lambda: self.set_theme('light'))
         appearance_menu.addAction(light_theme_action)
 
+        self.performance_hud_action = QAction('Performance HUD', self)
+        self.performance_hud_action.setCheckable(True)
+        self.performance_hud_action.toggled.connect(self.toggle_performance_hud)
+        settings_menu.addAction(self.performance_hud_action)
+
+        self.record_trace_action = QAction('Record Trace', self)
+        self.record_trace_action.setCheckable(True)
+        self.record_trace_action.setChecked(tracing.enabled())
+        self.record_trace_action.setStatusTip('Record a timeline of spans and counters, saved as Chrome trace JSON')
+        self.record_trace_action.toggled.connect(self.toggle_trace_recording)
+        settings_menu.addAction(self.record_trace_action)
+
+        self.profile_actions_action = QAction('Profile Actions', self)
+        self.profile_actions_action.setCheckable(True)
+        self.profile_actions_action.setChecked(profiling.active())
+        self.profile_actions_action.setStatusTip('Save a cProfile and allocation report of every tool action to a folder')
+        self.profile_actions_action.toggled.connect(self.toggle_profiling)
+        settings_menu.addAction(self.profile_actions_action)
+
+        tool_budget_action = QAction('Tool Memory Budget...', self)
+        tool_budget_action.setStatusTip('Memory the tools may hold before closed ones are released to snapshots')
+        tool_budget_action.triggered.connect(self.set_tool_memory_budget)
+        settings_menu.addAction(tool_budget_action)
+
         # Help menu
         help_menu = menubar.addMenu('Help')
         
@@ -302,7 +386,7 @@ class MainWindow(QMainWindow):
     def create_central_widget(self):
         self.central_widget = DetachableTabWidget(self)
         self.setCentralWidget(self.central_widget)
-        print("Central widget (DetachableTabWidget) created")
+        tracing.event('main.central_widget_created')
 
     def create_home_tab(self):
         home_tab = QWidget()
@@ -337,7 +421,7 @@ class MainWindow(QMainWindow):
         layout.addStretch(1)  # Add stretch to push widgets to the top
 
         self.central_widget.addTab(home_tab, "Home")
-        print("Home tab added")
+        tracing.event('main.home_tab_added')
 
         # Connect resize event to update background size
         home_tab.resizeEvent = lambda event: background_label.setGeometry(0, 0, event.size().width(), event.size().height())
@@ -352,6 +436,12 @@ class MainWindow(QMainWindow):
 
         footer_layout.addStretch()
 
+        # Event-loop lag readout, shown with Settings > Performance HUD
+        self.perf_label = QLabel()
+        self.perf_label.setAlignment(Qt.AlignRight | Qt.AlignBottom)
+        self.perf_label.hide()
+        footer_layout.addWidget(self.perf_label)
+
         self.clock_label = QLabel()
         self.clock_label.setAlignment(Qt.AlignRight | Qt.AlignBottom)
         footer_layout.addWidget(self.clock_label)
@@ -363,12 +453,79 @@ class MainWindow(QMainWindow):
 
     def start_clock(self):
         timer = QTimer(self)
+        # A precise timer so its lateness measures event-loop lag rather than timer coalescing
+        timer.setTimerType(Qt.PreciseTimer)
         timer.timeout.connect(self.update_clock)
         timer.start(1000)
+        self.clock_timer = timer
 
     def update_clock(self):
+        if hasattr(self, 'clock_timer'):
+            MONITOR.tick(self.clock_timer.interval() / 1000)
         current_time = QDateTime.currentDateTime().toString('dddd, MMMM d, yyyy hh:mm:ss A')
         self.clock_label.setText(current_time)
+        if self.perf_label.isVisible():
+            self.update_performance_hud()
+        self.update_log_label()
+
+    def update_log_label(self):
+        """Shows the newest log record in the footer; the records come from the in-memory ring buffer."""
+        if LOG_BUFFER.version == self.log_version:
+            return
+        self.log_version = LOG_BUFFER.version
+        record = LOG_BUFFER.latest()
+        if record is not None:
+            self.log_label.setText(f"Log: {record.levelname.capitalize()}: {record.getMessage()[:120]}")
+            self.log_label.setToolTip("\n".join(f"{r.levelname} {r.name}: {r.getMessage()}"
+                                                for r in LOG_BUFFER.recent(20)))
+
+    def update_performance_hud(self):
+        last, worst, _ = MONITOR.summary()
+        self.perf_label.setText(f"Lag {last * 1000:.0f} ms (worst {worst * 1000:.0f}) | "
+                                f"{MONITOR.stalls} stalls | {MONITOR.slow_actions} slow | "
+                                f"{MONITOR.memory() / 1e6:,.0f} MB")
+
+    def toggle_trace_recording(self, recording):
+        if recording:
+            tracing.clear()
+            tracing.enable()
+            logger.info("Recording trace")
+            return
+        tracing.disable()
+        save_path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "trace.json", "Chrome Trace (*.json)")
+        if save_path:
+            try:
+                count = tracing.dump(save_path)
+                logger.info(f"Saved {count} trace events to {save_path}")
+            except OSError as e:
+                self.show_error_message(f"Could not save the trace: {e}")
+
+    def toggle_profiling(self, profiling_on):
+        if not profiling_on:
+            profiling.disable()
+            return
+        folder = QFileDialog.getExistingDirectory(self, "Select Profile Folder")
+        if not folder:
+            self.profile_actions_action.setChecked(False)
+            return
+        try:
+            profiling.enable(folder)
+        except OSError as e:
+            self.profile_actions_action.setChecked(False)
+            self.show_error_message(f"Could not use the profile folder: {e}")
+
+    def set_tool_memory_budget(self):
+        budget_mb, ok = QInputDialog.getInt(self, "Tool Memory Budget",
+                                            "Release closed tools to snapshots above (MB):",
+                                            self.tool_instances.budget // (1024 * 1024), 1, 1024 * 1024)
+        if ok:
+            self.tool_instances.set_budget(budget_mb * 1024 * 1024)
+            logger.info(f"Tool memory budget set to {budget_mb} MB")
+
+    def toggle_performance_hud(self, visible):
+        self.perf_label.setVisible(visible)
+        if visible:
+            self.update_performance_hud()
 
     def open_instructions(self):
         instructions_path = os.path.join(os.path.dirname(__file__), 'instructions.pdf')
@@ -377,7 +534,7 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("Instructions opened", 3000)
         else:
             self.show_error_message("Instructions file not found.")
-            logging.error("Instructions file not found.")
+            logger.error("Instructions file not found.")
 
     def open_recent_file(self, file):
         self.statusBar().showMessage(f"Opening recent file: {file}", 3000)
@@ -483,63 +640,93 @@ class MainWindow(QMainWindow):
             self.robot_movement_parser.set_theme(self.current_theme)
     
     def open_target_converter(self):
-        for i in range(self.central_widget.count()):
-            if self.central_widget.tabText(i) == "Target Converter":
-                self.central_widget.setCurrentIndex(i)
-                return
+        if self.central_widget.showTab("Target Converter") is not None:
+            return
 
-        if "Target Converter" not in self.tool_instances:
-            self.tool_instances["Target Converter"] = TargetConverterApp()
-        
-        target_converter = self.tool_instances["Target Converter"]
+        target_converter = self.tool_instances.get("Target Converter")
         self.central_widget.addTab(target_converter, "Target Converter")
         self.central_widget.setCurrentIndex(self.central_widget.count() - 1)
+        self.tool_instances.opened("Target Converter")
 
     def open_orientation_converter(self):
-        for i in range(self.central_widget.count()):
-            if self.central_widget.tabText(i) == "Orientation Converter":
-                self.central_widget.setCurrentIndex(i)
-                return
+        if self.central_widget.showTab("Orientation Converter") is not None:
+            return
 
-        if "Orientation Converter" not in self.tool_instances:
-            self.tool_instances["Orientation Converter"] = OrientationConverter()
-        
-        orientation_converter = self.tool_instances["Orientation Converter"]
+        orientation_converter = self.tool_instances.get("Orientation Converter")
         self.central_widget.addTab(orientation_converter, "Orientation Converter")
         self.central_widget.setCurrentIndex(self.central_widget.count() - 1)
+        self.tool_instances.opened("Orientation Converter")
 
     def open_ip_configurator(self):
-        for i in range(self.central_widget.count()):
-            if self.central_widget.tabText(i) == "IP Configurator":
-                self.central_widget.setCurrentIndex(i)
-                return
+        if self.central_widget.showTab("IP Configurator") is not None:
+            return
 
-        if "IP Configurator" not in self.tool_instances:
-            self.tool_instances["IP Configurator"] = IPConfiguratorApp()
-        
-        ip_configurator = self.tool_instances["IP Configurator"]
+        ip_configurator = self.tool_instances.get("IP Configurator")
         ip_configurator.set_theme(self.current_theme)
         self.central_widget.addTab(ip_configurator, "IP Configurator")
         self.central_widget.setCurrentIndex(self.central_widget.count() - 1)
+        self.tool_instances.opened("IP Configurator")
 
     def open_robot_movement_parser(self):
-        for i in range(self.central_widget.count()):
-            if self.central_widget.tabText(i) == "Robot Movement Parser":
-                self.central_widget.setCurrentIndex(i)
-                return
+        if self.central_widget.showTab("Robot Movement Parser") is not None:
+            return
 
-        if "Robot Movement Parser" not in self.tool_instances:
-            self.tool_instances["Robot Movement Parser"] = RobotMovementParser()
-        
-        robot_movement_parser = self.tool_instances["Robot Movement Parser"]
+        robot_movement_parser = self.tool_instances.get("Robot Movement Parser")
         robot_movement_parser.set_theme(self.current_theme)
         self.central_widget.addTab(robot_movement_parser, "Robot Movement Parser")
         self.central_widget.setCurrentIndex(self.central_widget.count() - 1)
+        self.tool_instances.opened("Robot Movement Parser")
+
+    def open_performance_monitor(self):
+        if self.central_widget.showTab("Performance Monitor") is not None:
+            return
+
+        perf_panel = self.tool_instances.get("Performance Monitor")
+        perf_panel.set_theme(self.current_theme)
+        self.central_widget.addTab(perf_panel, "Performance Monitor")
+        self.central_widget.setCurrentIndex(self.central_widget.count() - 1)
+        self.tool_instances.opened("Performance Monitor")
+
+    def open_job_queue(self):
+        shown = self.central_widget.showTab("Job Queue")
+        if shown is not None:
+            return shown
+
+        job_panel = self.tool_instances.get("Job Queue")
+        job_panel.set_theme(self.current_theme)
+        self.central_widget.addTab(job_panel, "Job Queue")
+        self.central_widget.setCurrentIndex(self.central_widget.count() - 1)
+        self.tool_instances.opened("Job Queue")
+        return job_panel
+
+    def dropped_paths(self, event):
+        urls = event.mimeData().urls() if event.mimeData().hasUrls() else []
+        return [url.toLocalFile() for url in urls if url.isLocalFile() and is_job_source(url.toLocalFile())]
+
+    def dragEnterEvent(self, event):
+        if self.dropped_paths(event):
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+
+    def dragMoveEvent(self, event):
+        self.dragEnterEvent(event)
+
+    def dropEvent(self, event):
+        paths = self.dropped_paths(event)
+        if not paths:
+            event.ignore()
+            return
+        event.acceptProposedAction()
+        jobs = self.open_job_queue().enqueue_paths(paths)
+        logger.info(f"Queued {len(jobs)} jobs from {len(paths)} dropped items")
 
     def show_about_dialog(self):
         QMessageBox.about(self, "About", "GEngineering Robotics App\nVersion 1.0\n© 2023 GEngineering")
 
     def closeEvent(self, event):
+        # Detached tool windows would otherwise outlive the main window
+        self.central_widget.attachAll()
         if self.target_converter:
             self.target_converter.close()
         if self.orientation_converter:
@@ -548,6 +735,9 @@ class MainWindow(QMainWindow):
             self.ip_configurator.close()
         if self.robot_movement_parser:
             self.robot_movement_parser.close()  # Add this line
+        if "Job Queue" in self.tool_instances:
+            self.tool_instances.peek("Job Queue").shutdown()
+        self.tool_instances.discard_snapshots()
         event.accept()
 
     def show_error_message(self, message):
@@ -556,7 +746,7 @@ class MainWindow(QMainWindow):
         error_dialog.setWindowTitle("Error")
         error_dialog.setText(message)
         error_dialog.exec_()
-        logging.error(message)
+        logger.error(message)
 
     def filter_menu_items(self, text):
         for menu in self.menuBar().findChildren(QMenu):
@@ -601,6 +791,8 @@ class MainWindow(QMainWindow):
                     widget.set_theme(self.current_theme)
 
 if __name__ == '__main__':
+    # Worker processes of the frozen exe re-run it; this hands them to multiprocessing instead of the GUI
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     main_window = MainWindow()
     main_window.show()
@@ -1,23 +1,46 @@
 import sys
 import os
-import re
 import shutil
+import time
+import numpy as np
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTextEdit, 
                              QFileDialog, QMessageBox, QRadioButton, QButtonGroup, QLabel, QLineEdit, QListWidget)
 from PyQt5.QtCore import Qt
 
 from GUI_settings import (set_dark_theme, set_light_theme, set_button_style, set_title_font,
                           set_common_stylesheet, set_input_field_style, set_output_text_style)
+from robtarget_batch import ROW_OVERHEAD, RobtargetTable, parse_robtarget_literal, parse_literal_block
+from target_library import TargetLibrary
+from rapid_moves import parse_move_instructions
+from cycle_time import estimate_routines, estimate_backup
+from rapid_expressions import resolve_file
+from rapid_references import ReferenceIndex
+from backup_diff import diff_backups
+from path_decimation import DEFAULT_POSITION_TOLERANCE, DEFAULT_ANGLE_TOLERANCE, decimate_module
+from rapid_symbols import SymbolTable, declared_names
+from target_naming import TargetNamer
+from chunked_scan import MOVE_PATTERN, COORD_PATTERN, load_move_literals
+from simpl import SimplifiedRobotParser
+from search_index import BackgroundIndexer
+from file_watcher import FileWatcher
+from perf_monitor import measured
+
 
 class RobotMovementParser(QMainWindow):
     def __init__(self):
         super().__init__()
         self.current_theme = 'dark'  # Initialize the current_theme attribute
         self.initUI()
-        self.variable_counter = 10
         self.generated_variables = []
         self.coordinate_to_variable = {}
         self.file_path = None
+        self.symbols = SymbolTable()
+        self.move_table = None
+        self.reference_index = ReferenceIndex()
+        self.search_indexer = BackgroundIndexer()
+        # Re-parse the selected file when another program rewrites it
+        self.file_watcher = FileWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
 
     def initUI(self):
         self.setWindowTitle('Robot Movement Parser')
@@ -47,6 +70,11 @@ class RobotMovementParser(QMainWindow):
         self.select_file_button.clicked.connect(self.select_file)
         main_layout.addWidget(self.select_file_button)
 
+        # Highlighted source with an outline, paged so large modules open instantly
+        self.view_source_button = QPushButton('View Source', self)
+        self.view_source_button.clicked.connect(self.view_source)
+        main_layout.addWidget(self.view_source_button)
+
         # Format selection
         format_layout = QHBoxLayout()
         
@@ -94,6 +122,71 @@ class RobotMovementParser(QMainWindow):
         self.modify_file_button.clicked.connect(self.modify_file)
         main_layout.addWidget(self.modify_file_button)
 
+        # Save to library button
+        self.save_library_button = QPushButton('Save to Library', self)
+        self.save_library_button.clicked.connect(self.save_to_library)
+        main_layout.addWidget(self.save_library_button)
+
+        # Load from library button
+        self.load_library_button = QPushButton('Load from Library', self)
+        self.load_library_button.clicked.connect(self.load_from_library)
+        main_layout.addWidget(self.load_library_button)
+
+        # Resolve targets button
+        self.resolve_button = QPushButton('Resolve Targets', self)
+        self.resolve_button.clicked.connect(self.resolve_targets)
+        main_layout.addWidget(self.resolve_button)
+
+        # Target usage queries over the selected file's backup
+        usage_layout = QHBoxLayout()
+        self.usage_input = QLineEdit()
+        self.usage_input.setPlaceholderText("Target or routine name")
+        usage_layout.addWidget(self.usage_input)
+        self.find_usages_button = QPushButton('Find Usages', self)
+        self.find_usages_button.clicked.connect(self.find_usages)
+        usage_layout.addWidget(self.find_usages_button)
+        self.routine_targets_button = QPushButton('Targets in Routine', self)
+        self.routine_targets_button.clicked.connect(self.show_routine_targets)
+        usage_layout.addWidget(self.routine_targets_button)
+        self.unused_targets_button = QPushButton('Unused Targets', self)
+        self.unused_targets_button.clicked.connect(self.show_unused_targets)
+        usage_layout.addWidget(self.unused_targets_button)
+        main_layout.addLayout(usage_layout)
+
+        # Full-text and symbol search over every folder opened so far
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search: word, prefix*, kind:proc, re:pattern")
+        self.search_input.returnPressed.connect(self.search_programs)
+        search_layout.addWidget(self.search_input)
+        self.search_button = QPushButton('Search', self)
+        self.search_button.clicked.connect(self.search_programs)
+        search_layout.addWidget(self.search_button)
+        main_layout.addLayout(search_layout)
+
+        # Cycle time estimate button
+        self.cycle_time_button = QPushButton('Estimate Cycle Time', self)
+        self.cycle_time_button.clicked.connect(self.estimate_cycle_time)
+        main_layout.addWidget(self.cycle_time_button)
+
+        # Path decimation tolerances and button
+        decimate_layout = QHBoxLayout()
+        decimate_layout.addWidget(QLabel("Position tolerance (mm):"))
+        self.position_tolerance_input = QLineEdit(str(DEFAULT_POSITION_TOLERANCE))
+        decimate_layout.addWidget(self.position_tolerance_input)
+        decimate_layout.addWidget(QLabel("Angle tolerance (deg):"))
+        self.angle_tolerance_input = QLineEdit(str(DEFAULT_ANGLE_TOLERANCE))
+        decimate_layout.addWidget(self.angle_tolerance_input)
+        self.decimate_button = QPushButton('Decimate Path', self)
+        self.decimate_button.clicked.connect(self.decimate_path)
+        decimate_layout.addWidget(self.decimate_button)
+        main_layout.addLayout(decimate_layout)
+
+        # Backup comparison button (uses the tolerances above)
+        self.compare_button = QPushButton('Compare Backups', self)
+        self.compare_button.clicked.connect(self.compare_backups)
+        main_layout.addWidget(self.compare_button)
+
         # Output text area
         self.output_text = QListWidget(self)
         main_layout.addWidget(self.output_text)
@@ -137,73 +230,121 @@ class RobotMovementParser(QMainWindow):
         options = QFileDialog.Options()
         file_name, _ = QFileDialog.getOpenFileName(self, "Select Text File", "", "Text Files (*.mod);;All Files (*)", options=options)
         if file_name:
-            self.file_path = file_name
+            if self.file_path:
+                self.file_watcher.unwatch(self.file_path)
+            self.file_path = os.path.abspath(file_name)
+            self.file_watcher.watch(self.file_path)
+            self.move_table = None
             self.output_text.addItem(f"Selected file: {self.file_path}")
             # Update the input directory label
             input_dir = os.path.dirname(self.file_path)
             self.input_dir_label.setText(f'Input Directory: {input_dir}')
+            # Index the folder in the background so searches cover it once it is done
+            self.search_indexer.submit(input_dir)
 
+    @measured('Parse movements')
     def parse_movements(self):
         if not self.file_path:
             QMessageBox.warning(self, "Warning", "Please select a file first.")
             return
 
         try:
-            lines = self.read_file(self.file_path)
-            move_instructions = self.identify_move_instructions(lines)
-            self.generated_variables = []
-            self.variable_counter = 10
-            self.coordinate_to_variable = {}
-
-            for instruction in move_instructions:
-                coordinates = self.extract_coordinates(instruction)
-                if coordinates:
-                    variable = self.generate_variable(coordinates)
-                    if variable:  # Only add if a new variable was generated
-                        self.generated_variables.append(variable)
-
-            self.output_text.clear()
-            self.output_text.addItems(self.generated_variables)
+            self.name_move_targets()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
 
+    def name_move_targets(self):
+        """Names the move targets of the selected file and lists the new variables; raises on failure."""
+        move_targets = self.load_move_targets(self.file_path)
+        self.generated_variables = []
+        self.coordinate_to_variable = {}
+
+        # Names already declared in the module are never reused, and targets it already
+        # declares keep their name, so re-running on a converted module adds nothing
+        with open(self.file_path, 'r', newline='') as file:
+            text = file.read()
+        self.symbols.update_text(self.file_path, text)
+        namer = TargetNamer(self.symbols, self.file_path, self.var_base_name.text() or "p_",
+                            reserved=declared_names(text))
+        for coordinates, (variable_name, is_new) in zip(move_targets, namer.assign(move_targets)):
+            variable = self.generate_variable(coordinates, variable_name, is_new)
+            if variable:  # Only add if a new variable was generated
+                self.generated_variables.append(variable)
+
+        self.output_text.clear()
+        self.output_text.addItems(self.generated_variables)
+
+    def on_file_changed(self, path):
+        """Bring everything derived from the selected file up to date after it changed on disk."""
+        self.search_indexer.submit(path)
+        exists = os.path.exists(path)
+        if path in self.reference_index:
+            try:
+                if exists:
+                    self.reference_index.update_files([path])
+                else:
+                    self.reference_index.remove(path)
+                    self.reference_index.symbols.remove(path)
+            except OSError:
+                pass  # Still being written; the next change event rescans it
+        if path != self.file_path:
+            return
+        self.move_table = None
+        if not exists:
+            self.output_text.addItem(f"{path} was removed or renamed on disk")
+            return
+        viewer = getattr(self, 'source_viewer', None)
+        if viewer is not None and viewer.isVisible() and viewer.file_path == path:
+            viewer.open_file(path)
+        if self.coordinate_to_variable or self.generated_variables:
+            # Only this file is scanned again; its snapshot no longer matches the new content.
+            # Nobody asked for this parse, so a failure is listed instead of opening a dialog
+            try:
+                self.name_move_targets()
+            except Exception as e:
+                self.output_text.addItem(f"Could not re-parse {path} after a change on disk: {e}")
+                return
+            self.output_text.addItem(f"Re-parsed after a change on disk: {path}")
+        else:
+            self.output_text.addItem(f"Changed on disk: {path}")
+
     def read_file(self, file_path):
         """Read the contents of the file."""
         with open(file_path, 'r') as file:
             return file.readlines()
 
+    def load_move_targets(self, file_path):
+        """Return the inline target literals of all move instructions, in source order (snapshot cached)."""
+        return load_move_literals(file_path)
+
     def identify_move_instructions(self, lines):
         """Identify move instructions in the robotic program."""
         move_instructions = []
-        move_pattern = re.compile(r'\b(MoveJ|MoveL|MoveC)\b', re.IGNORECASE)
         for line in lines:
-            if move_pattern.search(line):
+            if MOVE_PATTERN.search(line):
                 move_instructions.append(line.strip())
         return move_instructions
 
     def extract_coordinates(self, move_instruction):
         """Extract full coordinate sequence from a move instruction."""
-        coord_pattern = re.compile(r'\[(\[[-+]?\d+\.?\d*,[-+]?\d+\.?\d*,[-+]?\d+\.?\d*\],\[[-+]?\d+\.?\d*,[-+]?\d+\.?\d*,[-+]?\d+\.?\d*,[-+]?\d+\.?\d*\],\[[-+]?\d+,[-+]?\d+,[-+]?\d+,[-+]?\d+\],\[(?:9E\+09,){5}9E\+09\])\]')
-        match = coord_pattern.search(move_instruction)
+        match = COORD_PATTERN.search(move_instruction)
         if match:
             return match.group(1)
         return None
 
-    def generate_variable(self, coordinates):
+    def generate_variable(self, coordinates, variable_name, is_new=True):
         """Generate a new variable with coordinates based on selected format."""
         # Check if coordinates already have a variable assigned
         if coordinates in self.coordinate_to_variable:
             return None  # Skip generation if already exists
 
+        # Store the variable in the coordinate_to_variable dictionary
+        self.coordinate_to_variable[coordinates] = variable_name
+        if not is_new:
+            return None  # Declared in the module already
+
         scope = "LOCAL " if self.scope_local.isChecked() else ""
         var_type = "CONST" if self.type_const.isChecked() else "VAR"
-        base_name = self.var_base_name.text() or "p_"
-        variable_name = f"{base_name}{self.variable_counter}"
-        self.variable_counter += 10
-        
-        # Store the new variable in the coordinate_to_variable dictionary
-        self.coordinate_to_variable[coordinates] = variable_name
-        
         return f"{scope}{var_type} Robtarget {variable_name} := [{coordinates}];"
    
     def save_file(self):
@@ -222,8 +363,9 @@ class RobotMovementParser(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"An error occurred while saving the file: {str(e)}")
 
+    @measured('Modify file')
     def modify_file(self):
-        if not self.generated_variables:
+        if not self.coordinate_to_variable:
             QMessageBox.warning(self, "Warning", "No variables generated. Please parse movements first.")
             return
 
@@ -246,19 +388,23 @@ class RobotMovementParser(QMainWindow):
 
                 # Find the line starting with "MODULE" and insert the new variables after it
                 module_line_index = next((i for i, line in enumerate(lines) if line.strip().startswith("MODULE")), -1)
-                if module_line_index != -1:
-                    lines.insert(module_line_index + 1, "\n" + "\n".join(self.generated_variables) + "\n")
-                else:
-                    lines.insert(0, "\n".join(self.generated_variables) + "\n")
+                # Nothing to insert when every target is declared already; only the moves change
+                if self.generated_variables:
+                    if module_line_index != -1:
+                        lines.insert(module_line_index + 1, "\n" + "\n".join(self.generated_variables) + "\n")
+                    else:
+                        lines.insert(0, "\n".join(self.generated_variables) + "\n")
 
                 # Replace coordinates with variable names in move instructions
                 for i, line in enumerate(lines):
                     if any(move in line.upper() for move in ["MOVEJ", "MOVEL", "MOVEC"]):
-                        for coords, var_name in self.coordinate_to_variable.items():
-                            if coords in line:
+                        # Dictionary lookups per literal rather than a scan over all targets
+                        for match in COORD_PATTERN.finditer(line):
+                            var_name = self.coordinate_to_variable.get(match.group(1))
+                            if var_name:
                                 # Extract only the variable name without scope, type, and robtarget
                                 var_name_only = var_name.split()[-1]
-                                lines[i] = line.replace(f"[{coords}]", var_name_only)
+                                lines[i] = lines[i].replace(f"[{match.group(1)}]", var_name_only)
 
                 # Write the modified contents back to the file
                 with open(new_file_path, 'w') as file:
@@ -268,6 +414,314 @@ class RobotMovementParser(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"An error occurred while modifying the file: {str(e)}")
 
+    def save_to_library(self):
+        """Store the generated targets in the target library, under the file's folder (cell) and module."""
+        if not self.generated_variables:
+            QMessageBox.warning(self, "Warning", "No variables generated. Please parse movements first.")
+            return
+
+        cell = os.path.basename(os.path.dirname(self.file_path))
+        module = os.path.splitext(os.path.basename(self.file_path))[0]
+        scope = ("LOCAL " if self.scope_local.isChecked() else "") + ("CONST" if self.type_const.isChecked() else "VAR")
+        records = [(name, scope, parse_robtarget_literal(coords))
+                   for coords, name in self.coordinate_to_variable.items()]
+        try:
+            library = TargetLibrary()
+            library.save_robtargets(cell, RobtargetTable.from_records(records), module)
+            library.close()
+            QMessageBox.information(self, "Success", f"Saved {len(records)} targets to library cell '{cell}', module '{module}'")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while saving to the library: {str(e)}")
+
+    def load_from_library(self):
+        """Name the file's inline move targets after the library targets of its cell and module with the same pose."""
+        if not self.file_path:
+            QMessageBox.warning(self, "Warning", "Please select a file first.")
+            return
+
+        cell = os.path.basename(os.path.dirname(self.file_path))
+        module = os.path.splitext(os.path.basename(self.file_path))[0]
+        try:
+            library = TargetLibrary()
+            try:
+                if cell not in library.cells():
+                    QMessageBox.information(self, "Library", f"Library cell '{cell}' does not exist yet.")
+                    return
+                table = library.load_robtargets(cell, module)
+            finally:
+                library.close()
+
+            poses = np.hstack([table.positions, table.orientations, table.configs, table.external_axes])
+            pose_to_name = {tuple(pose): name for name, pose in zip(table.names, poses.tolist())}
+            literals = self.load_move_targets(self.file_path)
+            with open(self.file_path, 'r', newline='') as file:
+                declared = declared_names(file.read())
+
+            self.generated_variables = []
+            self.coordinate_to_variable = {}
+            # COORD_PATTERN only matches plain 17-number literals, so the block parse cannot fail
+            for literal, pose in zip(literals, parse_literal_block(literals).tolist()):
+                name = pose_to_name.get(tuple(pose))
+                if name is None:
+                    continue
+                variable = self.generate_variable(literal, name, name.lower() not in declared)
+                if variable:
+                    self.generated_variables.append(variable)
+
+            self.output_text.clear()
+            self.output_text.addItems(self.generated_variables)
+            self.output_text.addItem(f"Named {len(self.coordinate_to_variable)} of {len(set(literals))} move targets "
+                                     f"from library cell '{cell}', module '{module}'")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while loading from the library: {str(e)}")
+
+    def resolve_targets(self):
+        """List the effective position of every move, including Offs() and RelTool() targets."""
+        if not self.file_path:
+            QMessageBox.warning(self, "Warning", "Please select a file first.")
+            return
+
+        try:
+            self.move_table, poses = resolve_file(self.file_path)
+            resolved = ~np.isnan(poses).any(axis=1)
+            items = []
+            for line, target, pose, ok in zip(self.move_table.lines.tolist(), self.move_table.targets,
+                                              poses.tolist(), resolved.tolist()):
+                if ok:
+                    position = ', '.join(f"{x:.2f}" for x in pose[0:3])
+                    orientation = ', '.join(f"{x:.6f}" for x in pose[3:7])
+                    items.append(f"Line {line}: {target} -> [[{position}], [{orientation}]]")
+                else:
+                    items.append(f"Line {line}: {target} -> not resolved")
+            self.output_text.clear()
+            self.output_text.addItems(items)
+            self.output_text.addItem(f"Resolved {int(resolved.sum())} of {len(resolved)} move targets")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while resolving targets: {str(e)}")
+
+    def update_reference_index(self):
+        """Bring the usage index of the selected file's folder up to date; only changed modules are rescanned."""
+        if not self.file_path:
+            QMessageBox.warning(self, "Warning", "Please select a file first.")
+            return False
+        try:
+            self.reference_index.update_directory(os.path.dirname(self.file_path))
+            return True
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while indexing target usages: {str(e)}")
+            return False
+
+    def search_programs(self):
+        query = self.search_input.text().strip()
+        if not query:
+            return
+        try:
+            start = time.perf_counter()
+            hits, total = self.search_indexer.index.search(query)
+            elapsed = (time.perf_counter() - start) * 1000
+        except ValueError as e:
+            QMessageBox.warning(self, "Warning", str(e))
+            return
+        self.output_text.clear()
+        for hit in hits:
+            kind = f" [{hit.kind}]" if hit.kind else ""
+            self.output_text.addItem(f"{hit.path}:{hit.line}{kind} {hit.text}")
+        summary = f"{total} hits in {len(self.search_indexer.index)} files ({elapsed:.1f} ms)"
+        if total > len(hits):
+            summary += f", first {len(hits)} shown"
+        if self.search_indexer.busy():
+            summary += " - indexing still in progress, results may be incomplete"
+        self.output_text.addItem(summary)
+
+    def find_usages(self):
+        name = self.usage_input.text().strip()
+        if not name or not self.update_reference_index():
+            return
+        input_dir = os.path.dirname(self.file_path)
+        usages = self.reference_index.find_usages(name)
+        self.output_text.clear()
+        for usage in usages:
+            self.output_text.addItem(f"{os.path.relpath(usage.path, input_dir)}:{usage.line} "
+                                     f"{usage.module}.{usage.routine} [{usage.instruction}] {usage.text}")
+        self.output_text.addItem(f"{len(usages)} usages of {name}")
+
+    def show_routine_targets(self):
+        routine = self.usage_input.text().strip()
+        if not routine or not self.update_reference_index():
+            return
+        targets = self.reference_index.targets_used_by(routine)
+        self.output_text.clear()
+        self.output_text.addItems(targets)
+        self.output_text.addItem(f"{len(targets)} targets used by {routine}")
+
+    def show_unused_targets(self):
+        if not self.update_reference_index():
+            return
+        input_dir = os.path.dirname(self.file_path)
+        unused = self.reference_index.unused_targets()
+        self.output_text.clear()
+        for symbol in unused:
+            self.output_text.addItem(f"{os.path.relpath(symbol.path, input_dir)}:{symbol.first_line} {symbol.name}")
+        self.output_text.addItem(f"{len(unused)} unused targets")
+
+    def view_source(self):
+        if not self.file_path:
+            QMessageBox.warning(self, "Warning", "Please select a file first.")
+            return
+        self.source_viewer = SimplifiedRobotParser()
+        self.source_viewer.setWindowTitle(os.path.basename(self.file_path))
+        self.source_viewer.open_file(self.file_path)
+        self.source_viewer.show()
+
+    def compare_backups(self):
+        """Report targets moved, added or removed between two backup folders."""
+        try:
+            position_tolerance = float(self.position_tolerance_input.text())
+            angle_tolerance = float(self.angle_tolerance_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Warning", "Tolerances must be numbers.")
+            return
+
+        default_dir = os.path.dirname(self.file_path) if self.file_path else ""
+        old_dir = QFileDialog.getExistingDirectory(self, "Select Old Backup", default_dir)
+        if not old_dir:
+            return
+        new_dir = QFileDialog.getExistingDirectory(self, "Select New Backup", os.path.dirname(old_dir))
+        if not new_dir:
+            return
+
+        try:
+            report = diff_backups(old_dir, new_dir, position_tolerance, angle_tolerance)
+            self.output_text.clear()
+            for module, target, distance, angle in report['moved']:
+                self.output_text.addItem(f"Moved    {module}/{target}: {distance:.3f} mm, {angle:.3f} deg")
+            for module, target, _, _ in report['added']:
+                self.output_text.addItem(f"Added    {module}/{target}")
+            for module, target, _, _ in report['removed']:
+                self.output_text.addItem(f"Removed  {module}/{target}")
+            self.output_text.addItem(f"{len(report['moved'])} moved, {len(report['added'])} added, "
+                                     f"{len(report['removed'])} removed, {report['unchanged']} unchanged")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while comparing backups: {str(e)}")
+
+    def estimate_cycle_time(self):
+        """Estimate path length and cycle time per routine for the selected file and the rest of its backup."""
+        if not self.file_path:
+            QMessageBox.warning(self, "Warning", "Please select a file first.")
+            return
+
+        try:
+            text = ''.join(self.read_file(self.file_path))
+            self.move_table = parse_move_instructions(text)
+            results = {self.file_path: estimate_routines(self.move_table, text)}
+            input_dir = os.path.dirname(self.file_path)
+            for path, routines in estimate_backup(input_dir).items():
+                if os.path.normcase(os.path.abspath(path)) != os.path.normcase(os.path.abspath(self.file_path)):
+                    results[path] = routines
+
+            self.output_text.clear()
+            for path, routines in results.items():
+                total = sum(routine['time_s'] for routine in routines.values())
+                self.output_text.addItem(f"{os.path.relpath(path, input_dir)}: {total:.1f} s")
+                for name, routine in routines.items():
+                    line = (f"    {name}: {routine['moves']} moves, {routine['length_mm']:.0f} mm, "
+                            f"{routine['reorientation_deg']:.0f} deg, {routine['time_s']:.2f} s")
+                    if routine['unresolved']:
+                        line += f" ({routine['unresolved']} targets not resolved)"
+                    self.output_text.addItem(line)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred while estimating cycle time: {str(e)}")
+
+    def decimate_path(self):
+        """Remove MoveL points within the tolerances and save the reduced module."""
+        if not self.file_path:
+            QMessageBox.warning(self, "Warning", "Please select a file first.")
+            return
+
+        try:
+            position_tolerance = float(self.position_tolerance_input.text())
+            angle_tolerance = float(self.angle_tolerance_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Warning", "Tolerances must be numbers.")
+            return
+
+        default_dir = os.path.dirname(self.file_path)
+        default_name = f"decimated_{os.path.basename(self.file_path)}"
+        new_file_path, _ = QFileDialog.getSaveFileName(self, "Save Decimated File", os.path.join(default_dir, default_name), "MOD Files (*.mod)")
+
+        if new_file_path:
+            try:
+                with open(self.file_path, 'r', newline='') as file:
+                    text = file.read()
+                new_text, report = decimate_module(text, position_tolerance, angle_tolerance)
+                with open(new_file_path, 'w', newline='') as file:
+                    file.write(new_text)
+
+                removed = report['moves_before'] - report['moves_after']
+                saved = report['bytes_before'] - report['bytes_after']
+                summary = (f"Removed {removed} of {report['moves_before']} moves "
+                           f"({report['candidates']} candidates), "
+                           f"{report['bytes_before']} -> {report['bytes_after']} bytes "
+                           f"({100.0 * saved / max(report['bytes_before'], 1):.1f}% smaller)")
+                self.output_text.addItem(summary)
+                QMessageBox.information(self, "Success", f"File decimated successfully: {new_file_path}\n{summary}")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"An error occurred while decimating the file: {str(e)}")
+
+    def memory_usage(self):
+        """Approximate bytes held by the search index, move table and generated targets."""
+        rows = len(self.generated_variables) + len(self.coordinate_to_variable) + self.output_text.count()
+        if self.move_table is not None:
+            rows += len(self.move_table)
+        return self.search_indexer.index.memory_usage() + rows * ROW_OVERHEAD
+
+    def snapshot_state(self):
+        """The selected file, options and results, to rebuild the tool after it was released.
+
+        Indexes and parsed tables are left out; they are rebuilt from the file when needed.
+        """
+        return {
+            'file_path': self.file_path,
+            'var_base_name': self.var_base_name.text(),
+            'local': self.scope_local.isChecked(),
+            'var': self.type_var.isChecked(),
+            'usage': self.usage_input.text(),
+            'search': self.search_input.text(),
+            'position_tolerance': self.position_tolerance_input.text(),
+            'angle_tolerance': self.angle_tolerance_input.text(),
+            'generated_variables': self.generated_variables,
+            'coordinate_to_variable': self.coordinate_to_variable,
+            'output': [self.output_text.item(row).text() for row in range(self.output_text.count())],
+        }
+
+    def restore_state(self, state):
+        self.var_base_name.setText(state['var_base_name'])
+        self.scope_local.setChecked(state['local'])
+        self.type_var.setChecked(state['var'])
+        self.usage_input.setText(state['usage'])
+        self.search_input.setText(state['search'])
+        self.position_tolerance_input.setText(state['position_tolerance'])
+        self.angle_tolerance_input.setText(state['angle_tolerance'])
+        self.generated_variables = state['generated_variables']
+        self.coordinate_to_variable = state['coordinate_to_variable']
+        self.output_text.addItems(state['output'])
+        if state['file_path']:
+            self.file_path = state['file_path']
+            self.file_watcher.watch(self.file_path)
+            input_dir = os.path.dirname(self.file_path)
+            self.input_dir_label.setText(f'Input Directory: {input_dir}')
+            self.search_indexer.submit(input_dir)
+
+    def closeEvent(self, event):
+        # Stop the background work tied to this instance so it can be freed
+        self.search_indexer.stop()
+        if self.file_path:
+            self.file_watcher.unwatch(self.file_path)
+        viewer = getattr(self, 'source_viewer', None)
+        if viewer is not None:
+            viewer.close()
+        super().closeEvent(event)
+
     # ... (keep the rest of the methods as they are) ...
 
 if __name__ == '__main__':
@@ -1,14 +1,25 @@
 import sys
 import pyperclip
-import re
 import numpy as np
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLabel, QLineEdit, QPushButton, QTextEdit, QGroupBox, QFormLayout,
-                             QDialog, QDialogButtonBox, QListWidget, QComboBox, QSpacerItem, QSizePolicy)
+                             QLabel, QLineEdit, QPushButton, QPlainTextEdit, QGroupBox, QFormLayout,
+                             QDialog, QDialogButtonBox, QComboBox, QSpacerItem, QSizePolicy,
+                             QListView, QTableWidget, QTableWidgetItem, QHeaderView)
 from PyQt5.QtGui import QPalette, QColor, QTextCharFormat
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QAbstractListModel, QModelIndex
 from scipy.spatial.transform import Rotation
 
+from robtarget_batch import RobtargetTable, format_pose
+from target_index import TargetIndex
+from target_library import TargetLibrary
+from rapid_snapshot import source_digest, read_snapshot, write_snapshot
+from robot_kinematics import ROBOT_MODELS, validate_targets
+from rapid_symbols import PARSER_VERSION, SymbolTable
+from target_pipeline import Pipeline
+from rapid_highlighter import RapidHighlighter
+from perf_monitor import measured
+import tracing
+
 from GUI_settings import (set_dark_theme, set_button_style, set_title_font,
                           set_common_stylesheet, set_input_field_style,
                           set_output_text_style, set_tab_widget_style, set_light_theme)
@@ -91,9 +102,10 @@ class CoordinateSystemInputWindow(QDialog):
         
         layout = QVBoxLayout()
         
-        self.text_edit = QTextEdit()
+        self.text_edit = QPlainTextEdit()
         self.text_edit.setPlaceholderText("Enter coordinate systems (one per line) in the format:\n"
                                           "TASK PERS wobjdata Name :=[FALSE,TRUE,[[x,y,z],[qw,qx,qy,qz]]];")
+        self.highlighter = RapidHighlighter(self.text_edit.document(), self.text_edit)
         layout.addWidget(self.text_edit)
         
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -106,14 +118,9 @@ class CoordinateSystemInputWindow(QDialog):
     def add_coordinate_systems(self):
         """Adds coordinate systems entered in the text edit to the application."""
         input_text = self.text_edit.toPlainText().strip()
-        coord_systems = {}
-        for line in input_text.split('\n'):
-            match = re.match(r'TASK\s+PERS\s+wobjdata\s+(\w+)\s*:=\s*\[.*?\[\[([-\d.]+),([-\d.]+),([-\d.]+)\],\[([-\d.]+),([-\d.]+),([-\d.]+),([-\d.]+)\]\]', line.strip())
-            if match:
-                name = match.group(1)
-                position = [float(match.group(2)), float(match.group(3)), float(match.group(4))]
-                orientation = [float(match.group(5)), float(match.group(6)), float(match.group(7)), float(match.group(8))]
-                coord_systems[name] = {'position': position, 'orientation': orientation}
+        symbols = SymbolTable()
+        symbols.update_text('coordinate systems', input_text)
+        coord_systems = symbols.frames('wobjdata')
         
         if coord_systems:
             self.coordinateSystemsAdded.emit(coord_systems)
@@ -147,9 +154,11 @@ class InputWindow(QDialog):
         
         layout = QVBoxLayout()
         
-        self.text_edit = QTextEdit()
+        # QPlainTextEdit lays out only the blocks it shows, which keeps pasted modules responsive
+        self.text_edit = QPlainTextEdit()
         self.text_edit.setPlaceholderText("Enter targets here (one per line)\n"
                                           "Format: [LOCAL] [CONST] robtarget TargetName := [[x,y,z],[qw,qx,qy,qz],[cfg],[ext]];")
+        self.highlighter = RapidHighlighter(self.text_edit.document(), self.text_edit)
         layout.addWidget(self.text_edit)
         
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -173,6 +182,136 @@ class InputWindow(QDialog):
             self.setStyleSheet(set_common_stylesheet('light'))
             set_input_field_style(self.text_edit, 'light')
 
+class FrameEditorPanel(QTableWidget):
+    """Editable table of coordinate systems; emits frameEdited when a value changes."""
+    frameEdited = pyqtSignal(str, dict)
+    COLUMNS = ['Name', 'X', 'Y', 'Z', 'Q1', 'Q2', 'Q3', 'Q4']
+    READ_ONLY_FRAMES = ('Wobj0',)
+
+    def __init__(self, parent=None):
+        super().__init__(0, len(self.COLUMNS), parent)
+        self.setHorizontalHeaderLabels(self.COLUMNS)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.verticalHeader().setVisible(False)
+        self.itemChanged.connect(self.on_item_changed)
+
+    def set_frame(self, name, params):
+        """Adds a row for a frame, or updates the row if the frame is already listed."""
+        rows = self.findItems(name, Qt.MatchExactly)
+        rows = [item.row() for item in rows if item.column() == 0]
+        if rows:
+            row = rows[0]
+        else:
+            row = self.rowCount()
+            self.insertRow(row)
+        values = list(params['position']) + list(params['orientation'])
+
+        self.blockSignals(True)
+        name_item = QTableWidgetItem(name)
+        name_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        self.setItem(row, 0, name_item)
+        for column, value in enumerate(values, start=1):
+            item = QTableWidgetItem(repr(float(value)))
+            if name in self.READ_ONLY_FRAMES:
+                item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+            self.setItem(row, column, item)
+        self.blockSignals(False)
+
+    def frame_values(self, row):
+        """Returns the frame on a row as a coordinate system dict, or None if a cell is not a number."""
+        try:
+            values = [float(self.item(row, column).text()) for column in range(1, len(self.COLUMNS))]
+        except (AttributeError, ValueError):
+            return None
+        return {'position': values[:3], 'orientation': values[3:]}
+
+    def on_item_changed(self, item):
+        if item.column() == 0:
+            return
+        name = self.item(item.row(), 0).text()
+        params = self.frame_values(item.row())
+        if params is None:
+            print(f"Invalid value for coordinate system '{name}': {item.text()}")
+            return
+        self.frameEdited.emit(name, params)
+
+class TargetListModel(QAbstractListModel):
+    """Names of the RobtargetTable rows matching the current query."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = RobtargetTable()
+        self.rows = np.empty(0, dtype=np.intp)
+
+    def set_rows(self, table, rows):
+        self.beginResetModel()
+        self.table = table
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self.table.names[self.rows[index.row()]]
+
+class ConvertedTargetsModel(QAbstractListModel):
+    """List model over a converted RobtargetTable; rows are formatted only when the view asks for them."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = RobtargetTable()
+        self.message = None
+        self.notes = None
+
+    def set_table(self, table):
+        self.beginResetModel()
+        self.table = table
+        self.message = None if len(table) else "No valid robtargets were found."
+        self.notes = None
+        self.endResetModel()
+
+    def set_notes(self, notes):
+        """Per-row remarks (e.g. kinematic check results) shown after each target; '' for none."""
+        self.notes = notes
+        self.refresh_rows(0, len(self.table) - 1)
+
+    def set_message(self, message):
+        self.beginResetModel()
+        self.table = RobtargetTable()
+        self.message = message
+        self.notes = None
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.table) if self.message is None else 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        if self.message is not None:
+            return self.message
+        row = index.row()
+        table = self.table
+        text = (f"{table.names[row]} := "
+                f"{format_pose(table.positions[row], table.orientations[row], table.configs[row], table.external_axes[row])}")
+        if self.notes is not None and self.notes[row]:
+            text += f"  [{self.notes[row]}]"
+        return text
+
+    def refresh_rows(self, first, last):
+        """Tells attached views that rows first..last were recomputed."""
+        if len(self.table) == 0:
+            return
+        first = max(first, 0)
+        last = min(last, len(self.table) - 1)
+        if first <= last:
+            self.dataChanged.emit(self.index(first), self.index(last), [Qt.DisplayRole])
+
 class TargetConverterApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -196,8 +335,21 @@ class TargetConverterApp(QWidget):
             'Wobj0': {'position': [0, 0, 0], 'orientation': [1, 0, 0, 0]}
         }
         
-        self.robtarget_data = {}
-        self.converted_data = {}
+        # Declarations of the pasted module text
+        self.symbols = SymbolTable()
+        self.target_table = RobtargetTable()
+        self.target_index = TargetIndex(self.target_table)
+        self.selected_rows = self.target_index.all_rows()
+        self.converted_table = RobtargetTable()
+        # Frames and rows of the last conversion, so frame edits can redo just that conversion
+        self.last_conversion = None
+        self.dirty_frames = set()
+
+        # Debounce frame edits: re-convert once typing pauses
+        self.reconvert_timer = QTimer(self)
+        self.reconvert_timer.setSingleShot(True)
+        self.reconvert_timer.setInterval(300)
+        self.reconvert_timer.timeout.connect(self.reconvert_dirty_frames)
         
         # Title
         title_label = QLabel("Robtarget Converter")
@@ -217,6 +369,13 @@ class TargetConverterApp(QWidget):
         
         main_layout.addLayout(form_layout)
 
+        # Editable coordinate systems; edits re-run the last conversion
+        self.frame_panel = FrameEditorPanel()
+        for name, params in self.coordinate_systems.items():
+            self.frame_panel.set_frame(name, params)
+        self.frame_panel.frameEdited.connect(self.update_coordinate_system)
+        main_layout.addWidget(self.frame_panel)
+
         # Create a horizontal layout for the buttons
         button_layout = QHBoxLayout()
         
@@ -232,13 +391,44 @@ class TargetConverterApp(QWidget):
 
         # Add the button layout to the main layout
         main_layout.addLayout(button_layout)
+
+        # Target library: frames and targets stored per cell between sessions
+        library_layout = QHBoxLayout()
+        self.library = None
+        self.library_cell_combo = QComboBox()
+        self.library_cell_combo.setEditable(True)
+        self.library_cell_combo.lineEdit().setPlaceholderText("Cell name")
+        library_layout.addWidget(self.library_cell_combo, 1)
+
+        load_library_button = QPushButton("Load from Library")
+        set_button_style(load_library_button)
+        load_library_button.clicked.connect(self.load_from_library)
+        library_layout.addWidget(load_library_button)
+
+        save_library_button = QPushButton("Save to Library")
+        set_button_style(save_library_button)
+        save_library_button.clicked.connect(self.save_to_library)
+        library_layout.addWidget(save_library_button)
+
+        main_layout.addLayout(library_layout)
         
         # Add label for input robtargets
         input_label = QLabel("INPUT ROBTARGETS")
         input_label.setAlignment(Qt.AlignCenter)
         main_layout.addWidget(input_label)
         
-        self.robtarget_input = QListWidget()
+        # Query bar: filters the input list and restricts conversion to the matches
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Filter: box:x1,y1,z1,x2,y2,z2  near:x,y,z[,k]  "
+                                            "within:x,y,z,r  cf1=-1  name:prefix")
+        self.query_input.returnPressed.connect(self.apply_query)
+        set_input_field_style(self.query_input)
+        main_layout.addWidget(self.query_input)
+
+        self.robtarget_model = TargetListModel(self)
+        self.robtarget_input = QListView()
+        self.robtarget_input.setModel(self.robtarget_model)
+        self.robtarget_input.setUniformItemSizes(True)
         set_input_field_style(self.robtarget_input)
         main_layout.addWidget(self.robtarget_input)
         
@@ -247,7 +437,10 @@ class TargetConverterApp(QWidget):
         output_label.setAlignment(Qt.AlignCenter)
         main_layout.addWidget(output_label)
         
-        self.result_list = QListWidget()
+        self.result_model = ConvertedTargetsModel(self)
+        self.result_list = QListView()
+        self.result_list.setModel(self.result_model)
+        self.result_list.setUniformItemSizes(True)
         set_output_text_style(self.result_list)
         main_layout.addWidget(self.result_list)
         
@@ -264,6 +457,19 @@ class TargetConverterApp(QWidget):
         convert_copy_layout.addWidget(copy_button)
         
         main_layout.addLayout(convert_copy_layout)
+
+        # Kinematic check of the converted targets; assumes the output frame is the robot base and tool0
+        kinematics_layout = QHBoxLayout()
+        self.robot_combo = QComboBox()
+        self.robot_combo.addItems(ROBOT_MODELS.keys())
+        kinematics_layout.addWidget(self.robot_combo, 1)
+
+        check_config_button = QPushButton("Check Robot Config")
+        set_button_style(check_config_button)
+        check_config_button.clicked.connect(self.check_robot_config)
+        kinematics_layout.addWidget(check_config_button)
+
+        main_layout.addLayout(kinematics_layout)
         
         self.apply_theme()
 
@@ -321,45 +527,73 @@ class TargetConverterApp(QWidget):
 
     def get_robtarget_data(self, target_name):
         """Retrieve full robtarget data for a given target name."""
-        data = self.robtarget_data.get(target_name)
-        #print(f"Retrieved data for {target_name}: {data}")  # Debug print
-        return data
+        row = self.target_table.index_of(target_name)
+        if row is None:
+            return None
+        return {'scope': self.target_table.scopes[row], 'data': self.target_table.row(row)}
 
     def add_coordinate_systems(self, coord_systems):
-        """Adds new coordinate systems to the application."""
+        """Adds new coordinate systems to the application, updating any that already exist."""
         for name, params in coord_systems.items():
             if name not in self.coordinate_systems:
                 self.coordinate_systems[name] = params
                 self.input_cs_combo.addItem(name)
                 self.output_cs_combo.addItem(name)
+                self.frame_panel.set_frame(name, params)
             else:
-                print(f"Coordinate system '{name}' already exists.")
+                self.frame_panel.set_frame(name, params)
+                self.update_coordinate_system(name, params)
 
+    def update_coordinate_system(self, name, params):
+        """Stores new values for an existing frame and schedules a re-conversion."""
+        self.coordinate_systems[name] = params
+        self.dirty_frames.add(name)
+        self.reconvert_timer.start()
+
+    @tracing.traced('targets.update_input')
     def update_input(self, input_text):
         #print("Updating input in TargetConverterApp with:", input_text)  # Debug print
-        self.robtarget_input.clear()
-        self.robtarget_data.clear()  # Clear previous data
-        for line in input_text.split('\n'):
-            line = line.strip()  # Strip whitespace
-            match = re.match(r'(local\s+)?(const\s+)?robtarget\s+(\w+)\s*:=\s*(\[\[[-\d.,]+\],\[[-\d.,]+\],\[[-\d.,]+\],\[[-\d.E+,]+\]\]);', line, re.IGNORECASE)
-            if match:
-                scope = []
-                if match.group(1):
-                    scope.append('LOCAL')
-                if match.group(2):
-                    scope.append('CONST')
-                scope = ' '.join(scope)
-                target_name = match.group(3)
-                target_data = match.group(4)
-                #print(f"Adding target to list: {target_name}")  # Debug print
-                self.robtarget_input.addItem(target_name)
-                self.robtarget_data[target_name] = {
-                    'scope': scope,
-                    'data': self.parse_robtarget_data(target_data)
-                }
-            else:
-                print(f"No match for line: {line}")  # Debug print
-        #print(f"Total items in robtarget_input: {self.robtarget_input.count()}")  # Debug print
+        # Pasting the same module again reuses the snapshot of its last parse
+        digest = source_digest(input_text)
+        snapshot = read_snapshot(f"paste:{digest}", digest, PARSER_VERSION)
+        if snapshot is not None:
+            self.set_target_table(snapshot[0])
+            return
+
+        # The pasted text is indexed like a module; later duplicates of a name replace earlier ones
+        self.symbols.update_text('paste', input_text)
+        table, offsets, line_numbers = self.symbols.robtarget_table('paste')
+        declared_lines = set()
+        for symbol in self.symbols.symbols('paste', 'robtarget'):
+            declared_lines.update(range(symbol.first_line, symbol.last_line + 1))
+        # Rejected lines are only counted; their text is kept for the trace when tracing is on
+        tracing.count('targets.rejected_lines', input_text.count('\n') + 1 - len(declared_lines))
+        if tracing.enabled():
+            rejected = [line.strip() for line_number, line in enumerate(input_text.split('\n'), start=1)
+                        if line_number not in declared_lines]
+            tracing.event('targets.rejected_lines', count=len(rejected), lines=rejected[:100])
+        try:
+            write_snapshot(f"paste:{digest}", digest, table, offsets, line_numbers, PARSER_VERSION)
+        except OSError as e:
+            print(f"Could not write snapshot: {e}")
+        self.set_target_table(table)
+        #print(f"Total items in robtarget_input: {len(self.target_table)}")  # Debug print
+
+    def set_target_table(self, table):
+        """Replaces the loaded targets and rebuilds their query index."""
+        self.target_table = table
+        self.target_index = TargetIndex(self.target_table)
+        self.last_conversion = None
+        self.apply_query()
+
+    def apply_query(self):
+        """Filters the input list to the rows matching the query bar; an empty query selects everything."""
+        try:
+            self.selected_rows = self.target_index.query(self.query_input.text())
+        except ValueError as e:
+            print(str(e))
+            return
+        self.robtarget_model.set_rows(self.target_table, self.selected_rows)
 
     def parse_robtarget_data(self, data_string):
         """Parse the robtarget data string into a list of lists."""
@@ -371,6 +605,7 @@ class TargetConverterApp(QWidget):
             [float(x) for x in parts[3].split(',')]   # external_axis
         ]
     
+    @measured('Convert targets')
     def convert_targets(self):
         input_cs = self.input_cs_combo.currentText()
         output_cs = self.output_cs_combo.currentText()
@@ -378,49 +613,108 @@ class TargetConverterApp(QWidget):
             print("Input and output coordinate systems must be different.")
             return
 
-        self.result_list.clear()
-        self.converted_data.clear()
-        results = []
-        errors = []
-        
-        for i in range(self.robtarget_input.count()):
-            target_name = self.robtarget_input.item(i).text()
-            robtarget_info = self.get_robtarget_data(target_name)
-            if robtarget_info:
-                try:
-                    transformed_target = transform_robtarget(
-                        robtarget_info['data'], self.coordinate_systems[output_cs], self.coordinate_systems[input_cs]
-                    )
-                    self.converted_data[target_name] = {
-                        'scope': robtarget_info['scope'],
-                        'data': transformed_target
-                    }
-                    results.append(f"{target_name}")
-                except Exception as e:
-                    error_msg = f"Error processing target: {target_name}"
-                    results.append(error_msg)
-                    errors.append(error_msg)
-            else:
-                results.append(f"Invalid target: {target_name}")
-        
-        if results:
-            self.result_list.addItems(results)
-        else:
-            self.result_list.addItem("No valid robtargets were found.")
-            
-        if errors:
-            print("Errors encountered during conversion:\n", "\n".join(errors))
+        rows = self.selected_rows
+        self.last_conversion = {'input': input_cs, 'output': output_cs, 'rows': rows}
+        self.converted_table = self.target_table.take(rows)
+        if self.run_conversion():
+            self.result_model.set_table(self.converted_table)
+
+    def run_conversion(self):
+        """Recomputes converted_table poses for the last conversion through the pipeline's convert stage."""
+        input_cs = self.last_conversion['input']
+        output_cs = self.last_conversion['output']
+        rows = self.last_conversion['rows']
+        try:
+            converted = Pipeline.from_table(self.target_table.take(rows)).convert(
+                self.coordinate_systems[input_cs], self.coordinate_systems[output_cs]
+            ).tables()
+        except Exception as e:
+            print(f"Errors encountered during conversion:\n {e}")
+            self.last_conversion = None
+            self.converted_table = RobtargetTable()
+            self.result_model.set_message("Error processing targets")
+            return False
+        self.converted_table.positions[:] = converted.positions
+        self.converted_table.orientations[:] = converted.orientations
+        # Configs and notes from check_robot_config were solved for the old poses
+        self.converted_table.configs[:] = converted.configs
+        if self.result_model.notes is not None:
+            self.result_model.set_notes(None)
+        return True
+
+    def reconvert_dirty_frames(self):
+        """Re-runs the last conversion if an edited frame took part in it, refreshing only visible rows."""
+        dirty, self.dirty_frames = self.dirty_frames, set()
+        if not self.last_conversion:
+            return
+        if not dirty & {self.last_conversion['input'], self.last_conversion['output']}:
+            return
+        if self.run_conversion():
+            self.result_model.refresh_rows(*self.visible_result_rows())
+
+    def visible_result_rows(self):
+        """Returns the first and last row currently shown in the result view."""
+        viewport = self.result_list.viewport().rect()
+        first = self.result_list.indexAt(viewport.topLeft())
+        last = self.result_list.indexAt(viewport.bottomLeft())
+        first_row = first.row() if first.isValid() else 0
+        last_row = last.row() if last.isValid() else self.result_model.rowCount() - 1
+        return first_row, last_row
+
+    def check_robot_config(self):
+        """Solves IK for the converted targets, flags unreachable ones and rewrites inconsistent cf values."""
+        table = self.converted_table
+        if not len(table):
+            print("No converted targets to check.")
+            return
+        model = ROBOT_MODELS[self.robot_combo.currentText()]
+        result = validate_targets(model, table.positions, table.orientations, table.configs)
+        changed = np.any(result['configs'] != table.configs, axis=1)
+        table.configs[:] = result['configs']
+
+        notes = np.full(len(table), '', dtype=object)
+        notes[changed] = 'CONFIG UPDATED'
+        notes[~result['within_limits']] = 'JOINT LIMITS'
+        notes[~result['reachable']] = 'UNREACHABLE'
+        self.result_model.set_notes(notes)
+        print(f"{model.name}: {int((~result['reachable']).sum())} unreachable, "
+              f"{int((result['reachable'] & ~result['within_limits']).sum())} outside joint limits, "
+              f"{int(changed.sum())} configurations updated.")
+
+    def get_library(self):
+        """Opens the on-disk target library on first use."""
+        if self.library is None:
+            self.library = TargetLibrary()
+            self.library_cell_combo.addItems(self.library.cells())
+        return self.library
+
+    def load_from_library(self):
+        library = self.get_library()
+        cell = self.library_cell_combo.currentText().strip()
+        if cell not in library.cells():
+            print(f"Cell '{cell}' not found in the library.")
+            return
+        self.add_coordinate_systems(library.load_frames(cell))
+        self.set_target_table(library.load_robtargets(cell))
+
+    def save_to_library(self):
+        library = self.get_library()
+        cell = self.library_cell_combo.currentText().strip()
+        if not cell:
+            print("Enter a cell name to save to the library.")
+            return
+        frames = {name: params for name, params in self.coordinate_systems.items() if name != 'Wobj0'}
+        library.save_frames(cell, frames)
+        library.save_robtargets(cell, self.target_table)
+        if self.library_cell_combo.findText(cell) == -1:
+            self.library_cell_combo.addItem(cell)
+        print(f"Saved {len(self.target_table)} targets to library cell '{cell}'.")
 
     def copy_results(self):
         full_results = []
-        for target_name, converted_info in self.converted_data.items():
-            scope = converted_info['scope']
-            formatted_data = format_robtarget(converted_info['data'])
-            if scope:
-                full_results.append(f"{scope} robtarget {target_name}:={formatted_data};")
-            else:
-                full_results.append(f"robtarget {target_name}:={formatted_data};")
-        
+        for lines in Pipeline.from_table(self.converted_table).format(default_scope=''):
+            full_results.extend(lines)
+
         if full_results:
             results_text = "\n".join(full_results)
             pyperclip.copy(results_text)
@@ -428,6 +722,46 @@ class TargetConverterApp(QWidget):
         else:
             print("No results to copy.")
 
+    def memory_usage(self):
+        """Approximate bytes held by the loaded and converted targets."""
+        return self.target_table.nbytes() + self.converted_table.nbytes() + self.selected_rows.nbytes
+
+    def snapshot_state(self):
+        """The frames, targets, conversion and inputs, to rebuild the tool after it was released."""
+        return {
+            'coordinate_systems': self.coordinate_systems,
+            'input_cs': self.input_cs_combo.currentText(),
+            'output_cs': self.output_cs_combo.currentText(),
+            'query': self.query_input.text(),
+            'target_table': self.target_table,
+            'converted_table': self.converted_table,
+            'last_conversion': self.last_conversion,
+            'message': self.result_model.message,
+            'notes': self.result_model.notes,
+            'robot': self.robot_combo.currentText(),
+            'library_cell': self.library_cell_combo.currentText(),
+        }
+
+    def restore_state(self, state):
+        self.add_coordinate_systems(state['coordinate_systems'])
+        # Restored frames are not edits; nothing needs re-converting
+        self.reconvert_timer.stop()
+        self.dirty_frames.clear()
+        self.input_cs_combo.setCurrentText(state['input_cs'])
+        self.output_cs_combo.setCurrentText(state['output_cs'])
+        self.query_input.setText(state['query'])
+        self.set_target_table(state['target_table'])
+        self.last_conversion = state['last_conversion']
+        self.converted_table = state['converted_table']
+        if state['message'] is not None:
+            self.result_model.set_message(state['message'])
+        elif len(self.converted_table):
+            self.result_model.set_table(self.converted_table)
+            if state['notes'] is not None:
+                self.result_model.set_notes(state['notes'])
+        self.robot_combo.setCurrentText(state['robot'])
+        self.library_cell_combo.setCurrentText(state['library_cell'])
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     
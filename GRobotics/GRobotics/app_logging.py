@@ -0,0 +1,104 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOGGER_PREFIX = 'grobotics'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+APP_LOG = 'app.log'
+# Records of these tools also go to a file of their own
+TOOL_LOGS = {'ip_configurator': 'ip_configurator.log'}
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+# Recent records kept in memory for the footer and for inspection
+RING_CAPACITY = 1000
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last records in memory; version changes whenever one is added."""
+
+    def __init__(self, capacity=RING_CAPACITY):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.version = 0
+
+    def emit(self, record):
+        self.records.append(record)
+        self.version += 1
+
+    def latest(self):
+        return self.records[-1] if self.records else None
+
+    def recent(self, count=None):
+        records = list(self.records)
+        return records if count is None else records[-count:]
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues records unformatted; the listener thread does the formatting.
+
+    The queue stays in-process, so nothing needs pickling, and the caller's cost drops
+    to creating the record and one put(). Arguments must not be mutated after the call.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+LOG_BUFFER = RingBufferHandler()
+
+
+def get_logger(tool):
+    """The logger of one tool, e.g. get_logger('ip_configurator')."""
+    return logging.getLogger(f"{LOGGER_PREFIX}.{tool}")
+
+
+def setup_logging(level=logging.INFO, log_dir='', max_bytes=MAX_LOG_BYTES, backup_count=LOG_BACKUPS):
+    """Routes all logging through a queue to a background thread that writes the log files.
+
+    The calling thread only puts the record on an unbounded queue, so logging never waits
+    on disk I/O. app.log gets every record, each tool in TOOL_LOGS also gets its own
+    file, and the files rotate at max_bytes. Only the first call has an effect.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = [RotatingFileHandler(os.path.join(log_dir, APP_LOG), maxBytes=max_bytes,
+                                        backupCount=backup_count, encoding='utf-8', delay=True)]
+        for tool, file_name in TOOL_LOGS.items():
+            handler = RotatingFileHandler(os.path.join(log_dir, file_name), maxBytes=max_bytes,
+                                          backupCount=backup_count, encoding='utf-8', delay=True)
+            handler.addFilter(logging.Filter(f"{LOGGER_PREFIX}.{tool}"))
+            handlers.append(handler)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        handlers.append(LOG_BUFFER)
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(DeferredQueueHandler(log_queue))
+        root.setLevel(level)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Writes out the queued records and stops the background writer."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,207 @@
+import os
+import re
+import numpy as np
+from scipy.spatial import cKDTree
+
+from rapid_moves import parse_move_instructions
+from rapid_symbols import MODULE_EXTENSIONS, SymbolTable
+from rapid_references import map_in_workers, worth_a_pool
+from robtarget_batch import ROBTARGET_WIDTH, parse_robtarget_literal, parse_literal_block, _pad_external
+
+DEFAULT_POSITION_TOLERANCE = 0.1  # mm
+DEFAULT_ANGLE_TOLERANCE = 0.1  # deg
+# Inline points further than this from every old point of their module count as added
+DEFAULT_MATCH_RADIUS = 50.0  # mm
+
+INLINE_MOVE_PATTERN = re.compile(r'^[ \t]*Move[JLC]\b[^;]*\[', re.IGNORECASE | re.MULTILINE)
+
+
+class BackupTargets:
+    """Targets of a backup as columns: declared robtargets keyed by (module, name), and inline move points."""
+
+    def __init__(self, modules, names, positions, orientations, inline_modules, inline_lines,
+                 inline_positions, inline_orientations):
+        self.modules = modules
+        self.names = names
+        self.positions = positions
+        self.orientations = orientations
+        self.inline_modules = inline_modules
+        self.inline_lines = inline_lines
+        self.inline_positions = inline_positions
+        self.inline_orientations = inline_orientations
+
+    def __len__(self):
+        return len(self.names) + len(self.inline_modules)
+
+
+def load_module(path):
+    """Declared robtargets and inline move points of one module file."""
+    with open(path, 'r', newline='') as file:
+        text = file.read()
+    symbols = SymbolTable()
+    symbols.update_text(path, text)
+    module = symbols.module_of(path)
+    table, _, _ = symbols.robtarget_table(path)
+    declared = (module, table.names, table.positions, table.orientations)
+
+    inline = (np.empty(0, dtype=np.int64), np.empty((0, 3)), np.empty((0, 4)))
+    # Only modules with inline points need their move instructions parsed
+    if INLINE_MOVE_PATTERN.search(text):
+        moves = parse_move_instructions(text)
+        literal_rows = [i for i, target in enumerate(moves.targets) if target.startswith('[')]
+        literals = [''.join(moves.targets[i].split()) for i in literal_rows]
+        block = parse_literal_block(literals)
+        if block is None:
+            # Some literals are not plain numbers: parse row by row and skip those
+            rows, parsed = [], []
+            for row, literal in zip(literal_rows, literals):
+                try:
+                    pos, ori, cfg, ext = parse_robtarget_literal(literal)
+                except (ValueError, IndexError):
+                    continue
+                pose = pos + ori + cfg + _pad_external(ext)
+                if len(pose) == ROBTARGET_WIDTH:
+                    parsed.append(pose)
+                    rows.append(row)
+            literal_rows = rows
+            block = np.array(parsed, dtype=float).reshape(-1, ROBTARGET_WIDTH)
+        if literal_rows:
+            inline = (moves.lines[literal_rows], block[:, 0:3], block[:, 3:7])
+    return declared, inline
+
+
+def load_backup(directory, extensions=MODULE_EXTENSIONS, workers=None):
+    """Parses every module under a backup directory into a BackupTargets, one worker process per core.
+
+    Small backups are parsed in-process, where starting the workers would cost more than it saves.
+    """
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(extensions))
+    if worth_a_pool(paths, workers):
+        results = map_in_workers(load_module, paths, workers, chunksize=8)
+    else:
+        results = [load_module(path) for path in paths]
+
+    modules, names = [], []
+    inline_modules = []
+    for (module, module_names, _, _), (lines, _, _) in results:
+        modules.extend([module] * len(module_names))
+        names.extend(module_names)
+        inline_modules.extend([module] * len(lines))
+    return BackupTargets(modules, names,
+                         np.concatenate([declared[2] for declared, _ in results] + [np.empty((0, 3))]),
+                         np.concatenate([declared[3] for declared, _ in results] + [np.empty((0, 4))]),
+                         inline_modules,
+                         np.concatenate([inline[0] for _, inline in results] + [np.empty(0, dtype=np.int64)]),
+                         np.concatenate([inline[1] for _, inline in results] + [np.empty((0, 3))]),
+                         np.concatenate([inline[2] for _, inline in results] + [np.empty((0, 4))]))
+
+
+def pose_deltas(old_positions, old_orientations, new_positions, new_orientations):
+    """Row-wise position distance (mm) and rotation angle (deg) between two sets of poses."""
+    distance = np.linalg.norm(new_positions - old_positions, axis=1)
+    dots = np.abs(np.einsum('ij,ij->i', old_orientations, new_orientations))
+    dots /= np.linalg.norm(old_orientations, axis=1) * np.linalg.norm(new_orientations, axis=1)
+    angle = np.degrees(2 * np.arccos(np.clip(dots, 0.0, 1.0)))
+    return distance, angle
+
+
+def match_points(old_points, new_points, radius):
+    """One-to-one nearest matching of new to old points within radius: old row per new row, -1 if none.
+
+    Candidate pairs are taken closest first, ties in row order, so repeated points pair up by
+    occurrence. A new point whose candidates were all taken looks further out.
+    """
+    match = np.full(len(new_points), -1, dtype=np.intp)
+    if not len(old_points) or not len(new_points):
+        return match
+    tree = cKDTree(old_points)
+    taken = np.zeros(len(old_points), dtype=bool)
+    pending = np.arange(len(new_points))
+    k = 4
+    while len(pending):
+        k = min(k, len(old_points))
+        distance, neighbours = tree.query(new_points[pending], k=k, distance_upper_bound=radius)
+        distance, neighbours = distance.reshape(len(pending), k), neighbours.reshape(len(pending), k)
+        rows = np.repeat(pending, k)
+        valid = np.isfinite(distance.ravel())
+        rows, olds, distances = rows[valid], neighbours.ravel()[valid], distance.ravel()[valid]
+        order = np.lexsort((olds, rows, distances))
+        for row, old in zip(rows[order].tolist(), olds[order].tolist()):
+            if match[row] < 0 and not taken[old]:
+                match[row] = old
+                taken[old] = True
+        # Only points whose k candidates were all in range can have free ones further out
+        exhausted = np.isfinite(distance[:, -1])
+        pending = pending[(match[pending] < 0) & exhausted]
+        if k == len(old_points):
+            break
+        k *= 2
+    return match
+
+
+def _module_codes(old_modules, new_modules):
+    codes = {}
+    old = np.array([codes.setdefault(module.lower(), len(codes)) for module in old_modules], dtype=float)
+    new = np.array([codes.setdefault(module.lower(), len(codes)) for module in new_modules], dtype=float)
+    return old, new
+
+
+def diff_backups(old, new, position_tolerance=DEFAULT_POSITION_TOLERANCE, angle_tolerance=DEFAULT_ANGLE_TOLERANCE,
+                 match_radius=DEFAULT_MATCH_RADIUS):
+    """Compares two BackupTargets (or backup directories).
+
+    Declared targets are aligned by module and name; inline move points one-to-one by nearest
+    neighbour within the same module. Returns a dict with 'moved', 'added' and 'removed' lists of
+    (module, target, distance mm, angle deg) rows - target is a name or 'line N' - and the
+    number of 'unchanged' targets.
+    """
+    if isinstance(old, str):
+        old = load_backup(old)
+    if isinstance(new, str):
+        new = load_backup(new)
+    report = {'moved': [], 'added': [], 'removed': [], 'unchanged': 0}
+
+    # Declared targets: hash join on (module, name)
+    old_rows = {(module.lower(), name.lower()): row
+                for row, (module, name) in enumerate(zip(old.modules, old.names))}
+    new_rows = {(module.lower(), name.lower()): row
+                for row, (module, name) in enumerate(zip(new.modules, new.names))}
+    common = [key for key in new_rows if key in old_rows]
+    old_index = np.array([old_rows[key] for key in common], dtype=np.intp)
+    new_index = np.array([new_rows[key] for key in common], dtype=np.intp)
+    distance, angle = pose_deltas(old.positions[old_index], old.orientations[old_index],
+                                  new.positions[new_index], new.orientations[new_index])
+    moved = (distance > position_tolerance) | (angle > angle_tolerance)
+    for row, d, a in zip(new_index[moved].tolist(), distance[moved].tolist(), angle[moved].tolist()):
+        report['moved'].append((new.modules[row], new.names[row], d, a))
+    report['unchanged'] += int((~moved).sum())
+    report['added'].extend((new.modules[row], new.names[row], 0.0, 0.0)
+                           for key, row in new_rows.items() if key not in old_rows)
+    report['removed'].extend((old.modules[row], old.names[row], 0.0, 0.0)
+                             for key, row in old_rows.items() if key not in new_rows)
+
+    # Inline points: nearest free old point of the same module, the module code keeping modules apart
+    old_codes, new_codes = _module_codes(old.inline_modules, new.inline_modules)
+    separation = 4 * match_radius + 1.0
+    old_points = np.column_stack([old.inline_positions, old_codes * separation])
+    new_points = np.column_stack([new.inline_positions, new_codes * separation])
+    nearest = match_points(old_points, new_points, match_radius)
+    matched = nearest >= 0
+
+    new_matched = np.flatnonzero(matched)
+    old_matched = nearest[matched]
+    distance, angle = pose_deltas(old.inline_positions[old_matched], old.inline_orientations[old_matched],
+                                  new.inline_positions[new_matched], new.inline_orientations[new_matched])
+    moved = (distance > position_tolerance) | (angle > angle_tolerance)
+    for row, d, a in zip(new_matched[moved].tolist(), distance[moved].tolist(), angle[moved].tolist()):
+        report['moved'].append((new.inline_modules[row], f"line {new.inline_lines[row]}", d, a))
+    report['unchanged'] += int((~moved).sum())
+    for row in np.flatnonzero(~matched).tolist():
+        report['added'].append((new.inline_modules[row], f"line {new.inline_lines[row]}", 0.0, 0.0))
+    unmatched_old = np.ones(len(old.inline_modules), dtype=bool)
+    unmatched_old[old_matched] = False
+    for row in np.flatnonzero(unmatched_old).tolist():
+        report['removed'].append((old.inline_modules[row], f"line {old.inline_lines[row]}", 0.0, 0.0))
+    return report
@@ -0,0 +1,198 @@
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from robtarget_batch import ROBTARGET_WIDTH, RobtargetTable, parse_literal_block
+from rapid_snapshot import read_snapshot, snapshot_digest, source_digest, write_snapshot
+from app_logging import get_logger
+
+logger = get_logger('moves')
+
+MOVE_PATTERN = re.compile(r'\b(MoveJ|MoveL|MoveC)\b', re.IGNORECASE)
+COORD_PATTERN = re.compile(r'\[(\[[-+]?\d+\.?\d*,[-+]?\d+\.?\d*,[-+]?\d+\.?\d*\],\[[-+]?\d+\.?\d*,[-+]?\d+\.?\d*,[-+]?\d+\.?\d*,[-+]?\d+\.?\d*\],\[[-+]?\d+,[-+]?\d+,[-+]?\d+,[-+]?\d+\],\[(?:9E\+09,){5}9E\+09\])\]')
+
+# Snapshot tag of scan results; change it when what or how the scan extracts changes
+PARSER_VERSION = 'moves/3'
+# Modules are read as Latin-1: any byte decodes, to one character, so character offsets are byte
+# offsets whatever the controller wrote; target literals themselves are plain ASCII
+SOURCE_ENCODING = 'latin-1'
+# Files smaller than this are scanned in-process; a worker pool only pays off on big modules
+CHUNKED_SCAN_THRESHOLD = 64 * 1024 * 1024
+# String literals and comments, which may contain a ';' that does not end a statement
+LINE_NOISE_PATTERN = re.compile(rb'"[^"\n]*"|![^\n]*')
+
+
+def _ends_statement(line):
+    return LINE_NOISE_PATTERN.sub(b'', line).rstrip().endswith(b';')
+
+
+def split_ranges(data, parts):
+    """Cuts a buffer into about `parts` byte ranges at statement boundaries.
+
+    A range only ends right after the newline of a line whose last token (outside strings
+    and comments) is ';', so no statement is split between two ranges.
+    """
+    size = len(data)
+    bounds = [0]
+    for part in range(1, parts):
+        position = max(size * part // parts, bounds[-1])
+        while True:
+            newline = data.find(b'\n', position)
+            if newline == -1:
+                break
+            line_start = data.rfind(b'\n', 0, newline) + 1
+            if _ends_statement(data[line_start:newline]):
+                break
+            position = newline + 1
+        if newline == -1:
+            break
+        if newline + 1 > bounds[-1]:
+            bounds.append(newline + 1)
+    if bounds[-1] != size:
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def scan_text(text):
+    """Inline target literals of the move instructions in a text, first one per line.
+
+    Returns (literals, character offsets (N, 2), 1-based line numbers, number of lines).
+    """
+    literals, offsets, line_numbers = [], [], []
+    line_start = 0
+    # Split on '\n' only, as line_index does; splitlines() would also break at the form
+    # feeds and C1 controls that Latin-1 decodes from cp1252 comments
+    for line_number, line in enumerate(text.split('\n'), start=1):
+        if MOVE_PATTERN.search(line):
+            match = COORD_PATTERN.search(line)
+            if match:
+                literals.append(match.group(1))
+                offsets.append((line_start + match.start(1), line_start + match.end(1)))
+                line_numbers.append(line_number)
+        line_start += len(line) + 1
+    return literals, offsets, line_numbers, text.count('\n')
+
+
+def scan_range(path, start, end):
+    """scan_text over one byte range of a file read through mmap; also returns the range's length."""
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        text = data[start:end].decode(SOURCE_ENCODING)
+    return scan_text(text) + (len(text),)
+
+
+def _scan_range_task(task):
+    return scan_range(*task)
+
+
+def scan_move_literals(path, workers=None, threshold=CHUNKED_SCAN_THRESHOLD, progress=None):
+    """Inline move targets of one module file, with big files split into ranges scanned in parallel.
+
+    The ranges are merged in source order, so the result (and any numbering derived from
+    it) is the same whatever the number of workers. Returns (literals, (N, 17) poses,
+    byte offsets (N, 2), 1-based line numbers). progress, if given, is called with
+    (ranges scanned, ranges) as the ranges complete. Small files, a single core or a
+    worker pool that breaks leave the scan to this process.
+    """
+    size = os.path.getsize(path)
+    workers = workers or os.cpu_count() or 1
+    if size == 0:
+        ranges = []
+    elif workers > 1 and size >= threshold:
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ranges = split_ranges(data, workers * 4)
+    else:
+        ranges = [(0, size)]
+
+    tasks = [(path, start, end) for start, end in ranges]
+    results = []
+    if len(tasks) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for result in pool.map(_scan_range_task, tasks):
+                    results.append(result)
+                    if progress is not None:
+                        progress(len(results), len(tasks))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Worker pool failed, scanning {path} in-process: {e}")
+    # Ranges the pool did not return are scanned here, in order
+    for task in tasks[len(results):]:
+        results.append(_scan_range_task(task))
+        if progress is not None:
+            progress(len(results), len(tasks))
+
+    literals, offsets, line_numbers = [], [], []
+    line_base = char_base = 0
+    for range_literals, range_offsets, range_lines, line_count, char_count in results:
+        literals.extend(range_literals)
+        offsets.extend((start + char_base, end + char_base) for start, end in range_offsets)
+        line_numbers.extend(line + line_base for line in range_lines)
+        line_base += line_count
+        char_base += char_count
+    # COORD_PATTERN only matches plain 17-number literals, so the block parse cannot fail
+    poses = parse_literal_block(literals) if literals else np.empty((0, ROBTARGET_WIDTH))
+    return (literals, poses, np.array(offsets, dtype=np.int64).reshape(-1, 2),
+            np.array(line_numbers, dtype=np.int64))
+
+
+def file_stamp(path):
+    """'size:mtime_ns' of a file, which tells a changed file apart without reading it."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def file_digest(path):
+    """source_digest of a file's bytes, hashed through mmap so a huge module is not copied into memory."""
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return source_digest(b'')
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return source_digest(data)
+
+
+def read_literals(path, offsets):
+    """The literals at stored byte offsets of a file; None if the file no longer has them there."""
+    if not len(offsets):
+        return []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        literals = [data[start:end].decode(SOURCE_ENCODING) for start, end in offsets.tolist()]
+    if all(literal.startswith('[') and literal.endswith(']') for literal in literals):
+        return literals
+    return None
+
+
+def load_move_literals(path, progress=None):
+    """The inline target literals of all move instructions of a module, in source order.
+
+    The scan result is kept as a binary snapshot validated by the file's content digest,
+    so re-opening an unchanged file only hashes it and reads the literals at their stored
+    offsets. The file's size and modification time are checked first, so a file that
+    visibly changed is rescanned without hashing it twice. Huge modules are scanned in
+    byte ranges by several worker processes.
+    """
+    stamp = file_stamp(path)
+    digest = None
+    stored = snapshot_digest(path, PARSER_VERSION)
+    if stored is not None and stored.split('/')[0] == stamp:
+        digest = f"{stamp}/{file_digest(path)}"
+        snapshot = read_snapshot(path, digest, PARSER_VERSION)
+        if snapshot is not None:
+            _, offsets, _ = snapshot
+            literals = read_literals(path, offsets)
+            if literals is not None:
+                return literals
+    if digest is None:
+        # Hashed before the scan, so a file changed while it is scanned does not match next time
+        digest = f"{stamp}/{file_digest(path)}"
+
+    literals, poses, offsets, line_numbers = scan_move_literals(path, progress=progress)
+    table = RobtargetTable([''] * len(literals), None, poses[:, 0:3], poses[:, 3:7],
+                           poses[:, 7:11], poses[:, 11:17])
+    try:
+        write_snapshot(path, digest, table, offsets, line_numbers, PARSER_VERSION)
+    except OSError:
+        pass  # A missing snapshot only costs a re-parse next time
+    return literals
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules import their siblings by bare name, as they do when Main.py runs from this folder
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
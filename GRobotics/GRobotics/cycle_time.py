@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+
+from rapid_moves import MOVE_KIND_CODES, parse_move_instructions
+from rapid_expressions import evaluate_targets
+from rapid_symbols import SymbolTable
+
+# Predefined speeddata: name -> (v_tcp mm/s, v_ori deg/s)
+SPEED_TABLE = {f'v{v}': (float(v), 500.0) for v in
+               (5, 10, 20, 30, 40, 50, 60, 80, 100, 150, 200, 300, 400, 500, 600, 800,
+                1000, 1500, 2000, 2500, 3000, 4000, 5000, 6000, 7000)}
+SPEED_TABLE['vmax'] = (5000.0, 500.0)
+
+# Predefined zonedata: name -> TCP zone radius in mm; None marks a stop point
+ZONE_TABLE = {'fine': None, 'z0': 0.3}
+ZONE_TABLE.update({f'z{z}': float(z) for z in (1, 5, 10, 15, 20, 30, 40, 50, 60, 80, 100, 150, 200)})
+
+DEFAULT_SPEED = SPEED_TABLE['v1000']
+# Nominal TCP acceleration, used for the time lost braking to and accelerating from a fine point
+ACCELERATION = 5000.0
+
+
+def resolve_poses(texts, declarations, numbers=None):
+    """Positions (N, 3) and RAPID quaternions (N, 4) for argument texts; unresolved rows are NaN."""
+    poses = evaluate_targets(texts, declarations, numbers)
+    return poses[:, 0:3], poses[:, 3:7]
+
+
+def arc_lengths(start, via, end):
+    """Length of the circular arc start -> via -> end for each row; straight lines if collinear."""
+    a = via - start
+    b = end - start
+    normal = np.cross(a, b)
+    denominator = 2 * np.einsum('ij,ij->i', normal, normal)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centre = start + (np.einsum('ij,ij->i', a, a)[:, None] * np.cross(b, normal)
+                          + np.einsum('ij,ij->i', b, b)[:, None] * np.cross(normal, a)) / denominator[:, None]
+        radius = np.linalg.norm(start - centre, axis=1)
+
+        def angle(u, v):
+            cosine = np.einsum('ij,ij->i', u, v) / (np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1))
+            return np.arccos(np.clip(cosine, -1.0, 1.0))
+
+        length = radius * (angle(start - centre, via - centre) + angle(via - centre, end - centre))
+    straight = np.linalg.norm(a, axis=1) + np.linalg.norm(end - via, axis=1)
+    return np.where(denominator > 1e-9, length, straight)
+
+
+def _leading_numbers(value, count):
+    """The first count fields of a parsed aggregate as floats (TRUE/FALSE as 1/0), or None."""
+    if not isinstance(value, list) or len(value) < count:
+        return None
+    fields = value[:count]
+    if not all(isinstance(field, (bool, float)) for field in fields):
+        return None
+    return [float(field) for field in fields]
+
+
+def module_data(text):
+    """Robtarget and num declarations plus speed and zone tables (predefined and declared) of a module."""
+    # One scan of the module indexes all four data types
+    symbols = SymbolTable()
+    symbols.update_text('module', text)
+    declarations = symbols.literal_values('robtarget')
+    numbers = symbols.literal_values('num')
+    speeds = dict(SPEED_TABLE)
+    for name, value in symbols.literal_values('speeddata').items():
+        fields = _leading_numbers(value, 2)
+        if fields is not None:
+            speeds[name] = (fields[0], fields[1])
+    zones = dict(ZONE_TABLE)
+    for name, value in symbols.literal_values('zonedata').items():
+        fields = _leading_numbers(value, 2)
+        if fields is not None:
+            zones[name] = None if fields[0] else fields[1]
+    return declarations, numbers, speeds, zones
+
+
+def stop_points(moves, zones):
+    """Boolean column marking moves that end in a fine point (without a \\Z override)."""
+    stop_lookup = np.array([zones.get(name, 0.0) is None for name in moves.zone_names] or [False])
+    return stop_lookup[moves.zone_codes] & np.isnan(moves.zone_overrides)
+
+
+def estimate_moves(moves, text):
+    """Per-move segment length (mm), reorientation (deg) and time (s) for a parsed module.
+
+    A move's segment starts at the previous move of the same routine; the first move of a
+    routine has no known start and contributes nothing. Unresolvable targets give NaN rows.
+    """
+    declarations, numbers, speeds, zones = module_data(text)
+    positions, orientations = resolve_poses(moves.targets, declarations, numbers)
+    via_positions, _ = resolve_poses(moves.via_points, declarations, numbers)
+
+    count = len(moves)
+    starts = np.roll(positions, 1, axis=0)
+    start_orientations = np.roll(orientations, 1, axis=0)
+    has_start = np.zeros(count, dtype=bool)
+    has_start[1:] = moves.routine_codes[1:] == moves.routine_codes[:-1]
+
+    lengths = np.linalg.norm(positions - starts, axis=1)
+    circular = moves.kinds == MOVE_KIND_CODES['MOVEC']
+    if circular.any():
+        lengths[circular] = arc_lengths(starts[circular], via_positions[circular], positions[circular])
+
+    # Angle between consecutive orientations: 2 * acos(|q1 . q2|)
+    dots = np.abs(np.einsum('ij,ij->i', start_orientations, orientations))
+    dots /= np.linalg.norm(start_orientations, axis=1) * np.linalg.norm(orientations, axis=1)
+    angles = np.degrees(2 * np.arccos(np.clip(dots, 0.0, 1.0)))
+
+    # Lookup tables indexed by the move table's speed/zone codes
+    speed_lookup = np.array([speeds.get(name, DEFAULT_SPEED) for name in moves.speed_names] or [DEFAULT_SPEED],
+                            dtype=float)
+    v_tcp = np.where(np.isnan(moves.speed_overrides), speed_lookup[moves.speed_codes, 0], moves.speed_overrides)
+    v_ori = speed_lookup[moves.speed_codes, 1]
+    stops = stop_points(moves, zones)
+
+    times = np.maximum(lengths / v_tcp, angles / v_ori)
+    times = np.where(np.isnan(moves.time_overrides), times, moves.time_overrides)
+    times = times + np.where(stops, v_tcp / ACCELERATION, 0.0)
+
+    lengths[~has_start] = 0.0
+    angles[~has_start] = 0.0
+    times[~has_start] = 0.0
+    return lengths, angles, times
+
+
+def estimate_routines(moves, text):
+    """{routine: {'moves', 'length_mm', 'reorientation_deg', 'time_s', 'unresolved'}} for one module."""
+    lengths, angles, times = estimate_moves(moves, text)
+    unresolved = np.isnan(times)
+    codes = moves.routine_codes
+    bins = len(moves.routine_names)
+    totals = {
+        'moves': np.bincount(codes, minlength=bins),
+        'length_mm': np.bincount(codes, np.nan_to_num(lengths), minlength=bins),
+        'reorientation_deg': np.bincount(codes, np.nan_to_num(angles), minlength=bins),
+        'time_s': np.bincount(codes, np.nan_to_num(times), minlength=bins),
+        'unresolved': np.bincount(codes, unresolved, minlength=bins).astype(int),
+    }
+    return {name: {key: values[i].item() for key, values in totals.items()}
+            for i, name in enumerate(moves.routine_names) if totals['moves'][i]}
+
+
+def estimate_file(file_path):
+    with open(file_path, 'r', newline='') as file:
+        text = file.read()
+    return estimate_routines(parse_move_instructions(text), text)
+
+
+def estimate_backup(directory, extensions=('.mod', '.modx')):
+    """Estimates every module under a backup directory: {file path: {routine: totals}}."""
+    results = {}
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                path = os.path.join(root, name)
+                results[path] = estimate_file(path)
+    return results
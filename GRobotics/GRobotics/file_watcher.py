@@ -0,0 +1,110 @@
+import os
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+# Quiet time after the last write before a change is reported, so a burst of writes is one change
+DEBOUNCE_MS = 300
+# Fallback poll of the watched files' size and modification time
+POLL_INTERVAL_MS = 1000
+
+
+def file_stamp(path):
+    """(modification time in ns, size) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher(QObject):
+    """Emits fileChanged once per settled change of a watched file.
+
+    Changes come from QFileSystemWatcher (inotify on Linux) and from a cheap stat() poll,
+    which catches what the native watcher misses: network shares, paths it refused and
+    files replaced by a rename, which drop the native watch until it is added again.
+    Events are debounced, and a change is only reported if the size or modification
+    time differs from the last report, so the two sources never double up.
+    """
+    fileChanged = pyqtSignal(str)
+
+    def __init__(self, parent=None, debounce=DEBOUNCE_MS, poll_interval=POLL_INTERVAL_MS, native=True):
+        super().__init__(parent)
+        self.stamps = {}     # path -> (mtime, size) at the last report, None if missing
+        self.pending = set()
+        self.watcher = None
+        if native:
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.fileChanged.connect(self.on_changed)
+            self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce)
+        self.debounce_timer.timeout.connect(self.flush)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_interval)
+        self.poll_timer.timeout.connect(self.poll)
+
+    def watch(self, path):
+        path = os.path.abspath(path)
+        if path in self.stamps:
+            return
+        self.stamps[path] = file_stamp(path)
+        self._add_native(path)
+        if not self.poll_timer.isActive():
+            self.poll_timer.start()
+
+    def unwatch(self, path):
+        path = os.path.abspath(path)
+        if path not in self.stamps:
+            return
+        del self.stamps[path]
+        self.pending.discard(path)
+        if self.watcher is not None:
+            self.watcher.removePath(path)
+            directory = os.path.dirname(path)
+            if not any(os.path.dirname(other) == directory for other in self.stamps):
+                self.watcher.removePath(directory)
+        if not self.stamps:
+            self.poll_timer.stop()
+
+    def watched(self):
+        return list(self.stamps)
+
+    def _add_native(self, path):
+        if self.watcher is None:
+            return
+        # The folder is watched too, so a file re-created by a rename is noticed right away
+        if os.path.exists(path) and path not in self.watcher.files():
+            self.watcher.addPath(path)
+        directory = os.path.dirname(path)
+        if os.path.isdir(directory) and directory not in self.watcher.directories():
+            self.watcher.addPath(directory)
+
+    def on_changed(self, path):
+        if path in self.stamps:
+            self.pending.add(path)
+            self.debounce_timer.start()
+
+    def on_directory_changed(self, directory):
+        for path in self.stamps:
+            if os.path.dirname(path) == directory and file_stamp(path) != self.stamps[path]:
+                self.on_changed(path)
+
+    def poll(self):
+        for path, stamp in self.stamps.items():
+            if path not in self.pending and file_stamp(path) != stamp:
+                self.on_changed(path)
+
+    def flush(self):
+        """Reports the pending paths whose content really changed since their last report."""
+        pending, self.pending = self.pending, set()
+        for path in sorted(pending):
+            if path not in self.stamps:
+                continue  # Unwatched while the change was settling
+            stamp = file_stamp(path)
+            if stamp == self.stamps[path]:
+                continue
+            self.stamps[path] = stamp
+            self._add_native(path)
+            self.fileChanged.emit(path)
@@ -1,5 +1,4 @@
 import sys
-import logging
 import ctypes
 import os
 import psutil
@@ -14,7 +13,6 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
 import sys
-import logging
 import ctypes
 import os
 import psutil
@@ -32,6 +30,10 @@ from PyQt5.QtGui import QFont
 from GUI_settings import (set_dark_theme, set_light_theme, set_button_style, 
                           set_title_font, set_input_field_style, set_output_text_style,
                           set_common_stylesheet)
+from perf_monitor import measured
+from app_logging import setup_logging, get_logger
+
+logger = get_logger('ip_configurator')
 
 class IPConfiguratorApp(QMainWindow):
     def __init__(self):
@@ -59,9 +61,8 @@ class IPConfiguratorApp(QMainWindow):
         # Create UI elements
         self.create_ui()
         
-        # Set up logging (file only, no console output)
-        logging.basicConfig(filename='ip_configurator.log', level=logging.INFO,
-                            format='%(asctime)s - %(levelname)s - %(message)s')
+        # Set up logging (file only, no console output); this tool also writes ip_configurator.log
+        setup_logging()
         
         # Populate network interfaces
         self.populate_network_interfaces()
@@ -135,6 +136,7 @@ class IPConfiguratorApp(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Ready")
 
+    @measured('Refresh network interfaces')
     def populate_network_interfaces(self):
         interfaces = self.get_network_interfaces()
         self.interface_combo.clear()
@@ -156,9 +158,9 @@ class IPConfiguratorApp(QMainWindow):
                     ip = self.get_interface_ip(addrs)
                     interfaces.append((nic, status, ip))
             
-            logging.info(f"Detected {len(interfaces)} interfaces")
+            logger.info(f"Detected {len(interfaces)} interfaces")
         except Exception as e:
-            logging.error(f"Error detecting network interfaces: {str(e)}")
+            logger.error(f"Error detecting network interfaces: {str(e)}")
         
         return interfaces
     
@@ -201,13 +203,13 @@ class IPConfiguratorApp(QMainWindow):
             else:
                 config["dns"] = "Automatic"
             
-            logging.info(f"Retrieved current config for {interface}")
+            logger.info(f"Retrieved current config for {interface}")
             return config
         except subprocess.CalledProcessError as e:
-            logging.error(f"Error executing netsh command for {interface}: {str(e)}")
+            logger.error(f"Error executing netsh command for {interface}: {str(e)}")
             return {"ip": "", "subnet": "", "gateway": "", "dns": ""}
         except Exception as e:
-            logging.error(f"Error getting IP config for {interface}: {str(e)}")
+            logger.error(f"Error getting IP config for {interface}: {str(e)}")
             return {"ip": "", "subnet": "", "gateway": "", "dns": ""}
     
     def update_ip_fields(self):
@@ -220,7 +222,7 @@ class IPConfiguratorApp(QMainWindow):
         self.dns_entry.setText(current_config["dns"])
 
         # Log the updated configuration to the file only
-        logging.info(f"Updated configuration for {interface}: {current_config}")
+        logger.info(f"Updated configuration for {interface}: {current_config}")
 
 
     def toggle_ip_fields(self):
@@ -230,6 +232,7 @@ class IPConfiguratorApp(QMainWindow):
         self.gateway_entry.setEnabled(enabled)
         self.dns_entry.setEnabled(enabled)
 
+    @measured('Apply IP settings')
     def apply_settings(self):
         interface = self.interface_combo.currentText()
         if self.dhcp_checkbox.isChecked():
@@ -351,7 +354,7 @@ class IPConfiguratorApp(QMainWindow):
         """
         Log a message to the file only, not to the UI.
         """
-        logging.info(message)
+        logger.info(message)
 
     def closeEvent(self, event):
         event.accept()
@@ -0,0 +1,271 @@
+import os
+import sys
+
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit,
+                             QComboBox, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+                             QFileDialog)
+from PyQt5.QtCore import QTimer
+
+from GUI_settings import set_button_style, set_common_stylesheet
+from chunked_scan import load_move_literals
+from job_queue import JobQueue, HIGH, NORMAL, LOW, PRIORITY_NAMES, QUEUED, RUNNING, DONE, FAILED, CANCELLED
+from rapid_symbols import MODULE_EXTENSIONS
+from target_pipeline import Pipeline, module_paths, read_modules, load_frames
+
+PARSE, EXPORT, CONVERT = 'Parse moves', 'Export targets', 'Convert targets'
+REFRESH_INTERVAL_MS = 250
+COLUMNS = ['Job', 'Source', 'Priority', 'Status', 'Progress', 'Duration', 'Items/s', 'Result']
+
+
+def is_job_source(path):
+    """Whether a dropped path can be queued: a folder or a module file."""
+    return os.path.isdir(path) or path.lower().endswith(MODULE_EXTENSIONS)
+
+
+def output_path(source, output_dir, suffix):
+    """<output_dir>/<source name>_<suffix>.mod, next to the source if no folder is given."""
+    name = os.path.splitext(os.path.basename(os.path.normpath(source)))[0]
+    directory = output_dir or os.path.dirname(os.path.normpath(source))
+    return os.path.join(directory, f"{name}_{suffix}.mod")
+
+
+def parse_job(job, path):
+    """Scans the inline move targets of one module and refreshes its snapshot."""
+    literals = load_move_literals(path, progress=lambda done, total: job.report(done / total))
+    job.report(items=len(literals))
+    return f"{len(literals)} move targets"
+
+
+def _read_sources(job, paths):
+    for number, path in enumerate(paths, start=1):
+        job.check_cancelled()
+        yield from read_modules(path)
+        job.report(progress=number / len(paths))
+
+
+def export_job(job, source, destination, frame_names=None):
+    """Streams the robtargets of a module or backup into a new module, optionally converted."""
+    pipeline = Pipeline(_read_sources(job, module_paths(source)))
+    if frame_names:
+        frames = load_frames(source)
+        missing = [name for name in frame_names if name not in frames]
+        if missing:
+            raise ValueError(f"Unknown wobjdata: {', '.join(missing)}")
+        pipeline.convert(frames[frame_names[0]], frames[frame_names[1]])
+    pipeline.format().write(destination)
+    rows = 0
+    try:
+        for lines in pipeline:
+            rows += len(lines)
+            job.report(items=rows)
+            job.check_cancelled()
+    except BaseException:
+        # Closing the stream closes the half-written file so it can be removed
+        iter(pipeline).close()
+        if os.path.exists(destination):
+            os.remove(destination)
+        raise
+    return f"{rows} targets -> {destination}"
+
+
+class JobPanel(QWidget):
+    """Queue of batch jobs over dropped module files and folders, with their progress and rates."""
+
+    def __init__(self, parent=None, queue=None):
+        super().__init__(parent)
+        self.queue = queue or JobQueue()
+        self.rows = {}   # job id -> table row
+        self.shown = {}  # job id -> texts last shown, so unchanged rows are not touched
+        self.current_theme = 'dark'
+        self.initUI()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(REFRESH_INTERVAL_MS)
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+
+        add_layout = QHBoxLayout()
+        add_layout.addWidget(QLabel("Drop .mod files or folders on the window, or:"))
+        self.add_files_button = QPushButton('Add Files...', self)
+        self.add_files_button.clicked.connect(self.add_files)
+        add_layout.addWidget(self.add_files_button)
+        self.add_folder_button = QPushButton('Add Folder...', self)
+        self.add_folder_button.clicked.connect(self.add_folder)
+        add_layout.addWidget(self.add_folder_button)
+        add_layout.addStretch()
+        layout.addLayout(add_layout)
+
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Job:"))
+        self.kind_combo = QComboBox()
+        self.kind_combo.addItems([PARSE, EXPORT, CONVERT])
+        options_layout.addWidget(self.kind_combo)
+        options_layout.addWidget(QLabel("Priority:"))
+        self.priority_combo = QComboBox()
+        for priority in (HIGH, NORMAL, LOW):
+            self.priority_combo.addItem(PRIORITY_NAMES[priority], priority)
+        self.priority_combo.setCurrentIndex(1)
+        options_layout.addWidget(self.priority_combo)
+        options_layout.addWidget(QLabel("From:"))
+        self.from_frame_input = QLineEdit('Wobj0')
+        options_layout.addWidget(self.from_frame_input)
+        options_layout.addWidget(QLabel("To:"))
+        self.to_frame_input = QLineEdit('Wobj0')
+        options_layout.addWidget(self.to_frame_input)
+        self.output_dir_input = QLineEdit()
+        self.output_dir_input.setPlaceholderText("Output folder (default: next to the source)")
+        options_layout.addWidget(self.output_dir_input)
+        self.browse_button = QPushButton('Browse', self)
+        self.browse_button.clicked.connect(self.browse_output_dir)
+        options_layout.addWidget(self.browse_button)
+        layout.addLayout(options_layout)
+
+        self.job_table = QTableWidget(0, len(COLUMNS), self)
+        self.job_table.setHorizontalHeaderLabels(COLUMNS)
+        self.job_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.job_table.verticalHeader().hide()
+        self.job_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.job_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.job_table, 1)
+
+        buttons_layout = QHBoxLayout()
+        self.cancel_button = QPushButton('Cancel Selected', self)
+        self.cancel_button.clicked.connect(self.cancel_selected)
+        buttons_layout.addWidget(self.cancel_button)
+        self.retry_button = QPushButton('Retry Selected', self)
+        self.retry_button.clicked.connect(self.retry_selected)
+        buttons_layout.addWidget(self.retry_button)
+        self.clear_button = QPushButton('Clear Finished', self)
+        self.clear_button.clicked.connect(self.clear_finished)
+        buttons_layout.addWidget(self.clear_button)
+        layout.addLayout(buttons_layout)
+
+        self.summary_label = QLabel("No jobs", self)
+        layout.addWidget(self.summary_label)
+
+        self.apply_theme()
+
+    def set_theme(self, theme):
+        self.current_theme = theme
+        self.apply_theme()
+
+    def apply_theme(self):
+        self.setStyleSheet(set_common_stylesheet(self.current_theme))
+        for button in self.findChildren(QPushButton):
+            set_button_style(button, self.current_theme)
+
+    def add_files(self):
+        file_names, _ = QFileDialog.getOpenFileNames(self, "Select Modules", "", "RAPID Modules (*.mod *.modx *.sys);;All Files (*)")
+        self.enqueue_paths(file_names)
+
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Backup Folder")
+        if folder:
+            self.enqueue_paths([folder])
+
+    def browse_output_dir(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+        if folder:
+            self.output_dir_input.setText(folder)
+
+    def enqueue_paths(self, paths):
+        """Queues the selected job for each path; parse jobs get one job per module of a folder."""
+        kind = self.kind_combo.currentText()
+        priority = self.priority_combo.currentData()
+        output_dir = self.output_dir_input.text().strip()
+        jobs = []
+        for path in paths:
+            if not is_job_source(path):
+                continue
+            if kind == PARSE:
+                for module in module_paths(path):
+                    jobs.append(self.queue.submit(os.path.basename(module), parse_job, module,
+                                                  priority=priority, kind=kind))
+            elif kind == EXPORT:
+                jobs.append(self.queue.submit(os.path.basename(os.path.normpath(path)), export_job, path,
+                                              output_path(path, output_dir, 'targets'),
+                                              priority=priority, kind=kind))
+            else:
+                frame_names = (self.from_frame_input.text().strip() or 'Wobj0',
+                               self.to_frame_input.text().strip() or 'Wobj0')
+                jobs.append(self.queue.submit(os.path.basename(os.path.normpath(path)), export_job, path,
+                                              output_path(path, output_dir, 'converted'), frame_names,
+                                              priority=priority, kind=kind))
+        self.refresh()
+        return jobs
+
+    def selected_jobs(self):
+        rows = {index.row() for index in self.job_table.selectionModel().selectedRows()}
+        return [job for job in self.queue.jobs() if self.rows.get(job.id) in rows]
+
+    def cancel_selected(self):
+        for job in self.selected_jobs():
+            self.queue.cancel(job)
+        self.refresh()
+
+    def retry_selected(self):
+        for job in self.selected_jobs():
+            self.queue.retry(job)
+        self.refresh()
+
+    def clear_finished(self):
+        self.queue.clear_finished()
+        self.job_table.setRowCount(0)
+        self.rows, self.shown = {}, {}
+        self.refresh()
+
+    @staticmethod
+    def job_texts(job):
+        duration = job.duration()
+        rate = job.throughput()
+        result = job.error if job.status == FAILED else (job.result or '')
+        if job.attempts > 1:
+            result = f"(attempt {job.attempts}) {result}"
+        return (job.kind, job.name, PRIORITY_NAMES[job.priority], job.status,
+                f"{job.progress * 100:.0f}%" if job.status != QUEUED else '',
+                f"{duration:.2f} s" if duration is not None else '',
+                f"{rate:,.0f}" if rate is not None else '', result)
+
+    def refresh(self):
+        """Shows the jobs' current state; only rows whose text changed are updated."""
+        jobs = self.queue.jobs()
+        for job in jobs:
+            row = self.rows.get(job.id)
+            if row is None:
+                row = self.rows[job.id] = self.job_table.rowCount()
+                self.job_table.insertRow(row)
+            texts = self.job_texts(job)
+            if self.shown.get(job.id) == texts:
+                continue
+            self.shown[job.id] = texts
+            for column, text in enumerate(texts):
+                self.job_table.setItem(row, column, QTableWidgetItem(text))
+
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+        for job in jobs:
+            counts[job.status] += 1
+        done = [job for job in jobs if job.status == DONE]
+        items = sum(job.items for job in done)
+        seconds = sum(job.duration() for job in done)
+        summary = ", ".join(f"{count} {status.lower()}" for status, count in counts.items() if count)
+        if done and seconds > 0:
+            summary += f" - {items:,} items in {seconds:.2f} s of work ({items / seconds:,.0f} items/s)"
+        self.summary_label.setText(summary or "No jobs")
+
+    def shutdown(self):
+        self.refresh_timer.stop()
+        self.queue.shutdown()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    panel = JobPanel()
+    panel.enqueue_paths(sys.argv[1:])
+    panel.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,168 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'Queued', 'Running', 'Done', 'Failed', 'Cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+HIGH, NORMAL, LOW = 2, 1, 0
+PRIORITY_NAMES = {HIGH: 'High', NORMAL: 'Normal', LOW: 'Low'}
+# Worker threads by default; the heavy scans start their own processes for big files
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class JobCancelled(Exception):
+    """Raised by Job.check_cancelled() to stop a job that was cancelled while running."""
+
+
+class Job:
+    """One unit of work: function(job, *args), which may call report() and check_cancelled().
+
+    Workers write the fields and the panel only reads them, so no locking is needed to
+    display a job; items is whatever the job counts (targets, rows) for its throughput.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, name, function, args=(), priority=NORMAL, kind=''):
+        self.id = next(self._ids)
+        self.name = name
+        self.kind = kind
+        self.function = function
+        self.args = args
+        self.priority = priority
+        self.attempts = 0
+        self._cancel = threading.Event()
+        self.reset()
+
+    def reset(self):
+        self.status = QUEUED
+        self.progress = 0.0
+        self.items = 0
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._cancel.clear()
+
+    def report(self, progress=None, items=None):
+        if progress is not None:
+            self.progress = min(max(progress, 0.0), 1.0)
+        if items is not None:
+            self.items = items
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def duration(self):
+        """Seconds spent running so far, None if it never started."""
+        if self.started is None:
+            return None
+        return (self.finished or time.perf_counter()) - self.started
+
+    def throughput(self):
+        """Items per second, None until something was counted."""
+        duration = self.duration()
+        if not self.items or not duration:
+            return None
+        return self.items / duration
+
+
+class JobQueue:
+    """Runs jobs on a bounded pool of worker threads, highest priority first, then in order.
+
+    Cancelling a queued job removes it from the run order at once; a running job stops at
+    its next check_cancelled(). Failed and cancelled jobs can be retried as they are.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.max_workers = max_workers
+        self._jobs = []
+        self._heap = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._workers = []
+        self._stopped = False
+
+    def submit(self, name, function, *args, priority=NORMAL, kind=''):
+        job = Job(name, function, args, priority, kind)
+        with self._condition:
+            self._jobs.append(job)
+            self._push(job)
+        return job
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (-job.priority, next(self._order), job))
+        if len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._run, name=f'job-worker-{len(self._workers) + 1}', daemon=True)
+            self._workers.append(worker)
+            worker.start()
+        self._condition.notify()
+
+    def cancel(self, job):
+        with self._condition:
+            job._cancel.set()
+            if job.status == QUEUED:
+                job.status = CANCELLED  # Skipped when the worker pops it
+
+    def retry(self, job):
+        """Queues a failed or cancelled job again; returns False if it is not finished that way."""
+        with self._condition:
+            if job.status not in (FAILED, CANCELLED):
+                return False
+            job.reset()
+            # A job cancelled while queued still has its place in the run order
+            if any(entry[2] is job for entry in self._heap):
+                self._condition.notify()
+            else:
+                self._push(job)
+        return True
+
+    def jobs(self):
+        with self._condition:
+            return list(self._jobs)
+
+    def clear_finished(self):
+        with self._condition:
+            self._jobs = [job for job in self._jobs if job.status not in FINISHED]
+
+    def shutdown(self):
+        """Cancels everything and lets the workers exit once their current job returns."""
+        with self._condition:
+            self._stopped = True
+            for job in self._jobs:
+                job._cancel.set()
+                if job.status == QUEUED:
+                    job.status = CANCELLED
+            self._heap = []
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                _, _, job = heapq.heappop(self._heap)
+                if job.status != QUEUED:
+                    continue  # Cancelled while waiting
+                job.status = RUNNING
+                job.attempts += 1
+                job.started = time.perf_counter()
+            try:
+                job.result = job.function(job, *job.args)
+                status = CANCELLED if job.cancelled() else DONE
+            except JobCancelled:
+                status = CANCELLED
+            except Exception as e:
+                job.error = str(e)
+                status = FAILED
+            job.finished = time.perf_counter()
+            if status == DONE:
+                job.progress = 1.0
+            job.status = status
@@ -0,0 +1,105 @@
+import mmap
+import os
+
+import numpy as np
+
+from chunked_scan import SOURCE_ENCODING
+
+# Newline scan block: small enough to stay in cache, big enough to keep NumPy calls few
+BLOCK_SIZE = 4 * 1024 * 1024
+SEARCH_BLOCK_SIZE = 16 * 1024 * 1024
+# Longest part of a line handed out for display; the rest is cut off
+MAX_LINE_LENGTH = 4096
+
+
+class LineIndex:
+    """Start offsets of every line of a file, found in one pass over a read-only mmap.
+
+    Lines are only decoded when asked for, so opening costs one vectorized newline scan
+    and 4 bytes per line (8 beyond 4 GB), whatever the file size.
+    """
+
+    def __init__(self, path, block_size=BLOCK_SIZE):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        dtype = np.uint32 if self.size < 2 ** 32 else np.int64
+        pieces = [np.zeros(1, dtype=dtype)]
+        for offset in range(0, self.size, block_size):
+            block = np.frombuffer(self.data, dtype=np.uint8, count=min(block_size, self.size - offset),
+                                  offset=offset)
+            pieces.append((np.flatnonzero(block == 10) + (offset + 1)).astype(dtype))
+            del block  # The mmap cannot be closed while an array still views it
+        starts = np.concatenate(pieces)
+        # A final newline ends the last line rather than starting an empty one
+        if self.size and starts[-1] == self.size:
+            starts = starts[:-1]
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def span(self, number):
+        """(start, end) byte offsets of a 0-based line, without its line break."""
+        start = int(self.starts[number])
+        end = int(self.starts[number + 1]) if number + 1 < len(self.starts) else self.size
+        while end > start and self.data[end - 1:end] in (b'\n', b'\r'):
+            end -= 1
+        return start, end
+
+    def line(self, number, limit=MAX_LINE_LENGTH):
+        start, end = self.span(number)
+        return self.data[start:min(end, start + limit)].decode(SOURCE_ENCODING)
+
+    def lines(self, first, count):
+        """Up to count consecutive lines from a 0-based line, decoded with one slice of the map."""
+        last = min(first + count, len(self.starts))
+        if first >= last:
+            return []
+        start = int(self.starts[first])
+        end = int(self.starts[last]) if last < len(self.starts) else self.size
+        # Split on '\n' only, as the index does; splitlines() would also break at form feeds
+        text = self.data[start:end].decode(SOURCE_ENCODING)
+        return [line[:-1] if line.endswith('\r') else line for line in text.split('\n')[:last - first]]
+
+    def line_of(self, offset):
+        """0-based line holding a byte offset."""
+        return int(np.searchsorted(self.starts, offset, side='right')) - 1
+
+    def find(self, text, start=0, end=None, ignore_case=True):
+        """Byte offset of the first occurrence of text in start..end, or -1.
+
+        Case-insensitive search lower-cases one block at a time, which is several times
+        faster than an IGNORECASE regex over the mmap.
+        """
+        try:
+            needle = text.encode(SOURCE_ENCODING)
+        except UnicodeEncodeError:
+            return -1  # No decoded line can hold a character outside the encoding
+        end = self.size if end is None else end
+        if not ignore_case:
+            return self.data.find(needle, start, end)
+        needle = needle.lower()
+        for offset in range(start, end, SEARCH_BLOCK_SIZE):
+            block = self.data[offset:min(offset + SEARCH_BLOCK_SIZE + len(needle) - 1, end)].lower()
+            found = block.find(needle)
+            if found != -1:
+                return offset + found
+        return -1
+
+    def search(self, text, start_line=0, ignore_case=True):
+        """First line at or after start_line containing text, wrapping around the end; None if absent."""
+        if not text or not len(self.starts):
+            return None
+        start = int(self.starts[start_line % len(self.starts)])
+        found = self.find(text, start, ignore_case=ignore_case)
+        if found == -1:
+            # One byte per character, so the wrapped search stops where the first one started
+            found = self.find(text, 0, start + len(text) - 1, ignore_case)
+        return None if found == -1 else self.line_of(found)
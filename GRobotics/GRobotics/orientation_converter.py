@@ -1,6 +1,5 @@
 import sys
 import traceback
-import logging
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QLineEdit, QComboBox, QStackedWidget, 
                              QTextEdit, QTabWidget,QRadioButton,QButtonGroup,QSizePolicy)
@@ -16,6 +15,11 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from GUI_settings import (set_dark_theme, set_light_theme, set_button_style, set_title_font,
                           set_common_stylesheet, set_input_field_style,
                           set_output_text_style, set_tab_widget_style)
+from perf_monitor import measured
+import tracing
+from app_logging import get_logger
+
+logger = get_logger('orientation_converter')
 
 class OrientationConverter(QMainWindow):
     def __init__(self):
@@ -226,22 +230,22 @@ class OriConverter(QWidget):
     def on_input_type_change(self, index):
         self.input_stack.setCurrentIndex(index)
 
+    @measured('Convert orientation')
+    @tracing.traced('orientation.convert')
     def convert_orientation(self):
-        print("Convert button clicked")  # Debug print
         input_type = self.input_type.currentText()
         input_widget = self.input_stack.currentWidget()
         input_data = [float(child.text()) for child in input_widget.findChildren(QLineEdit)]
-        print(f"Input type: {input_type}")  # Debug print
-        print(f"Input data: {input_data}")  # Debug print
+        tracing.event('orientation.input', input_type=input_type, input_data=input_data)
 
         try:
             rotation = self.create_rotation(input_type, input_data)
             self.update_outputs(rotation, input_type, input_data)
             self.current_rotation = rotation
         except Exception as e:
-            print(f"Error in conversion: {str(e)}")  # Debug print
-            logging.error(f"Error in OrientationConverter.convert_orientation: {str(e)}")
-            logging.debug(traceback.format_exc())
+            tracing.event('orientation.error', error=str(e))
+            logger.error(f"Error in OrientationConverter.convert_orientation: {str(e)}")
+            logger.debug(traceback.format_exc())
 
     def create_rotation(self, input_type, input_data):
         if input_type == 'Quaternion':
@@ -262,8 +266,8 @@ class OriConverter(QWidget):
             else:
                 return R.from_euler('zyx', input_data)
 
+    @tracing.traced('orientation.update_outputs')
     def update_outputs(self, rotation, input_type, input_data):
-        print("Updating outputs")  # Debug print
         quat = rotation.as_quat()
         euler_deg = rotation.as_euler('zyx', degrees=True)
         euler_rad = rotation.as_euler('zyx', degrees=False)
@@ -275,19 +279,20 @@ class OriConverter(QWidget):
         self.update_matrix_output(matrix)
         self.update_axis_angle_output(rotvec)
 
+    @tracing.traced('orientation.quaternion_output')
     def update_quaternion_output(self, quat):
         output = (f"<b>Quaternion [w, x, y, z]:</b><br>"
                   f"w: {quat[3]:.6f}<br>x: {quat[0]:.6f}<br>y: {quat[1]:.6f}<br>z: {quat[2]:.6f}")
         self.quaternion_output.setHtml(output)
-        print("Quaternion output updated")  # Debug print
 
+    @tracing.traced('orientation.euler_output')
     def update_euler_output(self, euler_deg, euler_rad):
         output = (f"<b>Euler Angles (zyx order):</b><br>"
                   f"Degrees:<br>z: {euler_deg[0]:.6f}°<br>y: {euler_deg[1]:.6f}°<br>x: {euler_deg[2]:.6f}°<br><br>"
                   f"Radians:<br>z: {euler_rad[0]:.6f}<br>y: {euler_rad[1]:.6f}<br>x: {euler_rad[2]:.6f}")
         self.euler_output.setHtml(output)
-        print("Euler output updated")  # Debug print
 
+    @tracing.traced('orientation.matrix_output')
     def update_matrix_output(self, matrix):
         output = "<b>Rotation Matrix:</b><br>["
         for i, row in enumerate(matrix):
@@ -298,8 +303,8 @@ class OriConverter(QWidget):
                 output += "<br>"
         output += "]"
         self.rotation_matrix_output.setHtml(output)
-        print("Matrix output updated")  # Debug print
 
+    @tracing.traced('orientation.axis_angle_output')
     def update_axis_angle_output(self, rotvec):
         angle = np.linalg.norm(rotvec)
         axis = rotvec / angle if angle != 0 else np.array([0, 0, 1])
@@ -318,7 +323,6 @@ class OriConverter(QWidget):
                   f"y: {rotvec[1]:.6f}<br>"
                   f"x: {rotvec[0]:.6f}")
         self.axis_angle_output.setHtml(output)
-        print("Axis-Angle output updated")  # Debug print
 
     def apply_theme(self, theme):
         set_input_field_style(self.input_type, theme)
@@ -339,7 +343,7 @@ class OriConverter(QWidget):
             self.parent.visualization_window.visualize(self.current_rotation)
             self.parent.visualization_window.show()
         else:
-            logging.warning("No rotation data available for visualization.")
+            logger.warning("No rotation data available for visualization.")
 
 class AngleConverter(QWidget):
     def __init__(self):
@@ -391,8 +395,8 @@ class AngleConverter(QWidget):
             self.output.setHtml("Error: Invalid input")
         except Exception as e:
             self.output.setHtml(f"Error: {str(e)}")
-            logging.error(f"Error in AngleConverter.convert_angle: {str(e)}")
-            logging.debug(traceback.format_exc())
+            logger.error(f"Error in AngleConverter.convert_angle: {str(e)}")
+            logger.debug(traceback.format_exc())
 
     def apply_theme(self, theme):
         set_input_field_style(self.input_angle, theme)
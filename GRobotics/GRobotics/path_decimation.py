@@ -0,0 +1,167 @@
+import re
+
+import numpy as np
+
+from rapid_moves import MOVE_KIND_CODES, parse_move_instructions
+from cycle_time import module_data, resolve_poses, stop_points
+
+DEFAULT_POSITION_TOLERANCE = 0.1  # mm
+DEFAULT_ANGLE_TOLERANCE = 0.5  # deg
+
+# Text allowed between two moves of one decimation run: whitespace and comments only
+GAP_PATTERN = re.compile(r'(?:\s|![^\n]*)*')
+# Rest of a removed statement's line: trailing blanks, an optional comment and the line break
+LINE_REST_PATTERN = re.compile(r'[ \t]*(?:![^\r\n]*)?(?:\r?\n|$)')
+
+
+def slerp(q0, q1, t):
+    """Row-wise spherical interpolation of unit quaternions (N, 4) at parameters t (N,)."""
+    dots = np.einsum('ij,ij->i', q0, q1)
+    q1 = np.where(dots[:, None] < 0, -q1, q1)
+    dots = np.abs(dots)
+    theta = np.arccos(np.clip(dots, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w0 = np.where(sin_theta > 1e-9, np.sin((1 - t) * theta) / sin_theta, 1 - t)
+        w1 = np.where(sin_theta > 1e-9, np.sin(t * theta) / sin_theta, t)
+    result = w0[:, None] * q0 + w1[:, None] * q1
+    return result / np.linalg.norm(result, axis=1)[:, None]
+
+
+def deviations(points, orientations, start, end, start_orientation, end_orientation):
+    """Distance (mm) of each point from its chord and angle (deg) from the interpolated orientation."""
+    chord = end - start
+    chord_length = np.einsum('ij,ij->i', chord, chord)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.where(chord_length > 0, np.einsum('ij,ij->i', points - start, chord) / chord_length, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    distance = np.linalg.norm(points - (start + t[:, None] * chord), axis=1)
+    expected = slerp(start_orientation, end_orientation, t)
+    dots = np.abs(np.einsum('ij,ij->i', orientations, expected))
+    angle = np.degrees(2 * np.arccos(np.clip(dots, 0.0, 1.0)))
+    return distance, angle
+
+
+def decimate_path(positions, orientations, fixed, position_tolerance=DEFAULT_POSITION_TOLERANCE,
+                  angle_tolerance=DEFAULT_ANGLE_TOLERANCE):
+    """Douglas-Peucker over position plus orientation; returns the mask of points to keep.
+
+    Points marked in `fixed` (and both ends) are always kept and split the path into
+    independent sections. All open sections are refined together, one level per pass,
+    so the cost is O(n) per level and O(n log n) for typical paths.
+    """
+    if position_tolerance <= 0 or angle_tolerance <= 0:
+        raise ValueError("Tolerances must be positive")
+    count = len(positions)
+    keep = np.array(fixed, dtype=bool, copy=True)
+    if count == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    quaternions = orientations / np.linalg.norm(orientations, axis=1)[:, None]
+
+    anchors = np.flatnonzero(keep)
+    starts, ends = anchors[:-1], anchors[1:]
+    open_sections = ends - starts > 1
+    starts, ends = starts[open_sections], ends[open_sections]
+    while len(starts):
+        sizes = ends - starts - 1
+        first = np.cumsum(sizes) - sizes
+        section = np.repeat(np.arange(len(starts)), sizes)
+        points = starts[section] + 1 + np.arange(sizes.sum()) - first[section]
+        a, b = starts[section], ends[section]
+        distance, angle = deviations(positions[points], quaternions[points], positions[a], positions[b],
+                                     quaternions[a], quaternions[b])
+        score = np.maximum(distance / position_tolerance, angle / angle_tolerance)
+
+        # Farthest point per section (first one on ties)
+        maxima = np.maximum.reduceat(score, first)
+        candidates = np.flatnonzero(score == maxima[section])
+        _, first_candidate = np.unique(section[candidates], return_index=True)
+        pivots = points[candidates[first_candidate]]
+
+        split = maxima > 1.0
+        pivots = pivots[split]
+        keep[pivots] = True
+        starts = np.concatenate([starts[split], pivots])
+        ends = np.concatenate([pivots, ends[split]])
+        open_sections = ends - starts > 1
+        starts, ends = starts[open_sections], ends[open_sections]
+    return keep
+
+
+def removable_moves(moves, text):
+    """Moves that may be dropped: MoveL points inside a run of identical MoveL settings.
+
+    A move continues the previous one when both are MoveL in the same routine, with the
+    same speed, zone, tool and wobj, nothing but comments between them, and resolved
+    targets. Stop points and moves with a \\T argument are never removed.
+    """
+    declarations, numbers, _, zones = module_data(text)
+    positions, orientations = resolve_poses(moves.targets, declarations, numbers)
+    count = len(moves)
+
+    linear = moves.kinds == MOVE_KIND_CODES['MOVEL']
+    resolved = ~np.isnan(positions).any(axis=1) & ~np.isnan(orientations).any(axis=1)
+    continues = np.zeros(count + 1, dtype=bool)
+    if count > 1:
+        same = np.ones(count - 1, dtype=bool)
+        for column in (moves.routine_codes, moves.speed_codes, moves.zone_codes, moves.tool_codes,
+                       moves.wobj_codes):
+            same &= column[1:] == column[:-1]
+        for column in (moves.speed_overrides, moves.zone_overrides):
+            same &= (column[1:] == column[:-1]) | (np.isnan(column[1:]) & np.isnan(column[:-1]))
+        same &= linear[1:] & linear[:-1] & resolved[1:] & resolved[:-1]
+        gaps = np.array([GAP_PATTERN.fullmatch(text, end, start) is not None
+                         for end, start in zip(moves.offsets[:-1, 1].tolist(), moves.offsets[1:, 0].tolist())],
+                        dtype=bool)
+        continues[1:count] = same & gaps
+
+    removable = continues[:count] & continues[1:] & ~stop_points(moves, zones) & np.isnan(moves.time_overrides)
+    return removable, positions, orientations
+
+
+def remove_statements(text, offsets):
+    """Text with the given statement spans removed, together with their now empty lines."""
+    pieces, position = [], 0
+    for start, end in offsets:
+        rest = LINE_REST_PATTERN.match(text, end)
+        if rest and (start == 0 or text[start - 1] == '\n'):
+            end = rest.end()
+        pieces.append(text[position:start])
+        position = end
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def decimate_module(text, position_tolerance=DEFAULT_POSITION_TOLERANCE,
+                    angle_tolerance=DEFAULT_ANGLE_TOLERANCE):
+    """Removes redundant MoveL points from a module; returns (new text, report dict)."""
+    moves = parse_move_instructions(text)
+    removable, positions, orientations = removable_moves(moves, text)
+    keep = np.ones(len(moves), dtype=bool)
+    if removable.any():
+        # Unresolved rows are never removable, so their NaN poses are never compared
+        filled_positions = np.nan_to_num(positions)
+        filled_orientations = np.where(np.isnan(orientations), [1.0, 0.0, 0.0, 0.0], orientations)
+        keep = decimate_path(filled_positions, filled_orientations, ~removable,
+                             position_tolerance, angle_tolerance)
+    new_text = remove_statements(text, moves.offsets[~keep].tolist())
+    report = {
+        'moves_before': len(moves),
+        'moves_after': int(keep.sum()),
+        'candidates': int(removable.sum()),
+        'bytes_before': len(text.encode('utf-8')),
+        'bytes_after': len(new_text.encode('utf-8')),
+    }
+    return new_text, report
+
+
+def decimate_file(file_path, output_path=None, position_tolerance=DEFAULT_POSITION_TOLERANCE,
+                  angle_tolerance=DEFAULT_ANGLE_TOLERANCE):
+    """Decimates a module file in place, or into output_path; returns the report."""
+    with open(file_path, 'r', newline='') as file:
+        text = file.read()
+    new_text, report = decimate_module(text, position_tolerance, angle_tolerance)
+    with open(output_path or file_path, 'w', newline='') as file:
+        file.write(new_text)
+    return report
@@ -0,0 +1,152 @@
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psutil
+
+import profiling
+from app_logging import get_logger
+
+logger = get_logger('perf')
+
+# Event-loop lag, or handler run time, from which the GUI counts as stalled
+STALL_THRESHOLD_MS = 200
+# Lag samples kept for the rolling history (one per clock tick)
+HISTORY_LENGTH = 300
+# Finished actions remembered to name the culprit of a stall seen at the next tick
+RECENT_ACTIONS = 20
+
+
+class ActionStats:
+    """Run count, wall time and memory change of one instrumented action."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.last = 0.0
+        self.slow = 0
+        self.memory = 0  # Resident memory change of the last run, in bytes
+
+    def mean(self):
+        return self.total / self.calls if self.calls else 0.0
+
+
+class PerfMonitor:
+    """Event-loop lag from a periodic timer, plus wall time and memory of named actions.
+
+    A timer firing every interval seconds that arrives late measures how long the event
+    loop was blocked. Lag over the stall threshold is logged together with the actions
+    that finished since the previous tick, which are what held the loop.
+    """
+
+    def __init__(self, stall_threshold=STALL_THRESHOLD_MS / 1000, history_length=HISTORY_LENGTH):
+        self.stall_threshold = stall_threshold
+        self.lags = deque(maxlen=history_length)  # (time, lag in seconds)
+        self.actions = {}
+        self.recent = deque(maxlen=RECENT_ACTIONS)  # (end time, name, seconds)
+        self.stalls = 0
+        self.slow_actions = 0
+        self._last_tick = None
+        self._lock = threading.Lock()
+        self._process = psutil.Process()
+
+    def tick(self, interval):
+        """Records the lag of a timer meant to fire every interval seconds; returns it."""
+        now = time.perf_counter()
+        last, self._last_tick = self._last_tick, now
+        if last is None:
+            return 0.0
+        lag = max(now - last - interval, 0.0)
+        self.lags.append((now, lag))
+        if lag > self.stall_threshold:
+            self.stalls += 1
+            culprits = [f"{name} ({seconds * 1000:.0f} ms)" for end, name, seconds in self.recent if end > last]
+            logger.warning(f"GUI stall: event loop blocked for {lag * 1000:.0f} ms"
+                            f" during {', '.join(culprits) or 'an uninstrumented handler'}")
+        return lag
+
+    def memory(self):
+        return self._process.memory_info().rss
+
+    @contextmanager
+    def measure(self, name):
+        """Times a block as one run of the named action."""
+        memory = self.memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.record(name, end - start, self.memory() - memory, end)
+
+    def record(self, name, seconds, memory=0, end=None):
+        with self._lock:
+            stats = self.actions.get(name)
+            if stats is None:
+                stats = self.actions[name] = ActionStats(name)
+            stats.calls += 1
+            stats.total += seconds
+            stats.last = seconds
+            stats.worst = max(stats.worst, seconds)
+            stats.memory = memory
+            self.recent.append((end or time.perf_counter(), name, seconds))
+            if seconds > self.stall_threshold:
+                stats.slow += 1
+                self.slow_actions += 1
+        if seconds > self.stall_threshold and threading.current_thread() is threading.main_thread():
+            logger.warning(f"Slow handler: {name} took {seconds * 1000:.0f} ms "
+                            f"(memory {memory / 1e6:+.1f} MB)")
+
+    def reset(self):
+        with self._lock:
+            self.actions.clear()
+            self.recent.clear()
+            self.lags.clear()
+            self.stalls = 0
+            self.slow_actions = 0
+
+    def summary(self):
+        """(last lag, worst lag in the history, mean lag) in seconds."""
+        if not self.lags:
+            return 0.0, 0.0, 0.0
+        lags = [lag for _, lag in self.lags]
+        return lags[-1], max(lags), sum(lags) / len(lags)
+
+    def action_stats(self):
+        with self._lock:
+            return sorted(self.actions.values(), key=lambda stats: stats.total, reverse=True)
+
+
+MONITOR = PerfMonitor()
+
+
+def measured(name=None):
+    """Decorator timing a method or function as an action of the shared monitor.
+
+    In profiling mode each run is also captured with cProfile and tracemalloc.
+    """
+    def decorate(function):
+        action = name or function.__qualname__
+        parameters = inspect.signature(function).parameters.values()
+        if any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+            limit = None
+        else:
+            limit = sum(1 for parameter in parameters
+                        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD))
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            # Qt passes signal arguments, such as clicked's checked flag, the method may not take
+            if limit is not None:
+                args = args[:limit]
+            with MONITOR.measure(action):
+                if profiling.active():
+                    return profiling.profile_call(action, function, *args, **kwargs)
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,109 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QPainter, QColor
+
+from GUI_settings import set_button_style, set_common_stylesheet
+from perf_monitor import MONITOR
+
+ACTION_COLUMNS = ['Action', 'Calls', 'Mean (ms)', 'Worst (ms)', 'Last (ms)', 'Slow', 'Memory (MB)']
+REFRESH_INTERVAL_MS = 1000
+
+
+class LagGraph(QWidget):
+    """Bar chart of the monitor's lag history, newest on the right; the stall threshold is a line."""
+
+    def __init__(self, monitor, parent=None):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.setMinimumHeight(120)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = self.rect().adjusted(2, 2, -2, -2)
+        painter.fillRect(rect, self.palette().base())
+        lags = [lag for _, lag in self.monitor.lags]
+        threshold = self.monitor.stall_threshold
+        # Scale to at least twice the threshold so normal jitter stays small
+        scale = max(max(lags, default=0.0), threshold * 2)
+        width = rect.width() / max(self.monitor.lags.maxlen, 1)
+        x = rect.right() - len(lags) * width
+        for lag in lags:
+            height = int(rect.height() * lag / scale)
+            color = QColor('#d9534f') if lag > threshold else QColor('#5cb85c')
+            painter.fillRect(int(x), rect.bottom() - height, max(int(width), 1), height, color)
+            x += width
+        y = rect.bottom() - int(rect.height() * threshold / scale)
+        painter.setPen(QColor('#f0ad4e'))
+        painter.drawLine(rect.left(), y, rect.right(), y)
+        painter.drawText(rect.left() + 4, y - 4, f"stall {threshold * 1000:.0f} ms")
+        painter.end()
+
+
+class PerfPanel(QWidget):
+    """Rolling event-loop lag history and per-action timings of the shared monitor."""
+
+    def __init__(self, parent=None, monitor=MONITOR):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.current_theme = 'dark'
+        self.initUI()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(REFRESH_INTERVAL_MS)
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel("", self)
+        layout.addWidget(self.summary_label)
+        self.lag_graph = LagGraph(self.monitor, self)
+        layout.addWidget(self.lag_graph)
+
+        self.action_table = QTableWidget(0, len(ACTION_COLUMNS), self)
+        self.action_table.setHorizontalHeaderLabels(ACTION_COLUMNS)
+        self.action_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.action_table.verticalHeader().hide()
+        self.action_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.action_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.action_table, 1)
+
+        buttons_layout = QHBoxLayout()
+        self.reset_button = QPushButton('Reset', self)
+        self.reset_button.clicked.connect(self.reset)
+        buttons_layout.addWidget(self.reset_button)
+        buttons_layout.addStretch()
+        layout.addLayout(buttons_layout)
+
+        self.apply_theme()
+        self.refresh()
+
+    def set_theme(self, theme):
+        self.current_theme = theme
+        self.apply_theme()
+
+    def apply_theme(self):
+        self.setStyleSheet(set_common_stylesheet(self.current_theme))
+        for button in self.findChildren(QPushButton):
+            set_button_style(button, self.current_theme)
+
+    def reset(self):
+        self.monitor.reset()
+        self.refresh()
+
+    def refresh(self):
+        last, worst, mean = self.monitor.summary()
+        self.summary_label.setText(
+            f"Event-loop lag: last {last * 1000:.0f} ms, mean {mean * 1000:.0f} ms, worst {worst * 1000:.0f} ms "
+            f"over {len(self.monitor.lags)} s - {self.monitor.stalls} stalls, "
+            f"{self.monitor.slow_actions} slow handlers - memory {self.monitor.memory() / 1e6:,.0f} MB")
+        stats = self.monitor.action_stats()
+        self.action_table.setRowCount(len(stats))
+        for row, action in enumerate(stats):
+            values = [action.name, f"{action.calls}", f"{action.mean() * 1000:.1f}", f"{action.worst * 1000:.1f}",
+                      f"{action.last * 1000:.1f}", f"{action.slow}", f"{action.memory / 1e6:+.1f}"]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.action_table.setItem(row, column, item)
+        self.lag_graph.update()
@@ -0,0 +1,118 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+
+from app_logging import get_logger
+
+logger = get_logger('profiling')
+
+# Set to a folder to start in profiling mode, e.g. GROBOTICS_PROFILE=C:\temp\profiles
+PROFILE_ENV = 'GROBOTICS_PROFILE'
+# Allocation sites and functions listed in each report
+TOP_ALLOCATIONS = 25
+TOP_FUNCTIONS = 40
+# Stack depth tracemalloc records per allocation
+TRACEBACK_FRAMES = 5
+
+_profile_dir = None
+_running = threading.local()
+
+
+def enable(directory):
+    global _profile_dir
+    os.makedirs(directory, exist_ok=True)
+    _profile_dir = directory
+    logger.info(f"Profiling mode on, profiles are written to {directory}")
+
+
+def disable():
+    global _profile_dir
+    if _profile_dir is not None:
+        logger.info(f"Profiling mode off, profiles are in {_profile_dir}")
+    _profile_dir = None
+
+
+def active():
+    return _profile_dir is not None
+
+
+def profile_dir():
+    return _profile_dir
+
+
+def _report_base(action):
+    slug = re.sub(r'\W+', '_', action).strip('_').lower() or 'action'
+    base = os.path.join(_profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{slug}")
+    path, number = base, 1
+    while os.path.exists(f"{path}.prof"):
+        number += 1
+        path = f"{base}_{number}"
+    return path
+
+
+def profile_call(action, function, *args, **kwargs):
+    """Runs one action under cProfile and tracemalloc and writes <time>_<action>.prof and .txt.
+
+    The .prof file opens in pstats, snakeviz or similar; the .txt report lists the
+    hottest functions and the allocation sites that grew most during the action.
+    Actions called from inside a profiled action are part of its profile.
+    """
+    if _profile_dir is None or getattr(_running, 'active', False):
+        return function(*args, **kwargs)
+    _running.active = True
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEBACK_FRAMES)
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        _running.active = False
+        try:
+            path = _write_reports(action, profiler, before, after, seconds, peak)
+            logger.info(f"Profiled {action} ({seconds:.2f} s): {path}.prof")
+        except OSError as e:
+            logger.error(f"Could not write the profile of {action}: {e}")
+
+
+def _write_reports(action, profiler, before, after, seconds, peak):
+    path = _report_base(action)
+    profiler.dump_stats(f"{path}.prof")
+
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    growth = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+    net = sum(stat.size_diff for stat in growth)
+
+    stats_text = io.StringIO()
+    pstats.Stats(profiler, stream=stats_text).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+
+    with open(f"{path}.txt", 'w', encoding='utf-8') as file:
+        file.write(f"Action: {action}\n")
+        file.write(f"Wall time: {seconds:.3f} s\n")
+        file.write(f"Peak traced memory: {peak / 1e6:.1f} MB, net allocated: {net / 1e6:+.1f} MB\n\n")
+        # tracemalloc sees every thread, so background indexing or jobs can show up here
+        file.write(f"Top {TOP_ALLOCATIONS} allocation sites by growth (all threads):\n")
+        for stat in growth[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            file.write(f"  {stat.size_diff / 1024:+12,.1f} KiB {stat.count_diff:+10,} blocks  "
+                       f"{frame.filename}:{frame.lineno}\n")
+        file.write(f"\nTop {TOP_FUNCTIONS} functions by cumulative time:\n")
+        file.write(stats_text.getvalue())
+    return path
+
+
+if os.environ.get(PROFILE_ENV):
+    enable(os.environ[PROFILE_ENV])
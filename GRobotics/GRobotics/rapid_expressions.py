@@ -0,0 +1,189 @@
+import os
+import re
+
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+from rapid_moves import parse_move_instructions, split_arguments, split_optional
+from robtarget_batch import ROBTARGET_WIDTH, parse_robtarget_literal, parse_literal_block, _pad_external
+from robot_kinematics import rapid_to_matrix, matrix_to_rapid
+from rapid_snapshot import source_digest
+from rapid_symbols import MODULE_EXTENSIONS, SymbolTable
+
+OFFS, RELTOOL = 0, 1
+EXPRESSION_FUNCTIONS = {'OFFS': OFFS, 'RELTOOL': RELTOOL}
+FUNCTION_CALL_PATTERN = re.compile(r'(\w+)\s*\((.*)\)', re.DOTALL)
+
+MAX_CACHED_FILES = 32
+_resolved_files = {}
+
+
+def _literal_pose(text):
+    try:
+        pos, ori, cfg, ext = parse_robtarget_literal(''.join(text.split()))
+        return np.array(pos + ori + cfg + _pad_external(ext), dtype=float)
+    except (ValueError, IndexError):
+        return None
+
+
+def _number(text, numbers):
+    text = text.strip()
+    sign = 1.0
+    if text.startswith('-'):
+        sign, text = -1.0, text[1:].strip()
+    elif text.startswith('+'):
+        text = text[1:].strip()
+    try:
+        return sign * float(text)
+    except ValueError:
+        value = numbers.get(text)
+        return None if value is None else sign * value
+
+
+def compile_expression(text, numbers):
+    """'Offs(RelTool(p10,0,0,5\\Rz:=90),0,0,100)' -> (base, operations), innermost operation first.
+
+    Each operation is (OFFS or RELTOOL, [dx, dy, dz, rx, ry, rz]); returns None for anything else
+    than a robtarget name or literal wrapped in Offs/RelTool calls with numeric arguments.
+    """
+    text = text.strip()
+    operations = []
+    match = FUNCTION_CALL_PATTERN.fullmatch(text)
+    while match:
+        function = EXPRESSION_FUNCTIONS.get(match.group(1).upper())
+        arguments = split_arguments(match.group(2))
+        if function is None or len(arguments) != 4:
+            return None
+        last, options = split_optional(arguments[3])
+        values = [_number(value, numbers) for value in
+                  (arguments[1], arguments[2], last,
+                   options.get('RX', '0'), options.get('RY', '0'), options.get('RZ', '0'))]
+        if None in values or (function == OFFS and options):
+            return None
+        operations.append((function, values))
+        text = arguments[0]
+        match = FUNCTION_CALL_PATTERN.fullmatch(text)
+    operations.reverse()
+    return text, operations
+
+
+def evaluate_targets(texts, declarations, numbers=None):
+    """Full poses (N, 17) for move target arguments: literals, declared names, Offs() and RelTool().
+
+    Literals are parsed as one block, and the Offs/RelTool operations of all rows are applied
+    level by level as batched NumPy operations. Rows that cannot be resolved are NaN.
+    """
+    numbers = numbers or {}
+    poses = np.full((len(texts), ROBTARGET_WIDTH), np.nan)
+    literal_rows, literals = [], []
+    compiled = {}
+    expression_rows, expression_texts = [], []
+    for i, text in enumerate(texts):
+        if text.startswith('['):
+            literal_rows.append(i)
+            literals.append(text)
+        elif text:
+            if text not in compiled:
+                compiled[text] = compile_expression(text, numbers)
+            if compiled[text] is not None:
+                expression_rows.append(i)
+                expression_texts.append(text)
+
+    block = parse_literal_block(literals)
+    if block is not None:
+        poses[literal_rows] = block
+    else:
+        for i, text in zip(literal_rows, literals):
+            pose = _literal_pose(text)
+            if pose is not None:
+                poses[i] = pose
+
+    if not expression_rows:
+        return poses
+
+    # Base poses, shared by all rows with the same base
+    bases = {}
+    depth = 0
+    base_poses = np.full((len(expression_rows), ROBTARGET_WIDTH), np.nan)
+    for row, text in enumerate(expression_texts):
+        base, operations = compiled[text]
+        if base not in bases:
+            if base.startswith('['):
+                bases[base] = _literal_pose(base)
+            else:
+                declaration = declarations.get(base)
+                bases[base] = None if declaration is None else np.array(
+                    declaration[0] + declaration[1] + declaration[2] + _pad_external(declaration[3]), dtype=float)
+        if bases[base] is not None:
+            base_poses[row] = bases[base]
+        depth = max(depth, len(operations))
+
+    functions = np.full((len(expression_rows), depth), -1, dtype=np.int8)
+    arguments = np.zeros((len(expression_rows), depth, 6))
+    for row, text in enumerate(expression_texts):
+        for level, (function, values) in enumerate(compiled[text][1]):
+            functions[row, level] = function
+            arguments[row, level] = values
+
+    positions = base_poses[:, 0:3]
+    orientations = base_poses[:, 3:7]
+    for level in range(depth):
+        offs = functions[:, level] == OFFS
+        positions[offs] += arguments[offs, level, 0:3]
+
+        reltool = (functions[:, level] == RELTOOL) & ~np.isnan(orientations).any(axis=1)
+        if reltool.any():
+            rotation = rapid_to_matrix(orientations[reltool])
+            positions[reltool] += np.einsum('nij,nj->ni', rotation, arguments[reltool, level, 0:3])
+            # Tool-frame rotations: first around x, then the new y, then the new z
+            relative = Rotation.from_euler('XYZ', arguments[reltool, level, 3:6], degrees=True).as_matrix()
+            orientations[reltool] = matrix_to_rapid(rotation @ relative)
+
+    poses[expression_rows] = base_poses
+    return poses
+
+
+def module_texts(file_path, extensions=MODULE_EXTENSIONS):
+    """{path: text} of a module file and of the other modules in its folder, whose global data it sees."""
+    own = os.path.normcase(os.path.abspath(file_path))
+    directory = os.path.dirname(own)
+    paths = [file_path] + [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                           if name.lower().endswith(extensions)
+                           and os.path.normcase(os.path.join(directory, name)) != own]
+    texts = {}
+    for path in paths:
+        try:
+            with open(path, 'r', newline='') as file:
+                texts[path] = file.read()
+        except (OSError, ValueError):
+            if path == file_path:
+                raise
+    return texts
+
+
+def resolve_file(file_path):
+    """(MoveTable, poses (N, 17)) for every move instruction of a module file.
+
+    Targets declared as global data in the other modules of its folder are resolved too.
+    The result is cached in memory and reused while neither the file nor any of those
+    modules changed.
+    """
+    texts = module_texts(file_path)
+    key = tuple((path, source_digest(text)) for path, text in texts.items())
+    cached = _resolved_files.get(file_path)
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+
+    # Built per call, so the result only depends on the files that are there now
+    symbols = SymbolTable()
+    for path, text in texts.items():
+        symbols.update_text(path, text)
+    text = texts[file_path]
+    moves = parse_move_instructions(text)
+    poses = evaluate_targets(moves.targets, symbols.robtarget_values(file_path),
+                             symbols.literal_values('num', file_path))
+    _resolved_files.pop(file_path, None)
+    _resolved_files[file_path] = (key, moves, poses)
+    while len(_resolved_files) > MAX_CACHED_FILES:
+        _resolved_files.pop(next(iter(_resolved_files)))
+    return moves, poses
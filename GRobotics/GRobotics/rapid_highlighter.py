@@ -0,0 +1,158 @@
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionViewItem
+from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
+from PyQt5.QtCore import Qt, QTimer
+
+from rapid_lexer import KEYWORD, TYPE, INSTRUCTION, NUMBER, STRING, COMMENT, lex_line, line_state
+
+TOKEN_COLORS = {
+    KEYWORD: '#569cd6',
+    TYPE: '#4ec9b0',
+    INSTRUCTION: '#c586c0',
+    NUMBER: '#b5a04b',
+    STRING: '#ce9178',
+    COMMENT: '#6a9955',
+}
+# Lines whose tokens the viewer delegate keeps, most recently painted first out last
+MAX_CACHED_LINES = 2000
+# Extra blocks highlighted above and below the viewport, so short scrolls find them ready
+VISIBLE_MARGIN = 50
+# Block state bit marking a block as colored; the lower bits hold the lexer state
+COLORED = 0x100
+
+
+def token_formats():
+    formats = {}
+    for kind, color in TOKEN_COLORS.items():
+        text_format = QTextCharFormat()
+        text_format.setForeground(QColor(color))
+        if kind == KEYWORD:
+            text_format.setFontWeight(QFont.Bold)
+        if kind == COMMENT:
+            text_format.setFontItalic(True)
+        formats[kind] = text_format
+    return formats
+
+
+class RapidHighlighter(QSyntaxHighlighter):
+    """RAPID highlighting for an editable document, one block (line) at a time.
+
+    The block state is the lexer state (inside a module / routine), so after an edit Qt
+    only re-runs the edited block and those whose incoming state changed. With an editor
+    given, blocks outside its viewport only get their state computed; they are tokenized
+    and colored once they scroll into view. Whether a block is colored is kept in its
+    state (COLORED) rather than in block user data, which costs a wrapper object per line.
+    """
+
+    def __init__(self, document, editor=None):
+        super().__init__(document)
+        self.formats = token_formats()
+        self.editor = editor
+        self.visible = None  # (first, last) block numbers to color, None for all
+        if editor is not None:
+            self.visible = (0, -1)
+            self.refresh_timer = QTimer(self)
+            self.refresh_timer.setSingleShot(True)
+            self.refresh_timer.setInterval(0)
+            self.refresh_timer.timeout.connect(self.highlight_visible)
+            editor.verticalScrollBar().valueChanged.connect(lambda _: self.refresh_timer.start())
+            document.contentsChanged.connect(self.refresh_timer.start)
+            self.refresh_timer.start()
+
+    def highlightBlock(self, text):
+        state = max(self.previousBlockState(), 0) & ~COLORED
+        if self.visible is not None:
+            number = self.currentBlock().blockNumber()
+            if not self.visible[0] <= number <= self.visible[1]:
+                self.setCurrentBlockState(line_state(text, state))
+                return
+        tokens, new_state = lex_line(text, state)
+        for start, length, kind in tokens:
+            text_format = self.formats.get(kind)
+            if text_format is not None:
+                self.setFormat(start, length, text_format)
+        self.setCurrentBlockState(new_state | COLORED)
+
+    def visible_blocks(self):
+        viewport = self.editor.viewport().rect()
+        first = self.editor.cursorForPosition(viewport.topLeft()).block().blockNumber()
+        last = self.editor.cursorForPosition(viewport.bottomRight()).block().blockNumber()
+        return max(first - VISIBLE_MARGIN, 0), last + VISIBLE_MARGIN
+
+    def highlight_visible(self):
+        """Colors the blocks in and around the viewport that were skipped so far."""
+        self.visible = self.visible_blocks()
+        document = self.document()
+        block = document.findBlockByNumber(self.visible[0])
+        while block.isValid() and block.blockNumber() <= self.visible[1]:
+            if block.userState() == -1 or not block.userState() & COLORED:
+                self.rehighlightBlock(block)
+            block = block.next()
+
+
+class RapidLineDelegate(QStyledItemDelegate):
+    """Paints a line of RAPID source in token colors; the model's UserRole holds the bare line.
+
+    Only rows the view paints are tokenized, and their tokens are kept in a small LRU cache
+    so scrolling back and forth does not lex them again.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.colors = {kind: QColor(color) for kind, color in TOKEN_COLORS.items()}
+        self.cache = OrderedDict()
+
+    def clear_cache(self):
+        self.cache.clear()
+
+    def tokens(self, row, line):
+        cached = self.cache.get(row)
+        if cached is not None and cached[0] == line:
+            self.cache.move_to_end(row)
+            return cached[1]
+        tokens, _ = lex_line(line)
+        self.cache[row] = (line, tokens)
+        if len(self.cache) > MAX_CACHED_LINES:
+            self.cache.popitem(last=False)
+        return tokens
+
+    def paint(self, painter, option, index):
+        option = QStyleOptionViewItem(option)
+        self.initStyleOption(option, index)
+        text, line = option.text, index.data(Qt.UserRole) or ''
+        option.text = ''
+        widget = option.widget
+        style = widget.style() if widget is not None else None
+        if style is not None:
+            style.drawControl(QStyle.CE_ItemViewItem, option, painter, widget)
+
+        selected = option.state & QStyle.State_Selected
+        default = option.palette.highlightedText().color() if selected else option.palette.text().color()
+        metrics = option.fontMetrics
+        rect = option.rect.adjusted(3, 0, 0, 0)
+        baseline = rect.top() + (rect.height() + metrics.ascent() - metrics.descent()) // 2
+
+        painter.save()
+        painter.setClipRect(option.rect)
+        painter.setFont(option.font)
+        x = rect.left()
+        prefix = text[:len(text) - len(line)]
+        pieces = [(prefix, None)]
+        position = 0
+        for start, length, kind in self.tokens(index.row(), line):
+            if start > position:
+                pieces.append((line[position:start], None))
+            pieces.append((line[start:start + length], kind))
+            position = start + length
+        pieces.append((line[position:], None))
+        for piece, kind in pieces:
+            if not piece:
+                continue
+            if x > option.rect.right():
+                break
+            color = self.colors.get(kind) if not selected else None
+            painter.setPen(color or default)
+            painter.drawText(x, baseline, piece)
+            x += metrics.horizontalAdvance(piece)
+        painter.restore()
@@ -0,0 +1,133 @@
+import re
+from collections import namedtuple
+
+KEYWORD, TYPE, INSTRUCTION, NAME, NUMBER, STRING, COMMENT, OPERATOR = range(8)
+
+KEYWORDS = {
+    'MODULE', 'ENDMODULE', 'PROC', 'ENDPROC', 'FUNC', 'ENDFUNC', 'TRAP', 'ENDTRAP', 'RECORD', 'ENDRECORD',
+    'LOCAL', 'TASK', 'CONST', 'PERS', 'VAR', 'ALIAS', 'IF', 'THEN', 'ELSE', 'ELSEIF', 'ENDIF', 'FOR', 'FROM',
+    'TO', 'STEP', 'DO', 'ENDFOR', 'WHILE', 'ENDWHILE', 'TEST', 'CASE', 'DEFAULT', 'ENDTEST', 'RETURN', 'GOTO',
+    'CONNECT', 'WITH', 'ERROR', 'BACKWARD', 'UNDO', 'RAISE', 'RETRY', 'TRYNEXT', 'EXIT', 'STOP', 'AND', 'OR',
+    'XOR', 'NOT', 'DIV', 'MOD', 'TRUE', 'FALSE', 'SYSMODULE', 'NOSTEPIN', 'VIEWONLY', 'READONLY', 'NOVIEW',
+    'INOUT',
+}
+DATA_TYPES = {
+    'NUM', 'DNUM', 'BOOL', 'STRING', 'BYTE', 'ROBTARGET', 'JOINTTARGET', 'WOBJDATA', 'TOOLDATA', 'SPEEDDATA',
+    'ZONEDATA', 'LOADDATA', 'POS', 'ORIENT', 'POSE', 'CONFDATA', 'EXTJOINT', 'ROBJOINT', 'STOPPOINTDATA',
+    'TRIGGDATA', 'INTNUM', 'CLOCK', 'SIGNALDI', 'SIGNALDO', 'SIGNALGI', 'SIGNALGO', 'SIGNALAI', 'SIGNALAO',
+    'IODEV', 'ERRNUM', 'MECUNIT', 'TASKID', 'SYNCIDENT', 'TASKS',
+}
+INSTRUCTION_PATTERN = re.compile(r'(?:Move|Search|Trigg)\w*', re.IGNORECASE)
+
+TOKEN_PATTERN = re.compile(
+    r'(?P<comment>!.*)'
+    r'|(?P<string>"[^"]*"?)'
+    r'|(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+    r'|(?P<word>[A-Za-z_]\w*)'
+    r'|(?P<operator>:=|<>|<=|>=|[-+*/<>=:;,.\\\[\](){}%])'
+)
+# The words that can change the lexer state or start an outline entry
+HEADER_PATTERN = re.compile(
+    r'[ \t]*(?:(?:LOCAL|TASK)[ \t]+)?(MODULE|ENDMODULE|PROC|ENDPROC|FUNC|ENDFUNC|TRAP|ENDTRAP|RECORD|ENDRECORD|'
+    r'CONST|PERS|VAR)\b', re.IGNORECASE)
+
+# Lexer state carried from one line to the next
+IN_MODULE = 1
+IN_ROUTINE = 2
+ROUTINE_STARTS = {'PROC', 'FUNC', 'TRAP'}
+ROUTINE_ENDS = {'ENDPROC', 'ENDFUNC', 'ENDTRAP'}
+
+OutlineItem = namedtuple('OutlineItem', 'kind name data_type line depth')
+OutlineItem.__doc__ = """A MODULE, PROC, FUNC, TRAP, RECORD or DATA entry; line is 0-based and depth
+is 0 for modules, 1 for module content and 2 for data declared inside a routine."""
+
+
+def next_state(header, state):
+    """State after a line whose first keyword (upper case) is header."""
+    if header == 'MODULE':
+        return IN_MODULE
+    if header == 'ENDMODULE':
+        return 0
+    if header in ROUTINE_STARTS:
+        return state | IN_ROUTINE
+    if header in ROUTINE_ENDS:
+        return state & ~IN_ROUTINE
+    return state
+
+
+def lex_line(line, state=0):
+    """Tokens of one line as (start, length, kind) and the state for the next line.
+
+    RAPID strings and comments end with the line, so a line's tokens never depend on the
+    previous line; the state only tracks whether the line is inside a module and routine.
+    """
+    tokens = []
+    header = None
+    for match in TOKEN_PATTERN.finditer(line):
+        group = match.lastgroup
+        start, end = match.span()
+        if group == 'word':
+            word = match.group().upper()
+            if word in KEYWORDS:
+                kind = KEYWORD
+            elif word in DATA_TYPES:
+                kind = TYPE
+            elif INSTRUCTION_PATTERN.fullmatch(word):
+                kind = INSTRUCTION
+            else:
+                kind = NAME
+            if header is None and word not in ('LOCAL', 'TASK'):
+                header = word
+        elif group == 'comment':
+            kind = COMMENT
+        elif group == 'string':
+            kind = STRING
+        elif group == 'number':
+            kind = NUMBER
+        else:
+            kind = OPERATOR
+        tokens.append((start, end - start, kind))
+    return tokens, next_state(header, state)
+
+
+def line_state(line, state=0):
+    """The state after a line, without tokenizing it."""
+    match = HEADER_PATTERN.match(line)
+    return next_state(match.group(1).upper(), state) if match else state
+
+
+def outline_item(line, tokens, state, number):
+    """The outline entry a lexed line starts, or None; state is the state before the line."""
+    words = [line[start:start + length] for start, length, kind in tokens if kind != OPERATOR][:4]
+    if words and words[0].upper() in ('LOCAL', 'TASK'):
+        words = words[1:]
+    if len(words) < 2:
+        return None
+    first = words[0].upper()
+    if first == 'MODULE':
+        return OutlineItem('MODULE', words[1], None, number, 0)
+    if first in ('PROC', 'TRAP', 'RECORD'):
+        return OutlineItem(first, words[1], None, number, 1)
+    if first == 'FUNC' and len(words) >= 3:
+        return OutlineItem('FUNC', words[2], words[1], number, 1)
+    if first in ('CONST', 'PERS', 'VAR') and len(words) >= 3:
+        return OutlineItem('DATA', words[2], words[1], number, 2 if state & IN_ROUTINE else 1)
+    return None
+
+
+def scan_outline(lines, first_line=0, state=0):
+    """Outline entries of consecutive lines; returns (items, state after the last line).
+
+    Only lines starting with a header or declaration keyword are tokenized, so the lines
+    can be fed in batches of any size and the result does not depend on the batching.
+    """
+    items = []
+    for number, line in enumerate(lines, start=first_line):
+        if not HEADER_PATTERN.match(line):
+            continue
+        tokens, new_state = lex_line(line, state)
+        item = outline_item(line, tokens, state, number)
+        if item is not None:
+            items.append(item)
+        state = new_state
+    return items, state
@@ -0,0 +1,153 @@
+import re
+
+import numpy as np
+
+MOVE_KINDS = ('MoveJ', 'MoveL', 'MoveC')
+MOVE_KIND_CODES = {kind.upper(): code for code, kind in enumerate(MOVE_KINDS)}
+
+MOVE_STATEMENT_PATTERN = re.compile(r'^[ \t]*(MoveJ|MoveL|MoveC)\b([^;]*);', re.IGNORECASE | re.MULTILINE)
+ROUTINE_PATTERN = re.compile(r'^[ \t]*(?:LOCAL\s+)?(?:PROC|TRAP|FUNC\s+\w+)\s+(\w+)', re.IGNORECASE | re.MULTILINE)
+# Strings, bracketed/parenthesised groups (nested up to three levels) and separators
+ARGUMENT_TOKEN_PATTERN = re.compile(r'"[^"]*"|\[(?:[^\[\]]|\[(?:[^\[\]]|\[[^\[\]]*\])*\])*\]'
+                                    r'|\((?:[^()]|\([^()]*\))*\)|[,\\]')
+
+
+class MoveTable:
+    """Move instructions of a module as typed columns.
+
+    Name-valued arguments (speed, zone, tool, wobj, routine) are stored as integer codes
+    into the matching *_names list; optional numeric arguments (\\V, \\T, \\Z) are NaN when absent.
+    """
+
+    def __init__(self):
+        self.kinds = np.empty(0, dtype=np.int8)
+        self.lines = np.empty(0, dtype=np.int64)
+        self.offsets = np.empty((0, 2), dtype=np.int64)
+        self.targets = []
+        self.via_points = []
+        self.routine_codes = np.empty(0, dtype=np.int32)
+        self.speed_codes = np.empty(0, dtype=np.int32)
+        self.zone_codes = np.empty(0, dtype=np.int32)
+        self.tool_codes = np.empty(0, dtype=np.int32)
+        self.wobj_codes = np.empty(0, dtype=np.int32)
+        self.speed_overrides = np.empty(0, dtype=float)
+        self.time_overrides = np.empty(0, dtype=float)
+        self.zone_overrides = np.empty(0, dtype=float)
+        self.routine_names = []
+        self.speed_names = []
+        self.zone_names = []
+        self.tool_names = []
+        self.wobj_names = []
+
+    def __len__(self):
+        return len(self.kinds)
+
+
+def split_arguments(text, separator=','):
+    """Splits an argument list at top-level separators, ignoring ones inside brackets or strings."""
+    if '[' not in text and '(' not in text and '"' not in text:
+        return [part.strip() for part in text.split(separator)]
+    parts, start = [], 0
+    for match in ARGUMENT_TOKEN_PATTERN.finditer(text):
+        if match.group() == separator:
+            parts.append(text[start:match.start()].strip())
+            start = match.end()
+    parts.append(text[start:].strip())
+    return parts
+
+
+def split_optional(argument):
+    """'v1000\\V:=1200' -> ('v1000', {'V': '1200'}); switches map to ''."""
+    if '\\' not in argument:
+        return argument, {}
+    parts = split_arguments(argument, '\\')
+    options = {}
+    for option in parts[1:]:
+        name, _, value = option.partition(':=')
+        options[name.strip().upper()] = value.strip()
+    return parts[0], options
+
+
+def _encode(values, names):
+    lookup = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(names)
+            names.append(value)
+        codes[i] = code
+    return codes
+
+
+def _to_float(text):
+    if text is None:
+        return np.nan
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def parse_move_instructions(text):
+    """Parses every MoveJ/MoveL/MoveC statement (also ones spanning lines) of a module into a MoveTable."""
+    table = MoveTable()
+    line_starts = np.array([0] + [m.end() for m in re.finditer('\n', text)], dtype=np.int64)
+    routine_starts = []
+    routine_names = []
+    for match in ROUTINE_PATTERN.finditer(text):
+        routine_starts.append(match.start())
+        routine_names.append(match.group(1))
+
+    kinds, offsets, targets, vias = [], [], [], []
+    speeds, zones, tools, wobjs = [], [], [], []
+    speed_overrides, time_overrides, zone_overrides = [], [], []
+    for match in MOVE_STATEMENT_PATTERN.finditer(text):
+        kind = match.group(1).upper()
+        arguments = [arg for arg in split_arguments(match.group(2)) if arg and not arg.startswith('\\')]
+        if kind == 'MOVEC':
+            via, arguments = (arguments[0] if arguments else ''), arguments[1:]
+        else:
+            via = ''
+        arguments = arguments + [''] * (4 - len(arguments))
+        target, _ = split_optional(arguments[0])
+        speed, speed_options = split_optional(arguments[1])
+        zone, zone_options = split_optional(arguments[2])
+        tool, tool_options = split_optional(arguments[3])
+
+        kinds.append(MOVE_KIND_CODES[kind])
+        offsets.append((match.start(), match.end()))
+        targets.append(target)
+        vias.append(via)
+        speeds.append(speed)
+        zones.append(zone)
+        tools.append(tool)
+        wobjs.append(tool_options.get('WOBJ', ''))
+        speed_overrides.append(_to_float(speed_options.get('V')))
+        time_overrides.append(_to_float(speed_options.get('T')))
+        zone_overrides.append(_to_float(zone_options.get('Z')))
+
+    table.kinds = np.array(kinds, dtype=np.int8)
+    table.offsets = np.array(offsets, dtype=np.int64).reshape(-1, 2)
+    table.lines = np.searchsorted(line_starts, table.offsets[:, 0], side='right').astype(np.int64)
+    table.targets = targets
+    table.via_points = vias
+    if routine_starts:
+        table.routine_names = routine_names
+        table.routine_codes = (np.searchsorted(np.array(routine_starts), table.offsets[:, 0], side='right')
+                               - 1).astype(np.int32)
+        # Moves before the first routine header (should not happen in valid RAPID) get their own bucket
+        if np.any(table.routine_codes < 0):
+            table.routine_names.append('')
+            table.routine_codes[table.routine_codes < 0] = len(table.routine_names) - 1
+    else:
+        table.routine_names = ['']
+        table.routine_codes = np.zeros(len(kinds), dtype=np.int32)
+    table.speed_codes = _encode(speeds, table.speed_names)
+    table.zone_codes = _encode(zones, table.zone_names)
+    table.tool_codes = _encode(tools, table.tool_names)
+    table.wobj_codes = _encode(wobjs, table.wobj_names)
+    table.speed_overrides = np.array(speed_overrides, dtype=float)
+    table.time_overrides = np.array(time_overrides, dtype=float)
+    table.zone_overrides = np.array(zone_overrides, dtype=float)
+    return table
@@ -0,0 +1,211 @@
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from rapid_snapshot import source_digest
+from rapid_symbols import MODULE_EXTENSIONS, SymbolTable
+from app_logging import get_logger
+
+logger = get_logger('references')
+
+IDENTIFIER_PATTERN = re.compile(r'\b[A-Za-z_]\w*')
+STRING_PATTERN = re.compile(r'"[^"]*"')
+MODULE_PATTERN = re.compile(r'^\s*MODULE\s+(\w+)', re.IGNORECASE)
+ROUTINE_START_PATTERN = re.compile(r'^\s*(?:LOCAL\s+)?(?:PROC|TRAP|FUNC\s+\w+)\s+(\w+)', re.IGNORECASE)
+ROUTINE_END_PATTERN = re.compile(r'^\s*(?:ENDPROC|ENDTRAP|ENDFUNC)\b', re.IGNORECASE)
+# First words of routine data declarations, which declare a name rather than use it
+DECLARATION_KEYWORDS = {'VAR', 'PERS', 'CONST', 'LOCAL', 'TASK'}
+
+# Below this many changed files, or this many bytes in all, a worker pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+Reference = namedtuple('Reference', 'name path module routine line instruction text')
+
+
+def scan_references(path, names):
+    """Uses of the given lower-case names inside the routines of one module file: (path, module, [Reference]).
+
+    instruction is the first word of the statement the name appears in (MoveL, Set, or the
+    assigned variable); comments and string literals are skipped.
+    """
+    with open(path, 'r', newline='') as file:
+        lines = file.read().splitlines()
+    module = os.path.splitext(os.path.basename(path))[0]
+    references = []
+    routine = ''
+    instruction = None
+    for number, raw_line in enumerate(lines, start=1):
+        line = STRING_PATTERN.sub('""', raw_line).split('!', 1)[0]
+        if not routine:
+            match = MODULE_PATTERN.match(line)
+            if match:
+                module = match.group(1)
+                continue
+            match = ROUTINE_START_PATTERN.match(line)
+            if match:
+                routine = match.group(1)
+                instruction = None
+            continue
+        if ROUTINE_END_PATTERN.match(line):
+            routine = ''
+            continue
+        for match in IDENTIFIER_PATTERN.finditer(line):
+            name = match.group()
+            if instruction is None:
+                instruction = name
+            if name.lower() in names and instruction.upper() not in DECLARATION_KEYWORDS:
+                references.append(Reference(name, path, module, routine, number, instruction, raw_line.strip()))
+        if line.rstrip().endswith(';'):
+            instruction = None
+    return path, module, references
+
+
+_worker_names = frozenset()
+
+
+def worth_a_pool(paths, workers=None):
+    """Whether parsing these files is big enough to start worker processes for."""
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(paths) < PARALLEL_THRESHOLD:
+        return False
+    return sum(os.path.getsize(path) for path in paths) >= PARALLEL_MIN_BYTES
+
+
+def map_in_workers(function, items, workers=None, chunksize=1, initializer=None, initargs=()):
+    """list(map(function, items)) in worker processes, falling back to this process if the pool breaks."""
+    items = list(items)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            return list(pool.map(function, items, chunksize=chunksize))
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(f"Worker pool failed, parsing {len(items)} files in-process: {e}")
+    if initializer is not None:
+        initializer(*initargs)
+    return [function(item) for item in items]
+
+
+def _init_worker(names):
+    global _worker_names
+    _worker_names = names
+
+
+def _scan_in_worker(path):
+    return scan_references(path, _worker_names)
+
+
+class ReferenceIndex:
+    """Use sites of robtargets across a backup, with per-name and per-routine hash lookups.
+
+    Only files whose content changed are rescanned, in worker processes when there are many.
+    Scans only record names declared as robtargets, so a newly declared name triggers a full rescan.
+    """
+
+    def __init__(self):
+        self.symbols = SymbolTable()
+        self._names = frozenset()  # lower-case robtarget names the current scans looked for
+        self._digests = {}         # path -> digest of the scanned content
+        self._files = {}           # path -> [Reference]
+        self._by_name = {}         # lower-case name -> [Reference]
+        self._by_routine = {}      # (lower-case module, lower-case routine) -> {path: set of lower-case names}
+
+    def __contains__(self, path):
+        return path in self._digests
+
+    def update_directory(self, directory, extensions=MODULE_EXTENSIONS, workers=None):
+        """Indexes every module under a directory; returns the paths that were (re)scanned or dropped."""
+        paths = []
+        for root, _, files in os.walk(directory):
+            paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(extensions))
+        prefix = os.path.join(directory, '')
+        present = set(paths)
+        dropped = [path for path in self._files if path.startswith(prefix) and path not in present]
+        for path in dropped:
+            self.remove(path)
+            self.symbols.remove(path)
+        return self.update_files(paths, workers) + dropped
+
+    def update_files(self, paths, workers=None):
+        digests = {}
+        for path in paths:
+            with open(path, 'rb') as file:
+                digests[path] = source_digest(file.read())
+            self.symbols.update_file(path)
+
+        names = frozenset(symbol.name.lower() for symbol in self.symbols.symbols(data_type='robtarget'))
+        if names <= self._names:
+            stale = [path for path in paths if self._digests.get(path) != digests[path]]
+        else:
+            # New target names may be used in files that did not change
+            self._names = names
+            stale = list(paths) + [path for path in self._files if path not in digests]
+            for path in stale:
+                if path not in digests:
+                    with open(path, 'rb') as file:
+                        digests[path] = source_digest(file.read())
+        if not stale:
+            return []
+
+        if worth_a_pool(stale, workers):
+            results = map_in_workers(_scan_in_worker, stale, workers, chunksize=4,
+                                     initializer=_init_worker, initargs=(self._names,))
+        else:
+            results = [scan_references(path, self._names) for path in stale]
+        # Merge in input order so the index does not depend on worker timing
+        for path, _, references in results:
+            self.remove(path)
+            self._digests[path] = digests[path]
+            self._files[path] = references
+            for reference in references:
+                self._by_name.setdefault(reference.name.lower(), []).append(reference)
+                routine = self._by_routine.setdefault((reference.module.lower(), reference.routine.lower()), {})
+                routine.setdefault(path, set()).add(reference.name.lower())
+        return stale
+
+    def remove(self, path):
+        references = self._files.pop(path, None)
+        self._digests.pop(path, None)
+        if not references:
+            return
+        for name in {reference.name.lower() for reference in references}:
+            remaining = [reference for reference in self._by_name[name] if reference.path != path]
+            if remaining:
+                self._by_name[name] = remaining
+            else:
+                del self._by_name[name]
+        for key in {(reference.module.lower(), reference.routine.lower()) for reference in references}:
+            routine = self._by_routine[key]
+            routine.pop(path, None)
+            if not routine:
+                del self._by_routine[key]
+
+    def find_usages(self, name):
+        """Use sites of a target name in file and line order."""
+        # Re-scanned files append to the per-name lists, so those are in update order
+        return sorted(self._by_name.get(name.lower(), ()), key=lambda reference: (reference.path, reference.line))
+
+    def unused_targets(self):
+        """Robtarget declarations nothing can reach: routine data unused in its routine, LOCAL data
+        unused in its own file, global data unused anywhere."""
+        unused = []
+        for symbol in self.symbols.symbols(data_type='robtarget'):
+            uses = self._by_name.get(symbol.name.lower(), ())
+            if symbol.routine:
+                uses = [use for use in uses if use.path == symbol.path and use.routine == symbol.routine]
+            elif symbol.scope == 'LOCAL':
+                uses = [use for use in uses if use.path == symbol.path]
+            if not uses:
+                unused.append(symbol)
+        return unused
+
+    def targets_used_by(self, routine, module=None):
+        """Names of robtargets referenced by a routine (of any module unless one is given)."""
+        names = set()
+        for (routine_module, routine_name), files in self._by_routine.items():
+            if routine_name == routine.lower() and (module is None or routine_module == module.lower()):
+                for used in files.values():
+                    names |= used
+        return sorted({self.symbols.lookup(name, 'robtarget')[0].name for name in names
+                       if self.symbols.lookup(name, 'robtarget')})
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from robtarget_batch import RobtargetTable
+
+SNAPSHOT_ROOT = os.path.join(os.path.expanduser('~'), '.grobotics', 'snapshots')
+# Version of the file layout; parsers version their own results with the parser argument
+SNAPSHOT_VERSION = 2
+MAX_SNAPSHOTS = 50
+
+# One .npy file per column so every column can be memory-mapped on load
+COLUMNS = ('names', 'scopes', 'positions', 'orientations', 'configs', 'external_axes',
+           'offsets', 'lines')
+
+
+def source_digest(data):
+    """SHA-256 of the source text or bytes a snapshot was built from."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def snapshot_dir(key, root=SNAPSHOT_ROOT):
+    """Directory holding the snapshot for a key (a file path, or any stable name for pasted text)."""
+    return os.path.join(root, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+
+def write_snapshot(key, digest, table, offsets, lines, parser='', root=SNAPSHOT_ROOT):
+    """Stores a parse result: table columns, (start, end) source offsets and source line numbers per row.
+
+    digest identifies the source it was built from: a source_digest, possibly behind a cheap
+    pre-check such as chunked_scan.file_stamp (see snapshot_digest). parser names the parser
+    and its version, e.g. 'moves/3'; a snapshot is only read back
+    by the same parser version, so changing what a parser extracts must change it.
+    """
+    os.makedirs(root, exist_ok=True)
+    target = snapshot_dir(key, root)
+    staging = tempfile.mkdtemp(dir=root)
+    arrays = {
+        'names': np.array(table.names, dtype=str),
+        'scopes': np.array(table.scopes, dtype=str),
+        'positions': table.positions,
+        'orientations': table.orientations,
+        'configs': table.configs,
+        'external_axes': table.external_axes,
+        'offsets': np.asarray(offsets, dtype=np.int64).reshape(-1, 2),
+        'lines': np.asarray(lines, dtype=np.int64),
+    }
+    for column in COLUMNS:
+        np.save(os.path.join(staging, column + '.npy'), arrays[column])
+    with open(os.path.join(staging, 'meta.json'), 'w') as file:
+        json.dump({'version': SNAPSHOT_VERSION, 'key': key, 'source_hash': digest, 'parser': parser,
+                   'rows': len(table)}, file)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    prune_snapshots(root)
+
+
+def snapshot_digest(key, parser='', root=SNAPSHOT_ROOT):
+    """The digest a snapshot was written with, or None if missing or from another parser; reads only its metadata."""
+    try:
+        with open(os.path.join(snapshot_dir(key, root), 'meta.json')) as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != SNAPSHOT_VERSION or meta.get('parser') != parser:
+        return None
+    return meta.get('source_hash')
+
+
+def read_snapshot(key, digest, parser='', root=SNAPSHOT_ROOT):
+    """Returns (table, offsets, lines) with memory-mapped columns, or None if missing, stale or from another parser."""
+    directory = snapshot_dir(key, root)
+    try:
+        with open(os.path.join(directory, 'meta.json')) as file:
+            meta = json.load(file)
+        if (meta.get('version') != SNAPSHOT_VERSION or meta.get('source_hash') != digest
+                or meta.get('parser') != parser):
+            return None
+        arrays = {column: np.load(os.path.join(directory, column + '.npy'), mmap_mode='r')
+                  for column in COLUMNS}
+    except (OSError, ValueError):
+        return None
+    os.utime(directory)  # Keep recently used snapshots from being pruned
+    table = RobtargetTable(arrays['names'].tolist(), arrays['scopes'].tolist(),
+                           arrays['positions'], arrays['orientations'],
+                           arrays['configs'], arrays['external_axes'])
+    return table, arrays['offsets'], arrays['lines']
+
+
+def prune_snapshots(root=SNAPSHOT_ROOT, keep=MAX_SNAPSHOTS):
+    """Deletes the least recently used snapshots beyond the newest `keep`."""
+    try:
+        entries = [os.path.join(root, name) for name in os.listdir(root)]
+    except OSError:
+        return
+    entries = [path for path in entries if os.path.isdir(path)]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
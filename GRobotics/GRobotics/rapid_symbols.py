@@ -0,0 +1,279 @@
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from robtarget_batch import (ROBTARGET_WIDTH, RobtargetTable, parse_robtarget_literal, parse_literal_block,
+                             _pad_external)
+from rapid_snapshot import source_digest
+
+DECLARATION_TYPES = ('robtarget', 'jointtarget', 'wobjdata', 'tooldata', 'speeddata', 'zonedata', 'num')
+MODULE_EXTENSIONS = ('.mod', '.modx', '.sys', '.sysx')
+# Snapshot tag of robtarget tables built from scan_declarations; change it when the scan does
+PARSER_VERSION = 'symbols/2'
+
+# One pattern for declarations, routine headers/ends and the module header, so a file is indexed
+# in a single pass over its text. The storage class is optional so that pasted lines such as
+# 'robtarget p1:=...;' (the converter's own Copy Results output) are read too.
+SYMBOL_SCAN_PATTERN = re.compile(
+    r'^[ \t]*(?:'
+    r'(?:(?P<scope>LOCAL|TASK)\s+)?(?:(?P<storage>CONST|PERS|VAR)\s+)?(?P<type>' + '|'.join(DECLARATION_TYPES) + r')'
+    r'\s+(?P<name>\w+)\s*(?:\{[^}]*\}\s*)?(?::=\s*(?P<value>[^;]*))?;'
+    r'|(?:LOCAL\s+)?(?:PROC|TRAP|FUNC\s+\w+)\s+(?P<routine>\w+)'
+    r'|(?P<routine_end>ENDPROC|ENDTRAP|ENDFUNC)\b'
+    r'|MODULE\s+(?P<module>\w+)'
+    r')',
+    re.IGNORECASE | re.MULTILINE)
+
+# Any data declaration or routine header, whatever its type, for name clash checks
+DECLARED_NAME_PATTERN = re.compile(
+    r'^[ \t]*(?:(?:LOCAL|TASK)\s+)?(?:(?:CONST|PERS|VAR)\s+\w+|' + '|'.join(DECLARATION_TYPES) +
+    r'|PROC|TRAP|FUNC\s+\w+)\s+(\w+)',
+    re.IGNORECASE | re.MULTILINE)
+
+AGGREGATE_TOKEN_PATTERN = re.compile(r'\s*(?:(\[)|(\])|(,)|"([^"]*)"|([^\s\[\],"]+))')
+
+Symbol = namedtuple('Symbol', 'name type module routine scope storage path first_line last_line value value_span')
+Symbol.__doc__ = """A data declaration: scope is LOCAL, TASK or '' (global), storage CONST, PERS, VAR or '' (none given);
+routine is '' for module-level data; lines are 1-based; value_span is the (start, end) offset of
+the initial value in the source text, or None if it has none."""
+
+
+def parse_aggregate(text):
+    """'[TRUE,[1,2],"s"]' -> [True, [1.0, 2.0], 's']; bare names other than TRUE/FALSE stay strings."""
+    stack = [[]]
+    for match in AGGREGATE_TOKEN_PATTERN.finditer(text):
+        opening, closing, _, string, atom = match.groups()
+        if opening:
+            stack.append([])
+        elif closing:
+            if len(stack) < 2:
+                raise ValueError(f"Unbalanced brackets in: {text}")
+            value = stack.pop()
+            stack[-1].append(value)
+        elif string is not None:
+            stack[-1].append(string)
+        elif atom:
+            upper = atom.upper()
+            if upper in ('TRUE', 'FALSE'):
+                stack[-1].append(upper == 'TRUE')
+            else:
+                try:
+                    stack[-1].append(float(atom))
+                except ValueError:
+                    stack[-1].append(atom)
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise ValueError(f"Not a single aggregate: {text}")
+    return stack[0][0]
+
+
+def declared_names(text):
+    """Lower-case names declared in a module text: data of every type and routines."""
+    return {name.lower() for name in DECLARED_NAME_PATTERN.findall(text)}
+
+
+def scan_declarations(text, path='', module=None):
+    """Indexes the declarations of one module text in a single pass; returns (module name, [Symbol])."""
+    symbols = []
+    routine = ''
+    line, position = 1, 0
+    for match in SYMBOL_SCAN_PATTERN.finditer(text):
+        line += text.count('\n', position, match.start())
+        position = match.start()
+        if match.group('module'):
+            module = module or match.group('module')
+        elif match.group('routine'):
+            routine = match.group('routine')
+        elif match.group('routine_end'):
+            routine = ''
+        elif match.group('name'):
+            value = match.group('value')
+            span = None
+            if value is not None:
+                value = value.rstrip()
+                span = (match.start('value'), match.start('value') + len(value))
+            symbols.append(Symbol(match.group('name'), match.group('type').lower(), None, routine,
+                                  (match.group('scope') or '').upper(), (match.group('storage') or '').upper(),
+                                  path, line, line + text.count('\n', match.start(), match.end()),
+                                  ' '.join(value.split()) if value is not None else None, span))
+    if module is None:
+        module = os.path.splitext(os.path.basename(path))[0] if path else ''
+    return module, [symbol._replace(module=module) for symbol in symbols]
+
+
+class SymbolTable:
+    """Declarations of robtarget, jointtarget, wobjdata, tooldata, speeddata, zonedata and num across modules.
+
+    Files are indexed by key (normally their path); re-indexing a file whose content hash is
+    unchanged is free, and a changed file only replaces its own entries.
+    """
+
+    def __init__(self):
+        self._files = {}    # key -> (digest, module, [Symbol])
+        self._by_name = {}  # lower-case name -> [Symbol]
+
+    def __len__(self):
+        return sum(len(symbols) for _, _, symbols in self._files.values())
+
+    def __contains__(self, key):
+        return key in self._files
+
+    def files(self):
+        return list(self._files)
+
+    def update_text(self, key, text, module=None):
+        """Indexes a module text under key; returns False if it was already indexed unchanged."""
+        digest = source_digest(text)
+        current = self._files.get(key)
+        if current is not None and current[0] == digest:
+            return False
+        self.remove(key)
+        module, symbols = scan_declarations(text, key, module)
+        self._files[key] = (digest, module, symbols)
+        for symbol in symbols:
+            self._by_name.setdefault(symbol.name.lower(), []).append(symbol)
+        return True
+
+    def update_file(self, path):
+        with open(path, 'r', newline='') as file:
+            text = file.read()
+        return self.update_text(path, text)
+
+    def update_directory(self, directory, extensions=MODULE_EXTENSIONS):
+        """Indexes every module under a directory and drops files that no longer exist; returns changed paths."""
+        changed, seen = [], set()
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(extensions):
+                    path = os.path.join(root, name)
+                    seen.add(path)
+                    if self.update_file(path):
+                        changed.append(path)
+        prefix = os.path.join(directory, '')
+        for key in [key for key in self._files if key.startswith(prefix) and key not in seen]:
+            self.remove(key)
+            changed.append(key)
+        return changed
+
+    def remove(self, key):
+        current = self._files.pop(key, None)
+        if current is None:
+            return
+        for symbol in current[2]:
+            entries = self._by_name[symbol.name.lower()]
+            entries.remove(symbol)
+            if not entries:
+                del self._by_name[symbol.name.lower()]
+
+    def symbols(self, key=None, data_type=None):
+        """All symbols, or those of one file, optionally of one data type, in source order."""
+        keys = self._files if key is None else ([key] if key in self._files else [])
+        return [symbol for k in keys for symbol in self._files[k][2]
+                if data_type is None or symbol.type == data_type]
+
+    def module_of(self, key):
+        current = self._files.get(key)
+        return current[1] if current else None
+
+    def lookup(self, name, data_type=None, key=None):
+        """Declarations of a name (case-insensitive); with key, only those visible from that file.
+
+        Data of the file itself is returned first, then global data of other modules.
+        """
+        found = [symbol for symbol in self._by_name.get(name.lower(), ())
+                 if data_type is None or symbol.type == data_type]
+        if key is not None:
+            found = ([symbol for symbol in found if symbol.path == key] +
+                     [symbol for symbol in found if symbol.path != key and symbol.scope != 'LOCAL'
+                      and not symbol.routine])
+        return found
+
+    def visible(self, key, data_type):
+        """{name: Symbol} of a type as seen from one file: its own data shadows other modules' globals."""
+        result = {}
+        for other, (_, _, symbols) in self._files.items():
+            if other == key:
+                continue
+            for symbol in symbols:
+                if symbol.type == data_type and symbol.scope != 'LOCAL' and not symbol.routine:
+                    result.setdefault(symbol.name, symbol)
+        for symbol in self._files.get(key, (None, None, []))[2]:
+            if symbol.type == data_type and not symbol.routine:
+                result[symbol.name] = symbol
+        return result
+
+    def robtarget_values(self, key):
+        """{name: [pos, ori, cfg, ext]} of the robtargets visible from a file that have a literal value."""
+        values = {}
+        for name, symbol in self.visible(key, 'robtarget').items():
+            try:
+                values[name] = parse_robtarget_literal(''.join(symbol.value.split()))
+            except (AttributeError, ValueError, IndexError):
+                continue
+        return values
+
+    def literal_values(self, data_type, key=None):
+        """{name: value} of the declarations of one type that have a literal value, routine data included.
+
+        robtargets parse to [pos, ori, cfg, ext] lists, num to a float and other types through
+        parse_aggregate; later declarations of a name win.
+        """
+        values = {}
+        for symbol in self.symbols(key, data_type):
+            if symbol.value is None:
+                continue
+            try:
+                if data_type == 'robtarget':
+                    values[symbol.name] = parse_robtarget_literal(''.join(symbol.value.split()))
+                elif data_type == 'num':
+                    values[symbol.name] = float(symbol.value)
+                else:
+                    values[symbol.name] = parse_aggregate(symbol.value)
+            except (ValueError, IndexError):
+                continue
+        return values
+
+    def robtarget_table(self, key=None):
+        """RobtargetTable of the robtargets with a literal value; later declarations of a name win.
+
+        Returns (table, value spans, first lines) so callers can map rows back to the source.
+        """
+        latest = {}
+        for symbol in self.symbols(key, 'robtarget'):
+            if symbol.value is not None:
+                latest[symbol.name] = symbol
+        symbols = list(latest.values())
+        values = [''.join(symbol.value.split()) for symbol in symbols]
+        block = parse_literal_block(values)
+        if block is None:
+            # Some values are not plain literals: parse row by row and skip those
+            rows, parsed = [], []
+            for i, value in enumerate(values):
+                try:
+                    pos, ori, cfg, ext = parse_robtarget_literal(value)
+                    parsed.append(pos + ori + cfg + _pad_external(ext))
+                    rows.append(i)
+                except (ValueError, IndexError):
+                    continue
+            symbols = [symbols[i] for i in rows]
+            block = np.array(parsed, dtype=float).reshape(-1, ROBTARGET_WIDTH)
+        table = RobtargetTable([symbol.name for symbol in symbols],
+                               [' '.join(part for part in (symbol.scope, symbol.storage) if part)
+                                for symbol in symbols],
+                               block[:, 0:3], block[:, 3:7], block[:, 7:11].astype(np.int32), block[:, 11:17])
+        return (table, [symbol.value_span for symbol in symbols],
+                [symbol.first_line for symbol in symbols])
+
+    def frames(self, kind='wobjdata', key=None):
+        """{name: {'position', 'orientation'}} of wobjdata (user frame) or tooldata (tool frame)."""
+        frames = {}
+        for symbol in self.symbols(key, kind):
+            try:
+                value = parse_aggregate(symbol.value)
+                frame = value[3] if kind == 'wobjdata' else value[1]
+                frames[symbol.name] = {'position': [float(x) for x in frame[0]],
+                                       'orientation': [float(x) for x in frame[1]]}
+            except (TypeError, ValueError, IndexError):
+                continue
+        return frames
@@ -0,0 +1,232 @@
+import time
+
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+
+class RobotModel:
+    """Ortho-parallel 6-axis arm with a spherical wrist, described by its OPW link parameters.
+
+    Lengths are in mm: a1 axis 1 to axis 2 offset, a2 forearm offset, b lateral offset,
+    c1 base height, c2 lower arm, c3 forearm, c4 wrist centre to flange.
+    Joint angles are the robot's own (degrees); model angle = sign * robot angle + offset.
+    """
+
+    def __init__(self, name, a1, a2, b, c1, c2, c3, c4, joint_limits,
+                 offsets=(0, 0, np.pi / 2, 0, 0, 0), signs=(1, 1, 1, 1, 1, 1)):
+        self.name = name
+        self.a1, self.a2, self.b = a1, a2, b
+        self.c1, self.c2, self.c3, self.c4 = c1, c2, c3, c4
+        self.joint_limits = np.radians(np.array(joint_limits, dtype=float))
+        self.offsets = np.array(offsets, dtype=float)
+        self.signs = np.array(signs, dtype=float)
+
+    def to_model(self, joints):
+        return joints * self.signs + self.offsets
+
+    def to_robot(self, joints):
+        return (joints - self.offsets) * self.signs
+
+
+# Nominal ABB geometries (product specifications); joint limits in degrees
+ROBOT_MODELS = {
+    'IRB 2400-10': RobotModel('IRB 2400-10', 100, -135, 0, 615, 705, 755, 85,
+                              [(-180, 180), (-100, 110), (-60, 65), (-200, 200), (-120, 120), (-400, 400)]),
+    'IRB 4600-60/2.05': RobotModel('IRB 4600-60/2.05', 175, -175, 0, 495, 900, 960, 135,
+                                   [(-180, 180), (-90, 150), (-180, 75), (-400, 400), (-125, 120), (-400, 400)]),
+    'IRB 6700-200/2.60': RobotModel('IRB 6700-200/2.60', 320, -200, 0, 780, 1125, 1142.5, 200,
+                                    [(-170, 170), (-65, 85), (-180, 70), (-300, 300), (-130, 130), (-360, 360)]),
+}
+
+
+def _rz_ry(theta_z, theta_y):
+    """Stacked Rz(theta_z) @ Ry(theta_y) matrices."""
+    cz, sz = np.cos(theta_z), np.sin(theta_z)
+    cy, sy = np.cos(theta_y), np.sin(theta_y)
+    return np.stack([
+        np.stack([cz * cy, -sz, cz * sy], axis=-1),
+        np.stack([sz * cy, cz, sz * sy], axis=-1),
+        np.stack([-sy, np.zeros_like(cy), cy], axis=-1),
+    ], axis=-2)
+
+
+def _zyz(q4, q5, q6):
+    """Stacked Rz(q4) @ Ry(q5) @ Rz(q6) matrices."""
+    return _rz_ry(q4, q5) @ _rz_ry(q6, np.zeros_like(q6))
+
+
+def rapid_to_matrix(orientations):
+    """RAPID quaternions [q1, q2, q3, q4] = [w, x, y, z] to rotation matrices."""
+    orientations = np.asarray(orientations, dtype=float).reshape(-1, 4)
+    return Rotation.from_quat(orientations[:, [1, 2, 3, 0]]).as_matrix()
+
+
+def matrix_to_rapid(matrices):
+    quat = Rotation.from_matrix(matrices).as_quat()
+    return quat[:, [3, 0, 1, 2]]
+
+
+def forward_kinematics(model, joints):
+    """Flange poses for N joint sets (degrees): returns positions (N, 3) and RAPID quaternions (N, 4)."""
+    q = model.to_model(np.radians(np.asarray(joints, dtype=float).reshape(-1, 6)))
+    psi3 = np.arctan2(model.a2, model.c3)
+    k = np.hypot(model.a2, model.c3)
+    cx1 = model.c2 * np.sin(q[:, 1]) + k * np.sin(q[:, 1] + q[:, 2] + psi3) + model.a1
+    cz1 = model.c2 * np.cos(q[:, 1]) + k * np.cos(q[:, 1] + q[:, 2] + psi3)
+    c1, s1 = np.cos(q[:, 0]), np.sin(q[:, 0])
+    centre = np.stack([cx1 * c1 - model.b * s1, cx1 * s1 + model.b * c1, cz1 + model.c1], axis=-1)
+
+    rotation = _rz_ry(q[:, 0], q[:, 1] + q[:, 2]) @ _zyz(q[:, 3], q[:, 4], q[:, 5])
+    positions = centre + model.c4 * rotation[:, :, 2]
+    return positions, matrix_to_rapid(rotation)
+
+
+def inverse_kinematics(model, positions, orientations):
+    """All 8 closed-form solutions per flange pose, in one vectorized pass.
+
+    Returns joints (N, 8, 6) in robot degrees wrapped to (-180, 180]; unreachable solutions are NaN.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    rotation = rapid_to_matrix(orientations)
+    centre = positions - model.c4 * rotation[:, :, 2]
+    cx0, cy0, cz0 = centre[:, 0], centre[:, 1], centre[:, 2]
+    a1, a2, b, c1, c2, c3 = model.a1, model.a2, model.b, model.c1, model.c2, model.c3
+
+    with np.errstate(invalid='ignore'):
+        nx1 = np.sqrt(cx0 ** 2 + cy0 ** 2 - b ** 2) - a1
+        s1_sq = nx1 ** 2 + (cz0 - c1) ** 2
+        s2_sq = (nx1 + 2 * a1) ** 2 + (cz0 - c1) ** 2
+        k_sq = a2 ** 2 + c3 ** 2
+
+        theta1_front = np.arctan2(cy0, cx0) - np.arctan2(b, nx1 + a1)
+        theta1_back = np.arctan2(cy0, cx0) + np.arctan2(b, nx1 + a1) - np.pi
+
+        # NaN from arccos marks a wrist centre out of reach of that arm branch
+        shoulder_front = np.arccos((s1_sq + c2 ** 2 - k_sq) / (2 * np.sqrt(s1_sq) * c2))
+        shoulder_back = np.arccos((s2_sq + c2 ** 2 - k_sq) / (2 * np.sqrt(s2_sq) * c2))
+        elbow_front = np.arccos((s1_sq - c2 ** 2 - k_sq) / (2 * c2 * np.sqrt(k_sq)))
+        elbow_back = np.arccos((s2_sq - c2 ** 2 - k_sq) / (2 * c2 * np.sqrt(k_sq)))
+    psi3 = np.arctan2(a2, c3)
+    reach_front = np.arctan2(nx1, cz0 - c1)
+    reach_back = np.arctan2(nx1 + 2 * a1, cz0 - c1)
+
+    # Arm solutions (N, 4): front/back of axis 1 x elbow up/down
+    theta1 = np.stack([theta1_front, theta1_front, theta1_back, theta1_back], axis=1)
+    theta2 = np.stack([reach_front - shoulder_front, reach_front + shoulder_front,
+                       -shoulder_back - reach_back, shoulder_back - reach_back], axis=1)
+    theta3 = np.stack([elbow_front - psi3, -elbow_front - psi3,
+                       elbow_back - psi3, -elbow_back - psi3], axis=1)
+
+    # Wrist: decompose the remaining rotation as ZYZ Euler angles
+    wrist = np.swapaxes(_rz_ry(theta1, theta2 + theta3), -1, -2) @ rotation[:, None]
+    cos5 = np.clip(wrist[..., 2, 2], -1.0, 1.0)
+    theta5 = np.arctan2(np.sqrt(1 - cos5 ** 2), cos5)
+    theta4 = np.arctan2(wrist[..., 1, 2], wrist[..., 0, 2])
+    theta6 = np.arctan2(wrist[..., 2, 1], -wrist[..., 2, 0])
+    singular = np.abs(np.sin(theta5)) < 1e-9
+    theta4 = np.where(singular, 0.0, theta4)
+    theta6 = np.where(singular, np.arctan2(wrist[..., 1, 0], wrist[..., 0, 0]), theta6)
+
+    arm = np.stack([theta1, theta2, theta3], axis=-1)
+    flip = np.stack([theta4, theta5, theta6], axis=-1)
+    flipped = np.stack([theta4 + np.pi, -theta5, theta6 - np.pi], axis=-1)
+    solutions = np.concatenate([np.concatenate([arm, flip], axis=-1),
+                                np.concatenate([arm, flipped], axis=-1)], axis=1)
+
+    joints = model.to_robot(solutions)
+    joints = (joints + np.pi) % (2 * np.pi) - np.pi
+    joints[np.isnan(joints).any(axis=-1)] = np.nan
+    return np.degrees(joints)
+
+
+def quadrant(angles):
+    """ABB quadrant number of joint angles in degrees: 0 for [0, 90), -1 for [-90, 0), ..."""
+    return np.floor(np.asarray(angles) / 90.0).astype(np.int32)
+
+
+def config_data(model, joints):
+    """[cf1, cf4, cf6, cfx] for joint sets (..., 6) in robot degrees."""
+    q = model.to_model(np.radians(joints))
+    psi3 = np.arctan2(model.a2, model.c3)
+    k = np.hypot(model.a2, model.c3)
+    # Wrist centre in the plane of the arm, relative to axis 2
+    reach = model.c2 * np.sin(q[..., 1]) + k * np.sin(q[..., 1] + q[..., 2] + psi3)
+    height = model.c2 * np.cos(q[..., 1]) + k * np.cos(q[..., 1] + q[..., 2] + psi3)
+    behind_axis1 = (reach + model.a1) < 0
+    behind_lower_arm = (reach * np.cos(q[..., 1]) - height * np.sin(q[..., 1])) < 0
+    negative_axis5 = joints[..., 4] < 0
+    cfx = 4 * behind_axis1 + 2 * behind_lower_arm + negative_axis5
+    return np.stack([quadrant(joints[..., 0]), quadrant(joints[..., 3]),
+                     quadrant(joints[..., 5]), cfx.astype(np.int32)], axis=-1)
+
+
+def _turn_variants(model, solutions):
+    """Adds +-360 degree copies of axes 4 and 6 (N, 8, 6) -> (N, 72, 6); limits decide which are usable."""
+    shifts = np.array([-360.0, 0.0, 360.0])
+    shift4, shift6 = np.meshgrid(shifts, shifts, indexing='ij')
+    offsets = np.zeros((9, 6))
+    offsets[:, 3] = shift4.ravel()
+    offsets[:, 5] = shift6.ravel()
+    variants = solutions[:, :, None, :] + offsets[None, None]
+    return variants.reshape(len(solutions), -1, 6)
+
+
+def validate_targets(model, positions, orientations, configs, tool=None):
+    """Checks N robtargets (base frame) against the robot's reach, joint limits and config data.
+
+    tool: optional {'position', 'orientation'} TCP frame; targets are the TCP pose, tool0 by default.
+    Returns a dict of arrays: reachable, within_limits, config_ok, configs (recomputed cf values)
+    and joints (the chosen solution in degrees, NaN if none).
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    configs = np.asarray(configs, dtype=np.int32).reshape(-1, 4)
+    if tool is not None:
+        tcp = rapid_to_matrix(tool['orientation'])[0]
+        target_rotation = rapid_to_matrix(orientations)
+        flange_rotation = target_rotation @ tcp.T
+        positions = positions - flange_rotation @ np.asarray(tool['position'], dtype=float)
+        orientations = matrix_to_rapid(flange_rotation)
+
+    solutions = _turn_variants(model, inverse_kinematics(model, positions, orientations))
+    reachable = ~np.isnan(solutions).any(axis=-1)
+    lower, upper = model.joint_limits[:, 0], model.joint_limits[:, 1]
+    within = reachable & np.all((solutions >= np.degrees(lower)) & (solutions <= np.degrees(upper)), axis=-1)
+
+    candidate_configs = config_data(model, np.nan_to_num(solutions))
+    # Prefer the same arm configuration (cfx), then the closest quadrants
+    distance = np.abs(candidate_configs[..., :3] - configs[:, None, :3]).sum(axis=-1)
+    distance = distance + 100 * (candidate_configs[..., 3] != configs[:, None, 3])
+    distance = np.where(within, distance, np.iinfo(np.int32).max)
+    best = np.argmin(distance, axis=1)
+    rows = np.arange(len(positions))
+    any_within = within[rows, best]
+
+    new_configs = np.where(any_within[:, None], candidate_configs[rows, best], configs)
+    joints = np.where(any_within[:, None], solutions[rows, best], np.nan)
+    return {
+        'reachable': reachable.any(axis=1),
+        'within_limits': any_within,
+        'config_ok': any_within & (distance[rows, best] == 0),
+        'configs': new_configs.astype(np.int32),
+        'joints': joints,
+    }
+
+
+def benchmark(model=None, count=100000, seed=0):
+    """Times inverse kinematics on random reachable poses; returns targets per second."""
+    model = model or ROBOT_MODELS['IRB 4600-60/2.05']
+    rng = np.random.default_rng(seed)
+    lower, upper = np.degrees(model.joint_limits[:, 0]), np.degrees(model.joint_limits[:, 1])
+    joints = rng.uniform(np.maximum(lower, -170), np.minimum(upper, 170), size=(count, 6))
+    positions, orientations = forward_kinematics(model, joints)
+    configs = config_data(model, joints)
+
+    start = time.perf_counter()
+    validate_targets(model, positions, orientations, configs)
+    elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+if __name__ == '__main__':
+    for name, robot in ROBOT_MODELS.items():
+        print(f"{name}: {benchmark(robot):,.0f} targets/s")
@@ -0,0 +1,157 @@
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+# Value RAPID uses for an unused external axis
+EXTERNAL_AXIS_UNSET = 9e9
+# Numbers in a robtarget: position(3), orientation(4), robot config(4), external axes(6)
+ROBTARGET_WIDTH = 17
+# Rough bytes per row held outside the NumPy columns: name and scope strings, list slots, name index
+ROW_OVERHEAD = 200
+
+
+class RobtargetTable:
+    """Robtargets stored as parallel NumPy columns, one row per target."""
+
+    def __init__(self, names=None, scopes=None, positions=None, orientations=None,
+                 configs=None, external_axes=None):
+        self.names = list(names or [])
+        count = len(self.names)
+        self.scopes = list(scopes) if scopes is not None else [''] * count
+        self.positions = _column(positions, (count, 3), float)
+        self.orientations = _column(orientations, (count, 4), float)
+        self.configs = _column(configs, (count, 4), np.int32)
+        self.external_axes = _column(external_axes, (count, 6), float)
+        self._name_to_row = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from (name, scope, [pos, ori, cfg, ext]) records."""
+        records = list(records)
+        if not records:
+            return cls()
+        names, scopes, data = zip(*records)
+        return cls(names, scopes,
+                   [d[0] for d in data], [d[1] for d in data],
+                   [d[2] for d in data], [_pad_external(d[3]) for d in data])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getstate__(self):
+        # The name index is as large as the names themselves and cheap to rebuild
+        state = self.__dict__.copy()
+        del state['_name_to_row']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._name_to_row = {name: i for i, name in enumerate(self.names)}
+
+    def nbytes(self):
+        """Approximate memory held by the table."""
+        columns = (self.positions, self.orientations, self.configs, self.external_axes)
+        return sum(column.nbytes for column in columns) + len(self.names) * ROW_OVERHEAD
+
+    def __contains__(self, name):
+        return name in self._name_to_row
+
+    def index_of(self, name):
+        """Return the row of a target name, or None if it is not loaded."""
+        return self._name_to_row.get(name)
+
+    def row(self, index):
+        """Return a row as the nested [pos, ori, cfg, ext] lists used by the GUI."""
+        return [self.positions[index].tolist(),
+                self.orientations[index].tolist(),
+                self.configs[index].tolist(),
+                self.external_axes[index].tolist()]
+
+    def take(self, rows):
+        """Return a new table holding only the given rows, in the given order."""
+        rows = np.asarray(rows, dtype=np.intp)
+        return RobtargetTable([self.names[i] for i in rows], [self.scopes[i] for i in rows],
+                              self.positions[rows], self.orientations[rows],
+                              self.configs[rows], self.external_axes[rows])
+
+
+def parse_robtarget_literal(data_string):
+    """Parses '[[x,y,z],[q1,q2,q3,q4],[cf1,cf4,cf6,cfx],[e1,...]]' into [pos, ori, cfg, ext] lists."""
+    parts = data_string.strip('[]').split('],[')
+    return [
+        [float(x) for x in parts[0].split(',')],
+        [float(x) for x in parts[1].split(',')],
+        [int(x) for x in parts[2].split(',')],
+        [float(x) for x in parts[3].split(',')]
+    ]
+
+
+def parse_literal_block(literals):
+    """Parses many inline robtarget literals at once into an (N, 17) array; None if any is irregular."""
+    if not literals:
+        return np.empty((0, ROBTARGET_WIDTH))
+    joined = ','.join(literals).replace('[', '').replace(']', '')
+    try:
+        values = np.array(joined.split(','), dtype=float)
+    except ValueError:
+        return None
+    if values.size != len(literals) * ROBTARGET_WIDTH:
+        return None
+    return values.reshape(-1, ROBTARGET_WIDTH)
+
+
+def _column(values, shape, dtype):
+    if values is None or len(values) == 0:
+        return np.zeros(shape, dtype=dtype)
+    # asarray keeps memory-mapped snapshot columns mapped instead of copying them
+    return np.asarray(values, dtype=dtype).reshape(shape)
+
+
+def _pad_external(values):
+    values = list(values)[:6]
+    return values + [EXTERNAL_AXIS_UNSET] * (6 - len(values))
+
+
+def frame_change(input_coord_system, output_coord_system):
+    """Return the single (rotation, translation) that maps input frame data into the output frame."""
+    input_rotation = Rotation.from_quat(input_coord_system['orientation'])
+    output_rotation = Rotation.from_quat(output_coord_system['orientation'])
+    rotation = output_rotation * input_rotation.inv()
+    translation = (np.asarray(output_coord_system['position'], dtype=float)
+                   - rotation.apply(np.asarray(input_coord_system['position'], dtype=float)))
+    return rotation, translation
+
+
+def transform_robtargets(positions, orientations, input_coord_system, output_coord_system):
+    """Vectorized transform_robtarget: converts N positions and orientations in one pass."""
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    orientations = np.asarray(orientations, dtype=float).reshape(-1, 4)
+    if len(positions) == 0:
+        return positions.copy(), orientations.copy()
+    rotation, translation = frame_change(input_coord_system, output_coord_system)
+    new_positions = positions @ rotation.as_matrix().T + translation
+    new_orientations = quaternion_multiply(rotation.as_quat(), orientations)
+    return new_positions, new_orientations
+
+
+def quaternion_multiply(left, right):
+    """Hamilton product left * right of [x, y, z, w] quaternions, normalized; broadcasts over rows."""
+    right = np.asarray(right, dtype=float)
+    right = right / np.linalg.norm(right, axis=-1, keepdims=True)
+    x1, y1, z1, w1 = np.moveaxis(np.asarray(left, dtype=float), -1, 0)
+    x2, y2, z2, w2 = np.moveaxis(right, -1, 0)
+    return np.stack([
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+    ], axis=-1)
+
+
+def format_pose(position, orientation, config, external_axis):
+    """Formats a single table row like Target_converter.format_robtarget."""
+    pos = ', '.join(f"{x:.2f}" for x in position)
+    ori = ', '.join(f"{x:.6f}" for x in orientation)
+    cfg = ', '.join(str(int(x)) for x in config)
+    ext = ', '.join(f"{x:.2f}" if abs(x - EXTERNAL_AXIS_UNSET) >= 1e-6 else "9E+09"
+                    for x in external_axis)
+    return f"[[{pos}], [{ori}], [{cfg}], [{ext}]]"
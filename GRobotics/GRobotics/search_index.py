@@ -0,0 +1,303 @@
+import bisect
+import os
+import queue
+import re
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from rapid_lexer import scan_outline
+from rapid_snapshot import source_digest
+from rapid_symbols import MODULE_EXTENSIONS
+
+WORD_PATTERN = re.compile(r'\b[a-z_]\w*')
+DEFAULT_LIMIT = 500
+# Rough bytes per posting beyond its line array: the array object and its dictionary entry
+POSTING_OVERHEAD = 200
+
+Hit = namedtuple('Hit', 'path line kind text')
+Hit.__doc__ = """A search result: 1-based line, kind is '' for a text match or the declared kind
+(proc, func, trap, module, record or a data type such as robtarget or signaldo)."""
+
+
+def index_text(text):
+    """(postings {word: line array}, symbols [(name, kind, line)]) of one module text; lines are 1-based."""
+    postings = {}
+    lines = text.split('\n')
+    for number, line in enumerate(lines, start=1):
+        for word in set(WORD_PATTERN.findall(line.lower())):
+            postings.setdefault(word, []).append(number)
+    postings = {word: np.array(numbers, dtype=np.int64) for word, numbers in postings.items()}
+    items, _ = scan_outline(lines)
+    symbols = [(item.name, (item.data_type if item.kind == 'DATA' else item.kind).lower(), item.line + 1)
+               for item in items]
+    return postings, symbols
+
+
+class SearchIndex:
+    """Inverted index of the words of many module files, plus the symbols they declare.
+
+    Each word maps to {file id: array of line numbers}. A hit is the 64-bit key
+    file id << 32 | line, so AND-ing terms is an intersection of sorted integer arrays
+    and a query costs a few dictionary lookups and NumPy calls whatever the number of
+    files. Files are re-indexed only when their content hash changes, and all methods
+    may be called from any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ids = {}         # path -> file id, kept when the file is re-indexed
+        self._paths = {}       # file id -> path
+        self._digests = {}     # path -> digest of the indexed content
+        self._file_words = {}  # path -> words of that file
+        self._postings = {}    # word -> {file id: line array}
+        self._file_symbols = {}  # path -> [(name, kind, line)]
+        self._symbols = {}     # lower-case name -> [(kind, file id, line)]
+        self._vocabulary = None  # sorted words for prefix queries, rebuilt after changes
+
+    def __len__(self):
+        return len(self._digests)
+
+    def files(self):
+        with self._lock:
+            return list(self._digests)
+
+    def memory_usage(self):
+        """Approximate bytes held by the postings."""
+        with self._lock:
+            return sum(lines.nbytes + POSTING_OVERHEAD
+                       for files in self._postings.values() for lines in files.values())
+
+    def update_file(self, path):
+        """Indexes a file if its content changed; returns True if it was (re)indexed."""
+        with open(path, 'rb') as file:
+            data = file.read()
+        digest = source_digest(data)
+        if self._digests.get(path) == digest:
+            return False
+        # Index outside the lock so searches are not held up by a large file
+        postings, symbols = index_text(data.decode('utf-8', errors='replace'))
+        with self._lock:
+            self.remove(path)
+            file_id = self._ids.setdefault(path, len(self._ids))
+            self._paths[file_id] = path
+            self._digests[path] = digest
+            self._file_words[path] = list(postings)
+            for word, lines in postings.items():
+                self._postings.setdefault(word, {})[file_id] = lines
+            self._file_symbols[path] = symbols
+            for name, kind, line in symbols:
+                self._symbols.setdefault(name.lower(), []).append((kind, file_id, line))
+            self._vocabulary = None
+        return True
+
+    def update_directory(self, directory, extensions=MODULE_EXTENSIONS):
+        """Indexes every module under a directory and drops vanished ones; returns the changed paths."""
+        changed, seen = [], set()
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(extensions):
+                    path = os.path.join(root, name)
+                    seen.add(path)
+                    if self.update_file(path):
+                        changed.append(path)
+        prefix = os.path.join(directory, '')
+        with self._lock:
+            vanished = [path for path in self._digests if path.startswith(prefix) and path not in seen]
+            for path in vanished:
+                self.remove(path)
+        return changed + vanished
+
+    def remove(self, path):
+        with self._lock:
+            if self._digests.pop(path, None) is None:
+                return
+            file_id = self._ids[path]
+            for word in self._file_words.pop(path):
+                files = self._postings[word]
+                del files[file_id]
+                if not files:
+                    del self._postings[word]
+            for name, _, _ in self._file_symbols.pop(path):
+                entries = [entry for entry in self._symbols[name.lower()] if entry[1] != file_id]
+                if entries:
+                    self._symbols[name.lower()] = entries
+                else:
+                    del self._symbols[name.lower()]
+            self._vocabulary = None
+
+    def _words(self, term, names=None):
+        """Indexed words matching a term: exact, or a prefix when it ends with '*'."""
+        if not term.endswith('*'):
+            return [term] if names is None or term in names else []
+        prefix = term[:-1]
+        if names is not None:
+            return [name for name in names if name.startswith(prefix)]
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + '\uffff')
+        return self._vocabulary[start:end]
+
+    def _keys(self, words):
+        """Sorted unique hit keys of the lines holding any of the words."""
+        if len(words) == 1:
+            # One word's lines are sorted and unique per file, so file order is enough
+            files = self._postings.get(words[0], {})
+            pieces = [files[file_id] | (file_id << 32) for file_id in sorted(files)]
+        else:
+            pieces = [lines | (file_id << 32) for word in words
+                      for file_id, lines in self._postings.get(word, {}).items()]
+        if not pieces:
+            return np.zeros(0, dtype=np.int64)
+        keys = np.concatenate(pieces)
+        if len(words) > 1:
+            # Sort and drop repeats; np.unique hashes, which is several times slower here
+            keys.sort()
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        return keys
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Runs a query; returns ([Hit], total number of hits) with at most limit hits.
+
+        Terms are AND-ed on the same line: a word, a prefix ending in '*', kind:<kind> to only
+        return declarations of that kind (proc, func, trap, robtarget, signaldo, ...) and
+        re:<pattern> to keep lines matching a regular expression. A query made only of re:
+        terms matches the pattern against the indexed words instead. Hits come file by file
+        in indexing order, then by line.
+        Raises ValueError for a malformed regular expression.
+        """
+        words, kinds, patterns = [], [], []
+        for term in query.lower().split():
+            if term.startswith('kind:'):
+                kinds.append(term[5:])
+            elif term.startswith('re:'):
+                try:
+                    patterns.append(re.compile(term[3:], re.IGNORECASE))
+                except re.error as e:
+                    raise ValueError(f"Invalid pattern '{term[3:]}': {e}")
+            elif term:
+                words.append(term)
+
+        hit_kinds = {}
+        with self._lock:
+            if kinds:
+                hit_kinds = self._symbol_hits(words, kinds)
+                keys = np.array(sorted(hit_kinds), dtype=np.int64)
+            elif words:
+                keys = None
+                for term in words:
+                    lines = self._keys(self._words(term))
+                    keys = lines if keys is None else np.intersect1d(keys, lines, assume_unique=True)
+                    if not len(keys):
+                        break
+            elif patterns:
+                keys = self._keys([word for word in self._postings if all(p.search(word) for p in patterns)])
+                patterns = []
+            else:
+                keys = np.zeros(0, dtype=np.int64)
+            paths = dict(self._paths)
+
+        if patterns:
+            # The index narrows the lines down; only those are read back and matched
+            texts = self._line_texts(keys, paths)
+            selected = [i for i, text in enumerate(texts) if all(p.search(text) for p in patterns)]
+            total = len(selected)
+            keys = keys[selected[:limit]]
+            texts = [texts[i] for i in selected[:limit]]
+        else:
+            total = len(keys)
+            keys = keys[:limit]
+            texts = self._line_texts(keys, paths)
+        return [Hit(paths[int(key) >> 32], int(key) & 0xFFFFFFFF, hit_kinds.get(int(key), ''), text)
+                for key, text in zip(keys, texts)], total
+
+    def _symbol_hits(self, terms, kinds):
+        """{hit key: kind} of the declarations of the given kinds whose names match every term."""
+        names = list(self._symbols)
+        for term in terms:
+            names = self._words(term, names)
+        return {file_id << 32 | line: kind for name in names for kind, file_id, line in self._symbols[name]
+                if kind in kinds}
+
+    @staticmethod
+    def _line_texts(keys, paths):
+        """Source text of the hit lines, reading each file once."""
+        texts = []
+        file_ids = keys >> 32
+        bounds = np.flatnonzero(np.diff(file_ids)) + 1
+        for group in np.split(keys, bounds) if len(keys) else []:
+            path = paths[int(group[0]) >> 32]
+            try:
+                with open(path, 'rb') as file:
+                    lines = file.read().split(b'\n')
+            except OSError:
+                lines = []
+            for line in (group & 0xFFFFFFFF).tolist():
+                text = lines[line - 1] if line <= len(lines) else b''
+                texts.append(text.decode('utf-8', errors='replace').strip())
+        return texts
+
+
+class BackgroundIndexer:
+    """Feeds files and directories to a SearchIndex from a daemon thread, one request at a time."""
+
+    def __init__(self, index=None):
+        self.index = index or SearchIndex()
+        self.errors = []
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='search-indexer', daemon=True)
+        self._thread.start()
+
+    def submit(self, path):
+        """Queues a module file or a directory of modules for (re)indexing."""
+        with self._pending_lock:
+            self._pending += 1
+        self._queue.put(path)
+
+    def busy(self):
+        return self._pending > 0
+
+    def wait(self, timeout=None):
+        """Blocks until every queued request is done; returns False on timeout."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self):
+        """Drops the queued requests and ends the thread after the one in progress."""
+        while True:
+            try:
+                path = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(path, threading.Event):
+                path.set()
+            else:
+                with self._pending_lock:
+                    self._pending -= 1
+        self._queue.put(None)
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            if isinstance(path, threading.Event):
+                path.set()
+                continue
+            try:
+                if os.path.isdir(path):
+                    self.index.update_directory(path)
+                elif os.path.exists(path):
+                    self.index.update_file(path)
+                else:
+                    self.index.remove(path)
+            except Exception as e:  # A bad file must not stop the indexer
+                self.errors.append(f"{path}: {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending -= 1
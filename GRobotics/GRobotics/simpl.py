@@ -1,9 +1,97 @@
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QTextEdit, QFileDialog
+import time
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView,
+                             QHeaderView, QFileDialog, QLabel, QLineEdit, QAbstractItemView, QSplitter)
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer
+from PyQt5.QtGui import QFontDatabase
+
+from line_index import LineIndex
+from rapid_lexer import scan_outline
+from rapid_highlighter import RapidLineDelegate
+
+# Lines scanned for the outline per event-loop turn, so a huge file never blocks the window
+OUTLINE_BATCH = 20000
+
+
+class LineModel(QAbstractListModel):
+    """Lines of a LineIndex; the view only asks for the rows it shows, so only those are decoded."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lines = None
+        self.width = 1
+
+    def set_index(self, line_index):
+        self.beginResetModel()
+        self.lines = line_index
+        self.width = len(str(len(line_index))) if line_index is not None else 1
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.lines is None:
+            return 0
+        return len(self.lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.UserRole):
+            return None
+        row = index.row()
+        line = self.lines.line(row).expandtabs(4)
+        return f"{row + 1:>{self.width}}  {line}" if role == Qt.DisplayRole else line
+
+
+class OutlineModel(QAbstractListModel):
+    """Outline entries of the open file, appended as the background scan finds them."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+
+    def clear(self):
+        self.beginResetModel()
+        self.items = []
+        self.endResetModel()
+
+    def append(self, items):
+        if not items:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.items), len(self.items) + len(items) - 1)
+        self.items.extend(items)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.items[index.row()]
+        if role == Qt.UserRole:
+            return item.line
+        if role != Qt.DisplayRole:
+            return None
+        if item.kind == 'DATA':
+            return f"{'  ' * item.depth}{item.data_type} {item.name}"
+        return f"{'  ' * item.depth}{item.kind} {item.name}"
+
+
+def _fixed_row_table(view, model):
+    """Sets up a headerless one-column QTableView whose fixed row heights keep huge models fast."""
+    view.setModel(model)
+    view.setShowGrid(False)
+    view.setWordWrap(False)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.horizontalHeader().hide()
+    view.horizontalHeader().setStretchLastSection(True)
+    view.verticalHeader().hide()
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 2)
+
 
 class SimplifiedRobotParser(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.line_index = None
         self.initUI()
 
     def initUI(self):
@@ -22,9 +110,47 @@ class SimplifiedRobotParser(QMainWindow):
         self.parse_button.clicked.connect(self.parse_file)
         layout.addWidget(self.parse_button)
 
-        self.output_text = QTextEdit(self)
-        self.output_text.setReadOnly(True)
-        layout.addWidget(self.output_text)
+        navigation_layout = QHBoxLayout()
+        self.line_input = QLineEdit(self)
+        self.line_input.setPlaceholderText("Line number")
+        self.line_input.returnPressed.connect(self.jump_to_line)
+        navigation_layout.addWidget(self.line_input)
+        self.jump_button = QPushButton('Go to Line', self)
+        self.jump_button.clicked.connect(self.jump_to_line)
+        navigation_layout.addWidget(self.jump_button)
+        self.search_input = QLineEdit(self)
+        self.search_input.setPlaceholderText("Search text")
+        self.search_input.returnPressed.connect(self.find_next)
+        navigation_layout.addWidget(self.search_input)
+        self.find_button = QPushButton('Find Next', self)
+        self.find_button.clicked.connect(self.find_next)
+        navigation_layout.addWidget(self.find_button)
+        layout.addLayout(navigation_layout)
+
+        self.status_label = QLabel("", self)
+        layout.addWidget(self.status_label)
+
+        # Table views with fixed row heights place any row without laying out the others
+        # (a QListView lays out every row, which takes seconds per million lines)
+        splitter = QSplitter(Qt.Horizontal, self)
+        self.outline_model = OutlineModel(self)
+        self.outline_view = QTableView(splitter)
+        _fixed_row_table(self.outline_view, self.outline_model)
+        self.outline_view.clicked.connect(lambda index: self.show_line(index.data(Qt.UserRole)))
+
+        self.line_model = LineModel(self)
+        self.output_view = QTableView(splitter)
+        self.output_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        _fixed_row_table(self.output_view, self.line_model)
+        self.line_delegate = RapidLineDelegate(self.output_view)
+        self.output_view.setItemDelegate(self.line_delegate)
+        splitter.setStretchFactor(1, 3)
+        layout.addWidget(splitter, 1)
+
+        self.outline_timer = QTimer(self)
+        self.outline_timer.timeout.connect(self.scan_outline_batch)
+        self.outline_line = 0
+        self.outline_state = 0
 
         self.file_path = None
 
@@ -33,22 +159,84 @@ class SimplifiedRobotParser(QMainWindow):
         file_name, _ = QFileDialog.getOpenFileName(self, "Select Text File", "", "Text Files (*.mod);;All Files (*)", options=options)
         if file_name:
             self.file_path = file_name
-            self.output_text.setText(f"Selected file: {self.file_path}")
+            self.status_label.setText(f"Selected file: {self.file_path}")
 
     def parse_file(self):
         if not self.file_path:
-            self.output_text.setText("Please select a file first.")
+            self.status_label.setText("Please select a file first.")
             return
 
         try:
-            with open(self.file_path, 'r') as file:
-                content = file.read()
-            self.output_text.setText(f"File content:\n{content}")
+            start = time.perf_counter()
+            line_index = LineIndex(self.file_path)
         except Exception as e:
-            self.output_text.setText(f"An error occurred: {str(e)}")
+            self.status_label.setText(f"An error occurred: {str(e)}")
+            return
+        self.outline_timer.stop()
+        self.outline_model.clear()
+        self.line_delegate.clear_cache()
+        self.line_model.set_index(line_index)
+        if self.line_index is not None:
+            self.line_index.close()
+        self.line_index = line_index
+        self.status_label.setText(f"{self.file_path}: {len(line_index):,} lines, "
+                                  f"{line_index.size / 1e6:,.1f} MB, opened in {time.perf_counter() - start:.2f} s")
+        self.outline_line = 0
+        self.outline_state = 0
+        self.outline_timer.start(0)
+
+    def open_file(self, file_path):
+        self.file_path = file_path
+        self.parse_file()
+
+    def scan_outline_batch(self):
+        """Adds the outline entries of the next OUTLINE_BATCH lines; stops at the end of the file."""
+        if self.line_index is None or self.outline_line >= len(self.line_index):
+            self.outline_timer.stop()
+            return
+        lines = self.line_index.lines(self.outline_line, OUTLINE_BATCH)
+        items, self.outline_state = scan_outline(lines, self.outline_line, self.outline_state)
+        self.outline_model.append(items)
+        self.outline_line += len(lines)
+
+    def show_line(self, number):
+        index = self.line_model.index(number)
+        self.output_view.setCurrentIndex(index)
+        self.output_view.scrollTo(index, QAbstractItemView.PositionAtTop)
+
+    def jump_to_line(self):
+        if self.line_index is None:
+            return
+        try:
+            number = int(self.line_input.text())
+        except ValueError:
+            self.status_label.setText("Line number must be an integer.")
+            return
+        self.show_line(min(max(number, 1), len(self.line_index)) - 1)
+
+    def find_next(self):
+        text = self.search_input.text()
+        if self.line_index is None or not text:
+            return
+        current = self.output_view.currentIndex()
+        start_line = current.row() + 1 if current.isValid() else 0
+        number = self.line_index.search(text, start_line)
+        if number is None:
+            self.status_label.setText(f"'{text}' not found.")
+        else:
+            self.show_line(number)
+            self.status_label.setText(f"'{text}' found on line {number + 1:,}.")
+
+    def closeEvent(self, event):
+        self.outline_timer.stop()
+        if self.line_index is not None:
+            self.line_model.set_index(None)
+            self.line_index.close()
+            self.line_index = None
+        super().closeEvent(event)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     ex = SimplifiedRobotParser()
     ex.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())
@@ -0,0 +1,115 @@
+import bisect
+import re
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+CONFIG_FIELDS = ('cf1', 'cf4', 'cf6', 'cfx')
+
+
+class TargetIndex:
+    """Spatial and attribute indexes over a RobtargetTable, answering queries with sorted row arrays."""
+
+    def __init__(self, table):
+        self.table = table
+        self.row_count = len(table)
+        self.tree = cKDTree(table.positions) if self.row_count else None
+
+        # Inverted indexes: config field -> value -> rows holding that value
+        self.config_index = {}
+        for column, field in enumerate(CONFIG_FIELDS):
+            values = table.configs[:, column]
+            order = np.argsort(values, kind='stable')
+            unique, starts = np.unique(values[order], return_index=True)
+            bounds = list(starts) + [len(order)]
+            self.config_index[field] = {
+                int(value): np.sort(order[bounds[i]:bounds[i + 1]])
+                for i, value in enumerate(unique)
+            }
+
+        # Names sorted case-insensitively, so a prefix maps to one contiguous slice
+        keys = [name.lower() for name in table.names]
+        self.name_order = np.array(sorted(range(self.row_count), key=keys.__getitem__), dtype=np.intp)
+        self.sorted_names = [keys[i] for i in self.name_order]
+
+    def all_rows(self):
+        return np.arange(self.row_count, dtype=np.intp)
+
+    def in_box(self, lower, upper):
+        """Rows whose position lies inside the axis-aligned box lower..upper."""
+        if self.tree is None:
+            return self.all_rows()
+        lower, upper = np.minimum(lower, upper), np.maximum(lower, upper)
+        center = (lower + upper) / 2
+        # Chebyshev ball around the center covers the box; the exact test runs on those candidates only
+        candidates = np.array(self.tree.query_ball_point(center, np.max(upper - center), p=np.inf),
+                              dtype=np.intp)
+        if len(candidates) == 0:
+            return candidates
+        positions = self.table.positions[candidates]
+        inside = np.all((positions >= lower) & (positions <= upper), axis=1)
+        return np.sort(candidates[inside])
+
+    def within(self, point, radius):
+        """Rows whose position is within radius of point."""
+        if self.tree is None:
+            return self.all_rows()
+        return np.sort(np.array(self.tree.query_ball_point(point, radius), dtype=np.intp))
+
+    def nearest(self, point, count=1):
+        """The count rows nearest to point, closest first."""
+        if self.tree is None:
+            return self.all_rows()
+        count = min(count, self.row_count)
+        _, rows = self.tree.query(point, k=count)
+        return np.atleast_1d(rows).astype(np.intp)
+
+    def with_config(self, field, value):
+        return self.config_index[field].get(value, np.empty(0, dtype=np.intp))
+
+    def with_prefix(self, prefix):
+        prefix = prefix.lower()
+        first = bisect.bisect_left(self.sorted_names, prefix)
+        last = bisect.bisect_left(self.sorted_names, prefix + '\uffff')
+        return np.sort(self.name_order[first:last])
+
+    def query(self, text):
+        """Runs a query string; terms are AND-ed together.
+
+        Terms: box:x1,y1,z1,x2,y2,z2  near:x,y,z[,k]  within:x,y,z,r
+               cf1=-1 (also cf4, cf6, cfx)  name:prefix  or a bare name prefix.
+        Raises ValueError for a malformed term.
+        """
+        rows = None
+        for term in text.split():
+            term_rows = self.query_term(term)
+            rows = term_rows if rows is None else rows[np.isin(rows, term_rows)]
+        return self.all_rows() if rows is None else rows
+
+    def query_term(self, term):
+        config_match = re.fullmatch(r'(cf1|cf4|cf6|cfx)=([-+]?\d+)', term, re.IGNORECASE)
+        if config_match:
+            return self.with_config(config_match.group(1).lower(), int(config_match.group(2)))
+
+        key, _, argument = term.partition(':')
+        key = key.lower()
+        if not argument:
+            return self.with_prefix(term)
+        if key == 'name':
+            return self.with_prefix(argument)
+        numbers = _parse_numbers(term, argument)
+        if key == 'box' and len(numbers) == 6:
+            return self.in_box(np.array(numbers[:3]), np.array(numbers[3:]))
+        if key == 'near' and len(numbers) in (3, 4):
+            count = int(numbers[3]) if len(numbers) == 4 else 1
+            return self.nearest(np.array(numbers[:3]), count)
+        if key == 'within' and len(numbers) == 4:
+            return self.within(np.array(numbers[:3]), numbers[3])
+        raise ValueError(f"Invalid query term: {term}")
+
+
+def _parse_numbers(term, argument):
+    try:
+        return [float(x) for x in argument.split(',')]
+    except ValueError:
+        raise ValueError(f"Invalid query term: {term}")
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+
+import numpy as np
+
+from robtarget_batch import RobtargetTable
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.expanduser('~'), '.grobotics', 'target_library.db')
+
+FRAME_KINDS = ('wobjdata', 'tooldata')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cells (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS frames (
+    id INTEGER PRIMARY KEY,
+    cell_id INTEGER NOT NULL REFERENCES cells(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    module TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    x REAL, y REAL, z REAL,
+    q1 REAL, q2 REAL, q3 REAL, q4 REAL,
+    UNIQUE (cell_id, kind, name)
+);
+CREATE TABLE IF NOT EXISTS robtargets (
+    id INTEGER PRIMARY KEY,
+    cell_id INTEGER NOT NULL REFERENCES cells(id) ON DELETE CASCADE,
+    module TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    scope TEXT NOT NULL DEFAULT '',
+    x REAL, y REAL, z REAL,
+    pose BLOB NOT NULL,
+    UNIQUE (cell_id, module, name)
+);
+CREATE INDEX IF NOT EXISTS robtargets_by_name ON robtargets (cell_id, name);
+CREATE VIRTUAL TABLE IF NOT EXISTS robtargets_rtree USING rtree (
+    id, min_x, max_x, min_y, max_y, min_z, max_z
+);
+"""
+
+ROBTARGET_COLUMNS = "name, scope, pose"
+
+# pose BLOB layout: float64 position(3), orientation(4), robot config(4), external axes(6)
+POSE_WIDTH = 17
+
+
+class TargetLibrary:
+    """On-disk SQLite library of frames, tools and robtargets, grouped per cell (controller backup)."""
+
+    def __init__(self, path=DEFAULT_LIBRARY_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def cells(self):
+        return [row[0] for row in self.connection.execute("SELECT name FROM cells ORDER BY name")]
+
+    def modules(self, cell):
+        cell_id = self.cell_id(cell, create=False)
+        return [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT module FROM robtargets WHERE cell_id = ? ORDER BY module", (cell_id,))]
+
+    def cell_id(self, cell, create=True):
+        row = self.connection.execute("SELECT id FROM cells WHERE name = ?", (cell,)).fetchone()
+        if row:
+            return row[0]
+        if not create:
+            return None
+        return self.connection.execute("INSERT INTO cells (name) VALUES (?)", (cell,)).lastrowid
+
+    def save_frames(self, cell, frames, kind='wobjdata', module=''):
+        """Stores {name: {'position', 'orientation'}} frames, replacing frames of the same name."""
+        if kind not in FRAME_KINDS:
+            raise ValueError(f"Unknown frame kind: {kind}")
+        with self.connection:
+            cell_id = self.cell_id(cell)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO frames (cell_id, kind, module, name, x, y, z, q1, q2, q3, q4) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((cell_id, kind, module, name, *params['position'], *params['orientation'])
+                 for name, params in frames.items()))
+
+    def load_frames(self, cell, kind='wobjdata'):
+        cell_id = self.cell_id(cell, create=False)
+        rows = self.connection.execute(
+            "SELECT name, x, y, z, q1, q2, q3, q4 FROM frames WHERE cell_id = ? AND kind = ? ORDER BY id",
+            (cell_id, kind))
+        return {row[0]: {'position': list(row[1:4]), 'orientation': list(row[4:8])} for row in rows}
+
+    def save_robtargets(self, cell, table, module=''):
+        """Bulk-stores a RobtargetTable in one transaction, replacing targets of the same module and name."""
+        poses = np.hstack([table.positions, table.orientations, table.configs,
+                           table.external_axes]).astype(np.float64)
+        with self.connection:
+            cell_id = self.cell_id(cell)
+            # Drop the spatial entries of rows about to be replaced
+            self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS incoming_names (name TEXT)")
+            self.connection.execute("DELETE FROM incoming_names")
+            self.connection.executemany("INSERT INTO incoming_names VALUES (?)",
+                                        ((name,) for name in table.names))
+            self.connection.execute(
+                "DELETE FROM robtargets_rtree WHERE id IN (SELECT id FROM robtargets "
+                "WHERE cell_id = ? AND module = ? AND name IN (SELECT name FROM incoming_names))",
+                (cell_id, module))
+            last_id = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM robtargets").fetchone()[0]
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO robtargets (cell_id, module, name, scope, x, y, z, pose) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((cell_id, module, name, scope, x, y, z, pose.tobytes())
+                 for name, scope, (x, y, z), pose
+                 in zip(table.names, table.scopes, table.positions.tolist(), poses)))
+            # Replaced and new rows all got ids above last_id
+            self.connection.execute(
+                "INSERT INTO robtargets_rtree SELECT id, x, x, y, y, z, z FROM robtargets WHERE id > ?",
+                (last_id,))
+
+    def load_robtargets(self, cell, module=None):
+        """Loads all robtargets of a cell, or of one module of it, as a RobtargetTable."""
+        cell_id = self.cell_id(cell, create=False)
+        if module is None:
+            cursor = self.connection.execute(
+                f"SELECT {ROBTARGET_COLUMNS} FROM robtargets WHERE cell_id = ? ORDER BY id", (cell_id,))
+        else:
+            cursor = self.connection.execute(
+                f"SELECT {ROBTARGET_COLUMNS} FROM robtargets WHERE cell_id = ? AND module = ? ORDER BY id",
+                (cell_id, module))
+        return _table_from_rows(cursor.fetchall())
+
+    def find(self, cell, name):
+        """Looks up targets by name across all modules of a cell."""
+        cell_id = self.cell_id(cell, create=False)
+        cursor = self.connection.execute(
+            f"SELECT {ROBTARGET_COLUMNS} FROM robtargets WHERE cell_id = ? AND name = ? ORDER BY id",
+            (cell_id, name))
+        return _table_from_rows(cursor.fetchall())
+
+    def in_box(self, cell, lower, upper):
+        """Targets of a cell whose position lies inside the box lower..upper, via the R*Tree index."""
+        cell_id = self.cell_id(cell, create=False)
+        lower, upper = np.minimum(lower, upper).tolist(), np.maximum(lower, upper).tolist()
+        cursor = self.connection.execute(
+            f"SELECT {ROBTARGET_COLUMNS} FROM robtargets WHERE cell_id = ? AND id IN "
+            "(SELECT id FROM robtargets_rtree WHERE min_x >= ? AND max_x <= ? "
+            "AND min_y >= ? AND max_y <= ? AND min_z >= ? AND max_z <= ?) ORDER BY id",
+            (cell_id, lower[0], upper[0], lower[1], upper[1], lower[2], upper[2]))
+        return _table_from_rows(cursor.fetchall())
+
+    def delete_cell(self, cell):
+        with self.connection:
+            cell_id = self.cell_id(cell, create=False)
+            self.connection.execute(
+                "DELETE FROM robtargets_rtree WHERE id IN (SELECT id FROM robtargets WHERE cell_id = ?)",
+                (cell_id,))
+            self.connection.execute("DELETE FROM cells WHERE id = ?", (cell_id,))
+
+
+def _table_from_rows(rows):
+    if not rows:
+        return RobtargetTable()
+    names, scopes, poses = zip(*rows)
+    values = np.frombuffer(b''.join(poses), dtype=np.float64).reshape(-1, POSE_WIDTH)
+    return RobtargetTable(names, scopes, values[:, 0:3], values[:, 3:7],
+                          values[:, 7:11].astype(np.int32), values[:, 11:17])
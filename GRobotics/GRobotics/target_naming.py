@@ -0,0 +1,72 @@
+import numpy as np
+
+from robtarget_batch import ROBTARGET_WIDTH, parse_robtarget_literal, parse_literal_block, _pad_external
+
+# Poses that agree to this many decimals are the same target
+POSE_DECIMALS = 6
+
+
+def pose_keys(literals):
+    """Hashable keys of robtarget literals, equal for equal values however they are written; None if unparsable."""
+    compact = [''.join(literal.split()) for literal in literals]
+    block = parse_literal_block(compact)
+    if block is None:
+        block = np.full((len(compact), ROBTARGET_WIDTH), np.nan)
+        for row, literal in enumerate(compact):
+            try:
+                pos, ori, cfg, ext = parse_robtarget_literal(literal)
+                block[row] = pos + ori + cfg + _pad_external(ext)
+            except (ValueError, IndexError):
+                continue
+    # + 0.0 turns -0.0 into 0.0, so both hash the same
+    block = np.round(block, POSE_DECIMALS) + 0.0
+    valid = ~np.isnan(block).any(axis=1)
+    return [row.tobytes() if ok else None for row, ok in zip(block, valid.tolist())]
+
+
+class TargetNamer:
+    """Names inline targets of one module without clashing with what the module already declares.
+
+    Targets whose pose matches a module-level robtarget reuse its name (a hash lookup). New
+    names are base_name + start, start + step, ... handed out from the numbers still free:
+    the cursor only moves forward and skips taken names, so allocating all names costs
+    O(targets + declarations) however many runs came before.
+    """
+
+    def __init__(self, symbols, key, base_name='p_', start=10, step=10, reserved=()):
+        self.base_name = base_name
+        self.step = step
+        self._next = start
+        # RAPID data and routines share one case-insensitive namespace; reserved adds the
+        # names of types the symbol table does not index (see rapid_symbols.declared_names)
+        self._taken = {symbol.name.lower() for symbol in symbols.symbols(key)}
+        self._taken.update(name.lower() for name in reserved)
+        declared = [symbol for symbol in symbols.symbols(key, 'robtarget')
+                    if not symbol.routine and symbol.value is not None]
+        self._by_pose = {}
+        for symbol, pose in zip(declared, pose_keys([symbol.value for symbol in declared])):
+            if pose is not None:
+                self._by_pose.setdefault(pose, symbol.name)
+
+    def allocate(self):
+        name = f"{self.base_name}{self._next}"
+        while name.lower() in self._taken:
+            self._next += self.step
+            name = f"{self.base_name}{self._next}"
+        self._taken.add(name.lower())
+        self._next += self.step
+        return name
+
+    def assign(self, literals):
+        """[(name, is_new)] per literal: the declared name for a known pose, else a newly allocated one."""
+        names = []
+        for pose in pose_keys(literals):
+            name = self._by_pose.get(pose) if pose is not None else None
+            if name is not None:
+                names.append((name, False))
+                continue
+            name = self.allocate()
+            if pose is not None:
+                self._by_pose[pose] = name
+            names.append((name, True))
+        return names
@@ -0,0 +1,306 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from rapid_symbols import MODULE_EXTENSIONS, SymbolTable
+from robtarget_batch import RobtargetTable, format_pose, transform_robtargets
+from target_index import TargetIndex
+
+DEFAULT_CHUNK_SIZE = 10000
+# Poses equal at the precision format_pose writes are duplicates
+DEFAULT_POSITION_DECIMALS = 2
+DEFAULT_ORIENTATION_DECIMALS = 6
+WORLD_FRAME = {'position': [0, 0, 0], 'orientation': [1, 0, 0, 0]}
+
+
+def module_paths(source, extensions=MODULE_EXTENSIONS):
+    """The module file itself, or every module under a backup directory in a stable order."""
+    if not os.path.isdir(source):
+        return [source]
+    paths = []
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(extensions))
+    return paths
+
+
+def concat_tables(tables):
+    tables = [table for table in tables if len(table)]
+    if not tables:
+        return RobtargetTable()
+    if len(tables) == 1:
+        return tables[0]
+    return RobtargetTable([name for table in tables for name in table.names],
+                          [scope for table in tables for scope in table.scopes],
+                          np.concatenate([table.positions for table in tables]),
+                          np.concatenate([table.orientations for table in tables]),
+                          np.concatenate([table.configs for table in tables]),
+                          np.concatenate([table.external_axes for table in tables]))
+
+
+def split_table(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    for start in range(0, len(table), chunk_size):
+        yield table.take(np.arange(start, min(start + chunk_size, len(table))))
+
+
+# Sources ---------------------------------------------------------------------
+
+def read_table(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    yield from split_table(table, chunk_size)
+
+
+def read_text(text, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Declared robtargets of one module text, in chunks."""
+    symbols = SymbolTable()
+    symbols.update_text('text', text)
+    table, _, _ = symbols.robtarget_table('text')
+    yield from split_table(table, chunk_size)
+
+
+def read_modules(source, chunk_size=DEFAULT_CHUNK_SIZE, extensions=MODULE_EXTENSIONS):
+    """Declared robtargets of a module file or a whole backup directory, in chunks.
+
+    Files are parsed one at a time and small files are packed together, so memory stays
+    bounded by one file plus one chunk whatever the size of the backup.
+    """
+    pending = RobtargetTable()
+    for path in module_paths(source, extensions):
+        symbols = SymbolTable()
+        symbols.update_file(path)
+        table, _, _ = symbols.robtarget_table(path)
+        pending = concat_tables([pending, table])
+        full = len(pending) // chunk_size * chunk_size
+        if full:
+            yield from split_table(pending.take(np.arange(full)), chunk_size)
+            pending = pending.take(np.arange(full, len(pending)))
+    if len(pending):
+        yield pending
+
+
+# Stages ----------------------------------------------------------------------
+
+def filter_targets(chunks, query):
+    """Keeps the rows matching a TargetIndex query, e.g. 'box:0,0,0,500,500,500 cf1=0'.
+
+    near:x,y,z,k finds the k nearest rows of the whole source, not of each chunk: the k
+    nearest so far are carried from chunk to chunk, and the hits come out closest first as
+    one chunk once the source is read. Only one near term is allowed.
+    """
+    terms = query.split()
+    near = [term for term in terms if term.lower().startswith('near:')]
+    if not near:
+        for chunk in chunks:
+            rows = TargetIndex(chunk).query(query)
+            if len(rows):
+                yield chunk.take(rows)
+        return
+    if len(near) > 1:
+        raise ValueError(f"Only one near term can be streamed: {query}")
+
+    nearest = RobtargetTable()
+    for chunk in chunks:
+        chunk = chunk.take(TargetIndex(chunk).query_term(near[0]))
+        candidates = concat_tables([nearest, chunk])
+        nearest = candidates.take(TargetIndex(candidates).query_term(near[0]))
+    rows = np.arange(len(nearest), dtype=np.intp)
+    others = ' '.join(term for term in terms if term is not near[0])
+    if others:
+        rows = rows[np.isin(rows, TargetIndex(nearest).query(others))]
+    if len(rows):
+        yield nearest.take(rows)
+
+
+def convert_frames(chunks, input_frame, output_frame):
+    """Re-expresses poses given in input_frame in output_frame."""
+    for chunk in chunks:
+        # Same argument order as TargetConverterApp has always used, so both give identical results
+        chunk.positions, chunk.orientations = transform_robtargets(chunk.positions, chunk.orientations,
+                                                                   output_frame, input_frame)
+        yield chunk
+
+
+def dedupe_targets(chunks, position_decimals=DEFAULT_POSITION_DECIMALS,
+                   orientation_decimals=DEFAULT_ORIENTATION_DECIMALS):
+    """Drops rows whose pose was already seen and renames rows whose name was (p10 -> p10_2).
+
+    Only the rounded pose keys and names seen so far are kept between chunks.
+    """
+    seen_poses, seen_names = set(), set()
+    for chunk in chunks:
+        # + 0.0 turns -0.0 into 0.0, so both hash the same
+        keys = np.hstack([np.round(chunk.positions, position_decimals) + 0.0,
+                          np.round(chunk.orientations, orientation_decimals) + 0.0,
+                          chunk.configs, np.round(chunk.external_axes, position_decimals) + 0.0])
+        rows, names = [], []
+        for row, key in enumerate(map(bytes, keys)):
+            if key in seen_poses:
+                continue
+            seen_poses.add(key)
+            name = chunk.names[row]
+            suffix = 2
+            while name.lower() in seen_names:
+                name = f"{chunk.names[row]}_{suffix}"
+                suffix += 1
+            seen_names.add(name.lower())
+            rows.append(row)
+            names.append(name)
+        if rows:
+            unique = chunk.take(rows)
+            yield RobtargetTable(names, unique.scopes, unique.positions, unique.orientations,
+                                 unique.configs, unique.external_axes)
+
+
+def format_declarations(chunks, default_scope='CONST'):
+    """Turns table chunks into lists of robtarget declaration lines."""
+    for chunk in chunks:
+        lines = []
+        for row, name in enumerate(chunk.names):
+            scope = chunk.scopes[row] or default_scope
+            value = format_pose(chunk.positions[row], chunk.orientations[row],
+                                chunk.configs[row], chunk.external_axes[row])
+            lines.append(f"{scope} robtarget {name}:={value};" if scope else f"robtarget {name}:={value};")
+        yield lines
+
+
+def write_module(line_chunks, path, module_name=None):
+    """Writes declaration lines into a new module file as they arrive, passing them on."""
+    module_name = module_name or os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'w') as file:
+        file.write(f"MODULE {module_name}\n")
+        for lines in line_chunks:
+            file.writelines(f"    {line}\n" for line in lines)
+            yield lines
+        file.write("ENDMODULE\n")
+
+
+class Pipeline:
+    """Stages chained as generators over chunks, so only one chunk per stage is in memory.
+
+    Each stage is timed on its own (the time spent waiting for the stage before it is
+    subtracted), which gives its rows per second in report().
+    """
+
+    def __init__(self, source, name='read'):
+        self.stats = []
+        self._stream = self._measure(name, source)
+
+    @classmethod
+    def from_modules(cls, source, chunk_size=DEFAULT_CHUNK_SIZE):
+        return cls(read_modules(source, chunk_size))
+
+    @classmethod
+    def from_text(cls, text, chunk_size=DEFAULT_CHUNK_SIZE):
+        return cls(read_text(text, chunk_size))
+
+    @classmethod
+    def from_table(cls, table, chunk_size=DEFAULT_CHUNK_SIZE):
+        return cls(read_table(table, chunk_size))
+
+    def then(self, name, stage, *args, **kwargs):
+        """Appends a stage: a generator function taking the upstream iterator first."""
+        self._stream = self._measure(name, stage(self._stream, *args, **kwargs))
+        return self
+
+    def filter(self, query):
+        return self.then('filter', filter_targets, query)
+
+    def convert(self, input_frame, output_frame):
+        return self.then('convert', convert_frames, input_frame, output_frame)
+
+    def dedupe(self, **kwargs):
+        return self.then('dedupe', dedupe_targets, **kwargs)
+
+    def format(self, default_scope='CONST'):
+        return self.then('format', format_declarations, default_scope)
+
+    def write(self, path, module_name=None):
+        return self.then('write', write_module, path, module_name)
+
+    def __iter__(self):
+        return self._stream
+
+    def run(self):
+        """Pulls every chunk through the stages; returns report()."""
+        for _ in self._stream:
+            pass
+        return self.report()
+
+    def tables(self):
+        """Runs the pipeline and joins the resulting table chunks."""
+        return concat_tables(list(self._stream))
+
+    def _measure(self, name, stream):
+        # Registered now rather than on the first pull, so stats stay in stage order
+        stats = {'name': name, 'rows': 0, 'chunks': 0, 'total': 0.0}
+        self.stats.append(stats)
+        return self._timed(stats, iter(stream))
+
+    @staticmethod
+    def _timed(stats, iterator):
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                stats['total'] += time.perf_counter() - start
+                return
+            stats['total'] += time.perf_counter() - start
+            stats['rows'] += len(chunk)
+            stats['chunks'] += 1
+            yield chunk
+
+    def report(self):
+        """[(stage, rows out, seconds, rows per second)] with each stage's own time."""
+        report, upstream = [], 0.0
+        for stats in self.stats:
+            seconds = max(stats['total'] - upstream, 0.0)
+            upstream = stats['total']
+            rate = stats['rows'] / seconds if seconds > 0 else float('inf')
+            report.append((stats['name'], stats['rows'], seconds, rate))
+        return report
+
+
+def load_frames(source):
+    """Work objects declared in a module file or backup, plus Wobj0."""
+    symbols = SymbolTable()
+    for path in module_paths(source):
+        symbols.update_file(path)
+    frames = {'Wobj0': WORLD_FRAME, 'wobj0': WORLD_FRAME}
+    frames.update(symbols.frames('wobjdata'))
+    return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream robtargets from a module or backup into a new module.")
+    parser.add_argument('source', help="module file or backup directory")
+    parser.add_argument('output', help="module file to write")
+    parser.add_argument('--query', help="TargetIndex query, e.g. 'box:0,0,0,500,500,500'")
+    parser.add_argument('--from-frame', help="wobjdata the targets are given in")
+    parser.add_argument('--to-frame', help="wobjdata to convert the targets to")
+    parser.add_argument('--frames', help="module file or directory declaring the wobjdata (default: source)")
+    parser.add_argument('--dedupe', action='store_true', help="drop duplicate poses and rename duplicate names")
+    parser.add_argument('--module', help="module name (default: output file name)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline.from_modules(args.source, args.chunk_size)
+    if args.query:
+        pipeline.filter(args.query)
+    if args.from_frame or args.to_frame:
+        frames = load_frames(args.frames or args.source)
+        missing = [name for name in (args.from_frame or 'Wobj0', args.to_frame or 'Wobj0') if name not in frames]
+        if missing:
+            parser.error(f"Unknown wobjdata: {', '.join(missing)}")
+        pipeline.convert(frames[args.from_frame or 'Wobj0'], frames[args.to_frame or 'Wobj0'])
+    if args.dedupe:
+        pipeline.dedupe()
+    pipeline.format().write(args.output, args.module)
+
+    for name, rows, seconds, rate in pipeline.run():
+        print(f"{name:<8} {rows:>10,} rows {seconds:8.3f} s {rate:>14,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
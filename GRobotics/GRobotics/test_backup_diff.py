@@ -0,0 +1,87 @@
+import numpy as np
+
+from backup_diff import diff_backups, load_backup, match_points
+
+UNSET = '[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]'
+
+
+def target(x, y=0, z=500):
+    return f"[[{x},{y},{z}],[0,0,1,0],[0,0,0,0],{UNSET}]"
+
+
+def write_backup(root, modules):
+    root.mkdir()
+    for name, lines in modules.items():
+        (root / f"{name}.mod").write_text(f"MODULE {name}\n" + ''.join(f"    {line}\n" for line in lines) + "ENDMODULE\n")
+    return str(root)
+
+
+def test_identical_backups_with_a_repeated_point_are_unchanged(tmp_path):
+    lines = ['PROC main()', f'MoveJ {target(100)}, v100, z10, tool0;', f'MoveL {target(200)}, v100, z10, tool0;',
+             f'MoveJ {target(100)}, v100, z10, tool0;', 'ENDPROC']
+    old = write_backup(tmp_path / 'old', {'M': lines})
+    new = write_backup(tmp_path / 'new', {'M': lines})
+    assert diff_backups(old, new) == {'moved': [], 'added': [], 'removed': [], 'unchanged': 3}
+
+
+def test_a_repeated_point_added_once_is_reported_once(tmp_path):
+    move = f'MoveJ {target(100)}, v100, z10, tool0;'
+    old = write_backup(tmp_path / 'old', {'M': ['PROC main()', move, move, 'ENDPROC']})
+    new = write_backup(tmp_path / 'new', {'M': ['PROC main()', move, move, move, 'ENDPROC']})
+    report = diff_backups(old, new)
+    assert report['added'] == [('M', 'line 5', 0.0, 0.0)]
+    assert (report['moved'], report['removed'], report['unchanged']) == ([], [], 2)
+
+
+def test_declared_and_inline_changes(tmp_path):
+    old = write_backup(tmp_path / 'old', {
+        'A': [f'CONST robtarget pKeep:={target(0)};', f'CONST robtarget pMove:={target(10)};',
+              f'CONST robtarget pGone:={target(20)};', 'PROC main()', f'MoveL {target(300)}, v100, fine, tool0;',
+              f'MoveL {target(400)}, v100, fine, tool0;', 'ENDPROC'],
+        'B': ['PROC main()', f'MoveL {target(300)}, v100, fine, tool0;', 'ENDPROC']})
+    new = write_backup(tmp_path / 'new', {
+        'A': [f'CONST robtarget pKeep:={target(0.05)};', f'CONST robtarget pMove:={target(12)};',
+              f'CONST robtarget pNew:={target(30)};', 'PROC main()', f'MoveL {target(303)}, v100, fine, tool0;',
+              f'MoveL {target(900)}, v100, fine, tool0;', 'ENDPROC'],
+        # Same point, other module: matched within module B only
+        'B': ['PROC main()', 'ENDPROC']})
+    report = diff_backups(old, new)
+    moved = {(module, name): round(distance, 6) for module, name, distance, _ in report['moved']}
+    assert moved == {('A', 'pMove'): 2.0, ('A', 'line 6'): 3.0}
+    assert sorted(name for _, name, _, _ in report['added']) == ['line 7', 'pNew']
+    assert sorted((module, name) for module, name, _, _ in report['removed']) == [
+        ('A', 'line 7'), ('A', 'pGone'), ('B', 'line 3')]
+    assert report['unchanged'] == 1
+
+
+def test_match_points_is_one_to_one():
+    old = np.array([[0.0, 0, 0], [1, 0, 0], [100, 0, 0]])
+    new = np.array([[0.0, 0, 0], [0, 0, 0], [0, 0, 0], [99, 0, 0]])
+    assert match_points(old, new, radius=5.0).tolist() == [0, 1, -1, 2]
+
+
+def test_match_points_looks_past_taken_neighbours():
+    # Ten new points share the same nine nearest old points; the tenth has to look further out
+    old = np.vstack([np.zeros((9, 3)), [[3.0, 0, 0]]])
+    new = np.zeros((10, 3))
+    match = match_points(old, new, radius=5.0)
+    assert sorted(match.tolist()) == list(range(10))
+
+
+def test_load_backup_columns(tmp_path):
+    backup = load_backup(write_backup(tmp_path / 'cell', {
+        'A': [f'LOCAL CONST robtarget p1:={target(1)};', 'PROC main()', f'MoveL {target(2)}, v100, fine, tool0;',
+              'MoveL p1, v100, fine, tool0;', 'ENDPROC']}))
+    assert (backup.modules, backup.names, backup.inline_modules) == (['A'], ['p1'], ['A'])
+    assert backup.inline_lines.tolist() == [4]
+    np.testing.assert_array_equal(backup.inline_positions, [[2, 0, 500]])
+    assert len(backup) == 2
+
+
+def test_an_irregular_literal_does_not_hide_the_other_points(tmp_path):
+    backup = load_backup(write_backup(tmp_path / 'cell', {
+        'A': ['PROC main()', f'MoveL {target(1)}, v100, fine, tool0;',
+              f"MoveL [[nX,0,500],[0,0,1,0],[0,0,0,0],{UNSET}], v100, fine, tool0;",
+              f'MoveL {target(3)}, v100, fine, tool0;', 'ENDPROC']}))
+    assert backup.inline_lines.tolist() == [3, 5]
+    np.testing.assert_array_equal(backup.inline_positions[:, 0], [1, 3])
@@ -0,0 +1,161 @@
+import functools
+import os
+
+import numpy as np
+import pytest
+
+import chunked_scan
+import rapid_snapshot
+from chunked_scan import load_move_literals, scan_move_literals, scan_text, split_ranges
+
+UNSET = '[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]'
+
+
+def move(number):
+    return (f"        MoveL [[{number},{-number}.5,300],[1,0,0,0],[0,0,{number % 3},0],{UNSET}], "
+            f"v100, z10, tool0;\n")
+
+
+def module_text(moves):
+    lines = ['MODULE Big\n', '    ! comment with a ; inside\n', '    PROC main()\n']
+    for number in range(moves):
+        lines.append(move(number))
+        if number % 7 == 0:
+            # A statement over two lines must never be split between ranges
+            lines.append('        MoveJ Offs(pHome, 0, 0,\n            100), v100, fine, tool0;\n')
+    lines += ['    ENDPROC\n', 'ENDMODULE\n']
+    return ''.join(lines)
+
+
+@pytest.fixture
+def snapshot_root(tmp_path, monkeypatch):
+    root = str(tmp_path / 'snapshots')
+    monkeypatch.setattr(chunked_scan, 'read_snapshot', functools.partial(rapid_snapshot.read_snapshot, root=root))
+    monkeypatch.setattr(chunked_scan, 'snapshot_digest', functools.partial(rapid_snapshot.snapshot_digest, root=root))
+    monkeypatch.setattr(chunked_scan, 'write_snapshot', functools.partial(rapid_snapshot.write_snapshot, root=root))
+    return root
+
+
+def test_split_ranges_cover_the_buffer_at_statement_ends():
+    data = module_text(200).encode()
+    ranges = split_ranges(data, 8)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    for _, end in ranges[:-1]:
+        line = data[data.rfind(b'\n', 0, end - 1) + 1:end]
+        assert line.rstrip().endswith(b';')
+        assert not line.lstrip().startswith(b'!')
+
+
+def test_scan_text_offsets_and_lines():
+    text = module_text(3)
+    literals, offsets, lines, line_count = scan_text(text)
+    assert len(literals) == 3
+    assert [text[start:end] for start, end in offsets] == literals
+    assert [text.splitlines()[line - 1].strip().startswith('MoveL') for line in lines] == [True] * 3
+    assert line_count == text.count('\n')
+
+
+def test_scan_text_only_breaks_lines_at_newlines():
+    # cp1252 '…' and a form feed decode to characters splitlines() also breaks at
+    text = module_text(1).replace('PROC main()', 'PROC main() ! Weld\x85 \x0c \x1c')
+    literals, offsets, lines, line_count = scan_text(text)
+    assert text.split('\n')[lines[0] - 1].strip().startswith('MoveL')
+    assert line_count == text.count('\n')
+    assert text[offsets[0][0]:offsets[0][1]] == literals[0]
+
+
+def test_parallel_scan_matches_single_range(tmp_path):
+    path = tmp_path / 'Big.mod'
+    path.write_text(module_text(500), newline='')
+    single = scan_move_literals(str(path), workers=1)
+    parallel = scan_move_literals(str(path), workers=2, threshold=0)
+    assert parallel[0] == single[0]
+    for left, right in zip(parallel[1:], single[1:]):
+        np.testing.assert_array_equal(left, right)
+    assert single[1][:, 0].tolist() == list(range(500))
+
+
+def test_broken_pool_falls_back_to_scanning_in_process(tmp_path, monkeypatch):
+    path = tmp_path / 'Big.mod'
+    path.write_text(module_text(200), newline='')
+
+    class BrokenPool:
+        def __init__(self, *args, **kwargs):
+            raise chunked_scan.BrokenProcessPool('no workers in this build')
+
+    monkeypatch.setattr(chunked_scan, 'ProcessPoolExecutor', BrokenPool)
+    done = []
+    literals = scan_move_literals(str(path), workers=4, threshold=0, progress=lambda *p: done.append(p))[0]
+    assert literals == scan_move_literals(str(path), workers=1)[0]
+    assert done[-1][0] == done[-1][1] > 1
+
+
+def test_latin1_module_offsets_match_in_every_range(tmp_path, snapshot_root):
+    # Latin-1 comments are not valid UTF-8 and make character and byte offsets differ
+    text = module_text(300).replace('! comment', '! Schweißnaht, Düse gewechselt').replace(
+        '    PROC main()\n', '    PROC main()\n        ! Bahn über Förderband\n')
+    path = tmp_path / 'Latin.mod'
+    path.write_bytes(text.encode('latin-1'))
+    single = scan_move_literals(str(path), workers=1)
+    parallel = scan_move_literals(str(path), workers=2, threshold=0)
+    assert parallel[0] == single[0] and len(single[0]) == 300
+    np.testing.assert_array_equal(parallel[2], single[2])
+
+    data = path.read_bytes()
+    assert [data[start:end].decode('ascii') for start, end in single[2].tolist()] == single[0]
+    assert load_move_literals(str(path)) == single[0]
+    assert load_move_literals(str(path)) == single[0]
+
+
+def test_load_move_literals_reuses_its_snapshot(tmp_path, snapshot_root, monkeypatch):
+    path = tmp_path / 'Part.mod'
+    path.write_text(module_text(20), newline='')
+    first = load_move_literals(str(path))
+    assert len(first) == 20
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError('an unchanged file must not be scanned again')
+
+    monkeypatch.setattr(chunked_scan, 'scan_move_literals', no_scan)
+    assert load_move_literals(str(path)) == first
+
+
+def test_load_move_literals_rescans_a_rewritten_file(tmp_path, snapshot_root):
+    path = tmp_path / 'Part.mod'
+    path.write_text(module_text(20), newline='')
+    first = load_move_literals(str(path))
+    stat = os.stat(path)
+
+    # Same size, new content and modification time
+    path.write_text(module_text(20).replace('[[1,-1.5,300]', '[[7,-1.5,300]'), newline='')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert os.path.getsize(path) == stat.st_size
+    second = load_move_literals(str(path))
+    assert second[1].startswith('[7,-1.5,300]') and second[2:] == first[2:]
+
+
+def test_load_move_literals_rescans_a_rewrite_that_keeps_size_and_mtime(tmp_path, snapshot_root):
+    path = tmp_path / 'Part.mod'
+    path.write_text(module_text(20), newline='')
+    first = load_move_literals(str(path))
+    stat = os.stat(path)
+
+    # A copy tool that preserves timestamps leaves the stamp as it was; the first literal is
+    # still where the snapshot says, but no longer the target of a move instruction
+    path.write_text(module_text(20).replace('MoveL', 'MoveX', 1), newline='')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert chunked_scan.file_stamp(str(path)) == f"{stat.st_size}:{stat.st_mtime_ns}"
+    assert load_move_literals(str(path)) == first[1:]
+
+
+def test_load_move_literals_rescans_after_a_parser_change(tmp_path, snapshot_root, monkeypatch):
+    path = tmp_path / 'Part.mod'
+    path.write_text(module_text(5), newline='')
+    load_move_literals(str(path))
+    monkeypatch.setattr(chunked_scan, 'PARSER_VERSION', chunked_scan.PARSER_VERSION + '-next')
+    scans = []
+    original = chunked_scan.scan_move_literals
+    monkeypatch.setattr(chunked_scan, 'scan_move_literals', lambda *a, **k: scans.append(a) or original(*a, **k))
+    assert len(load_move_literals(str(path))) == 5
+    assert len(scans) == 1
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from job_queue import CANCELLED, DONE, FAILED, HIGH, LOW, NORMAL, QUEUED, RUNNING, Job, JobQueue
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('timed out')
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(max_workers=1)
+    yield queue
+    queue.shutdown()
+
+
+@pytest.fixture
+def gate(queue):
+    """Holds the single worker busy until set, so the jobs submitted meanwhile stay queued."""
+    gate = threading.Event()
+    blocker = queue.submit('block', lambda job: gate.wait(10))
+    wait_until(lambda: blocker.status == RUNNING)
+    yield gate
+    gate.set()
+
+
+def test_jobs_run_by_priority_then_in_order(queue, gate):
+    order = []
+    jobs = [queue.submit(name, lambda job, name: order.append(name), name, priority=priority)
+            for name, priority in (('low', LOW), ('first', NORMAL), ('high', HIGH), ('second', NORMAL))]
+    gate.set()
+    wait_until(lambda: all(job.status == DONE for job in jobs))
+    assert order == ['high', 'first', 'second', 'low']
+    assert all(job.progress == 1.0 for job in jobs)
+
+
+def test_a_failed_job_can_be_retried(queue):
+    def flaky(job):
+        if job.attempts == 1:
+            raise OSError('controller offline')
+        return 'ok'
+
+    job = queue.submit('flaky', flaky)
+    wait_until(lambda: job.status == FAILED)
+    assert job.error == 'controller offline'
+    assert queue.retry(job)
+    wait_until(lambda: job.status == DONE)
+    assert (job.result, job.error, job.attempts) == ('ok', None, 2)
+    assert not queue.retry(job)
+
+
+def test_a_cancelled_queued_job_is_skipped_and_keeps_its_place_on_retry(queue, gate):
+    ran = []
+    first = queue.submit('first', lambda job: ran.append('first'))
+    second = queue.submit('second', lambda job: ran.append('second'))
+    queue.cancel(first)
+    assert first.status == CANCELLED
+    assert queue.retry(first) and first.status == QUEUED
+    gate.set()
+    wait_until(lambda: second.status == DONE)
+    assert ran == ['first', 'second'] and first.attempts == 1
+
+
+def test_a_running_job_stops_at_its_next_check(queue):
+    def endless(job):
+        while True:
+            job.check_cancelled()
+            time.sleep(0.001)
+
+    job = queue.submit('endless', endless)
+    wait_until(lambda: job.status == RUNNING)
+    queue.cancel(job)
+    wait_until(lambda: job.status == CANCELLED)
+    assert job.duration() > 0
+
+
+def test_shutdown_cancels_queued_jobs(queue, gate):
+    job = queue.submit('queued', lambda job: None)
+    queue.shutdown()
+    assert job.status == CANCELLED
+    queue.clear_finished()
+    assert job not in queue.jobs()
+
+
+def test_report_and_throughput():
+    job = Job('count', None)
+    assert job.duration() is None and job.throughput() is None
+    job.report(progress=1.5, items=100)
+    assert job.progress == 1.0
+    job.started, job.finished = 10.0, 12.0
+    assert job.throughput() == 50.0
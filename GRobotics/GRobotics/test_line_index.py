@@ -0,0 +1,58 @@
+import pytest
+
+from chunked_scan import SOURCE_ENCODING, scan_text
+from line_index import LineIndex
+
+TEXT = ("MODULE Weld\r\n"
+        "    ! Naht \xe4u\xdfen \x85 Seite\x0c2\r\n"
+        "    PROC main()\r\n"
+        "        MoveL [[1,2,3],[1,0,0,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]], v100, z10, tool0;\r\n"
+        "    ENDPROC\r\n"
+        "ENDMODULE")
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'Weld.mod'
+    path.write_bytes(TEXT.encode(SOURCE_ENCODING))
+    index = LineIndex(str(path), block_size=16)
+    yield index
+    index.close()
+
+
+def test_lines_break_at_newlines_only(index):
+    assert len(index) == 6
+    assert index.line(1) == "    ! Naht \xe4u\xdfen \x85 Seite\x0c2"
+    assert index.lines(0, 10) == TEXT.split('\r\n')
+    assert index.lines(4, 2) == ['    ENDPROC', 'ENDMODULE']
+    assert index.line(0, limit=3) == 'MOD'
+
+
+def test_line_numbers_agree_with_the_move_scan(index):
+    _, _, lines, _ = scan_text(TEXT)
+    assert lines == [4]
+    assert index.line(lines[0] - 1).lstrip().startswith('MoveL')
+
+
+def test_offsets_are_byte_offsets(index):
+    offset = index.find('seite')
+    assert index.data[offset:offset + 5] == b'Seite'
+    assert index.line_of(offset) == 1
+    assert index.find('\xdf') == TEXT.index('\xdf')
+    assert index.find('€') == -1
+
+
+def test_search_wraps_around(index):
+    assert index.search('endproc') == 4
+    assert index.search('module', start_line=2) == 5
+    assert index.search('proc main', start_line=5) == 2
+    assert index.search('MODULE', start_line=1, ignore_case=False) == 5
+    assert index.search('missing') is None
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'Empty.mod'
+    path.write_bytes(b'')
+    index = LineIndex(str(path))
+    assert len(index) == 1 and index.lines(0, 5) == ['']
+    index.close()
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from path_decimation import decimate_module, decimate_path, remove_statements
+
+UNSET = '[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]'
+IDENTITY = np.tile([1.0, 0.0, 0.0, 0.0], (1, 1))
+
+
+def move(x, y=0, speed='v200', zone='z10', comment=''):
+    return f"        MoveL [[{x},{y},500],[1,0,0,0],[0,0,0,0],{UNSET}], {speed}, {zone}, tool0;{comment}\n"
+
+
+def module(*moves):
+    return 'MODULE Path\n    PROC main()\n' + ''.join(moves) + '    ENDPROC\nENDMODULE\n'
+
+
+def test_collinear_points_reduce_to_their_ends():
+    positions = np.column_stack([np.linspace(0, 100, 11), np.zeros(11), np.zeros(11)])
+    keep = decimate_path(positions, np.repeat(IDENTITY, 11, axis=0), np.zeros(11, dtype=bool))
+    assert np.flatnonzero(keep).tolist() == [0, 10]
+
+
+def test_corners_and_fixed_points_are_kept():
+    positions = np.array([[0, 0, 0], [50, 0, 0], [100, 0, 0], [100, 50, 0], [100, 100, 0], [100, 150, 0]], float)
+    fixed = np.zeros(6, dtype=bool)
+    fixed[4] = True
+    keep = decimate_path(positions, np.repeat(IDENTITY, 6, axis=0), fixed)
+    assert np.flatnonzero(keep).tolist() == [0, 2, 4, 5]
+
+
+def test_orientation_changes_are_kept():
+    positions = np.column_stack([np.linspace(0, 100, 3), np.zeros(3), np.zeros(3)])
+    # The middle point turns 10 degrees about z although the path is straight
+    turned = [np.cos(np.radians(5)), 0.0, 0.0, np.sin(np.radians(5))]
+    orientations = np.array([[1.0, 0, 0, 0], turned, [1.0, 0, 0, 0]])
+    keep = decimate_path(positions, orientations, np.zeros(3, dtype=bool), angle_tolerance=1.0)
+    assert keep.all()
+
+
+def test_tolerances_must_be_positive():
+    with pytest.raises(ValueError):
+        decimate_path(np.zeros((3, 3)), np.repeat(IDENTITY, 3, axis=0), np.zeros(3, dtype=bool), 0)
+
+
+def test_decimate_module_removes_inner_points_of_a_straight_run():
+    text = module(*(move(x) for x in range(0, 110, 10)))
+    new_text, report = decimate_module(text)
+    assert (report['moves_before'], report['moves_after'], report['candidates']) == (11, 2, 9)
+    assert new_text == module(move(0), move(100))
+    assert report['bytes_after'] < report['bytes_before']
+
+
+def test_stop_points_speed_changes_and_code_between_moves_end_a_run():
+    text = module(move(0), move(10), move(20, zone='fine'), move(30), move(40),
+                  move(50, speed='v500'), move(60, speed='v500'),
+                  '        SetDO doGlue, 1;\n', move(70, speed='v500'), move(80, speed='v500'),
+                  move(90, speed='v500', comment=' ! end of bead'))
+    new_text, report = decimate_module(text)
+    # Only the point between 70 and 90 is inside a run: zone and speed changes and SetDO end the others
+    assert report['moves_after'] == report['moves_before'] - 1
+    assert 'MoveL [[80,0,500]' not in new_text
+    assert all(f'MoveL [[{x},0,500]' in new_text for x in (0, 10, 20, 30, 40, 50, 60, 70, 90))
+    assert new_text.count('SetDO') == 1 and '! end of bead' in new_text
+
+
+def test_remove_statements_drops_emptied_lines_only():
+    text = "    A;\n    B; ! note\n    C;D;\n"
+    b = text.index('    B;')
+    d = text.index('D;')
+    assert remove_statements(text, [(b, b + 6), (d, d + 2)]) == "    A;\n    C;\n"
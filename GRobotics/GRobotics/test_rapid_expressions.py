@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import rapid_expressions
+from rapid_expressions import OFFS, RELTOOL, compile_expression, evaluate_targets, resolve_file
+
+UNSET = '[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]'
+
+
+def data_module(name, x):
+    return f"MODULE {name}\n    CONST robtarget pBase:=[[{x},0,500],[1,0,0,0],[0,0,0,0],{UNSET}];\nENDMODULE\n"
+
+
+MAIN = """MODULE Main
+    PROC main()
+        MoveL Offs(pBase,0,0,100), v100, z10, tool0;
+    ENDPROC
+ENDMODULE
+"""
+
+
+LITERAL = f"[[100,0,500],[0,0,1,0],[0,0,0,0],{UNSET}]"
+# Tool z points down (rotated 180 degrees about y)
+DECLARATIONS = {'p10': [[100.0, 0.0, 500.0], [0.0, 0.0, 1.0, 0.0], [0, 0, 0, 0], [9e9] * 6]}
+
+
+def test_compile_expression():
+    assert compile_expression('Offs(RelTool(p10,0,0,5\\Rz:=90),1,2,n)', {'n': 3.0}) == (
+        'p10', [(RELTOOL, [0.0, 0.0, 5.0, 0.0, 0.0, 90.0]), (OFFS, [1.0, 2.0, 3.0, 0.0, 0.0, 0.0])])
+    assert compile_expression('p10', {}) == ('p10', [])
+    assert compile_expression('Offs(p10,0,0,unknown)', {}) is None
+    assert compile_expression('CRobT(\\Tool:=tool0)', {}) is None
+    assert compile_expression('Offs(p10,0,0,1\\Rz:=90)', {}) is None
+
+
+def test_evaluate_targets():
+    texts = [LITERAL, 'p10', 'Offs(p10,10,-20,-n)', 'RelTool(p10,0,0,50)', 'RelTool(p10,0,0,0\\Rz:=180)',
+             'pMissing', 'Offs(pMissing,0,0,1)', '']
+    poses = evaluate_targets(texts, DECLARATIONS, {'n': 30.0})
+    assert poses.shape == (8, 17)
+    np.testing.assert_array_equal(poses[0], poses[1])
+    np.testing.assert_allclose(poses[2, 0:3], [110, -20, 470])
+    # RelTool moves along the tool z axis, which points down here
+    np.testing.assert_allclose(poses[3, 0:3], [100, 0, 450], atol=1e-9)
+    np.testing.assert_allclose(np.abs(poses[4, 3:7]), [0, 1, 0, 0], atol=1e-9)
+    assert np.isnan(poses[5:]).all()
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(rapid_expressions, '_resolved_files', {})
+
+
+def test_globals_of_other_modules_in_the_folder_resolve(tmp_path):
+    (tmp_path / 'Data.mod').write_text(data_module('Data', 300))
+    (tmp_path / 'Main.mod').write_text(MAIN)
+    _, poses = resolve_file(str(tmp_path / 'Main.mod'))
+    np.testing.assert_array_equal(poses[0, 0:3], [300, 0, 600])
+
+
+def test_a_changed_data_module_is_seen_by_a_cached_file(tmp_path):
+    (tmp_path / 'Data.mod').write_text(data_module('Data', 300))
+    (tmp_path / 'Main.mod').write_text(MAIN)
+    resolve_file(str(tmp_path / 'Main.mod'))
+    (tmp_path / 'Data.mod').write_text(data_module('Data', 400))
+    _, poses = resolve_file(str(tmp_path / 'Main.mod'))
+    np.testing.assert_array_equal(poses[0, 0:3], [400, 0, 600])
+
+
+def test_results_do_not_depend_on_files_resolved_before(tmp_path):
+    cell_a, cell_b = tmp_path / 'A', tmp_path / 'B'
+    cell_a.mkdir()
+    cell_b.mkdir()
+    (cell_a / 'Data.mod').write_text(data_module('Data', 300))
+    (cell_b / 'Main.mod').write_text(MAIN)
+    resolve_file(str(cell_a / 'Data.mod'))
+    # pBase of cell A is not visible from cell B
+    _, poses = resolve_file(str(cell_b / 'Main.mod'))
+    assert np.isnan(poses[0]).all()
@@ -0,0 +1,26 @@
+from rapid_references import ReferenceIndex
+
+DATA = """MODULE Data
+    CONST robtarget pHome:=[[500,0,600],[0,0,1,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];
+ENDMODULE
+"""
+
+
+def routine_module(name, uses):
+    body = ''.join("        MoveJ pHome, v1000, z50, tool0;\n" if use else "        WaitTime 1;\n" for use in uses)
+    return f"MODULE {name}\n    PROC main()\n{body}    ENDPROC\nENDMODULE\n"
+
+
+def test_find_usages_in_file_and_line_order(tmp_path):
+    (tmp_path / 'Data.mod').write_text(DATA)
+    (tmp_path / 'A.mod').write_text(routine_module('A', [True, False, True]))
+    (tmp_path / 'B.mod').write_text(routine_module('B', [True]))
+    index = ReferenceIndex()
+    index.update_directory(str(tmp_path))
+
+    # Re-scanning A appends its uses after those of B
+    (tmp_path / 'A.mod').write_text(routine_module('A', [False, True, True]))
+    assert index.update_files([str(tmp_path / 'A.mod')]) == [str(tmp_path / 'A.mod')]
+
+    usages = index.find_usages('PHOME')
+    assert [(reference.module, reference.line) for reference in usages] == [('A', 4), ('A', 5), ('B', 3)]
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+from rapid_snapshot import prune_snapshots, read_snapshot, snapshot_dir, source_digest, write_snapshot
+from robtarget_batch import RobtargetTable
+
+
+def make_table():
+    return RobtargetTable(['p1', 'p2'], ['', 'LOCAL CONST'], [[1, 2, 3], [4, 5, 6]],
+                          [[1, 0, 0, 0], [0, 1, 0, 0]], [[0, 0, 0, 0], [1, -1, 0, 1]],
+                          [[9e9] * 6, [1, 2, 3, 4, 5, 6]])
+
+
+def test_source_digest_is_the_same_for_text_and_bytes():
+    assert source_digest('MoveL p1;') == source_digest(b'MoveL p1;')
+    assert source_digest('MoveL p1;') != source_digest('MoveL p2;')
+
+
+def test_round_trip(tmp_path):
+    table = make_table()
+    write_snapshot('a.mod', 'digest', table, [(0, 10), (20, 30)], [3, 7], root=str(tmp_path))
+    loaded, offsets, lines = read_snapshot('a.mod', 'digest', root=str(tmp_path))
+    assert loaded.names == table.names
+    assert loaded.scopes == table.scopes
+    for column in ('positions', 'orientations', 'configs', 'external_axes'):
+        np.testing.assert_array_equal(getattr(loaded, column), getattr(table, column))
+    assert offsets.tolist() == [[0, 10], [20, 30]]
+    assert lines.tolist() == [3, 7]
+
+
+def test_stale_or_missing_snapshot_is_ignored(tmp_path):
+    write_snapshot('a.mod', 'old', make_table(), [(0, 1), (1, 2)], [1, 2], root=str(tmp_path))
+    assert read_snapshot('a.mod', 'new', root=str(tmp_path)) is None
+    assert read_snapshot('b.mod', 'old', root=str(tmp_path)) is None
+
+
+def test_empty_table(tmp_path):
+    write_snapshot('empty', 'digest', RobtargetTable(), [], [], root=str(tmp_path))
+    loaded, offsets, lines = read_snapshot('empty', 'digest', root=str(tmp_path))
+    assert len(loaded) == 0 and offsets.shape == (0, 2) and len(lines) == 0
+
+
+def test_prune_keeps_the_most_recently_used(tmp_path):
+    root = str(tmp_path)
+    for number in range(4):
+        write_snapshot(f"{number}.mod", 'digest', make_table(), [(0, 1), (1, 2)], [1, 2], root=root)
+        os.utime(snapshot_dir(f"{number}.mod", root), (number, number))
+    prune_snapshots(root, keep=2)
+    assert [read_snapshot(f"{number}.mod", 'digest', root=root) is not None for number in range(4)] == \
+        [False, False, True, True]
+
+
+def test_snapshot_of_another_parser_version_is_ignored(tmp_path):
+    root = str(tmp_path)
+    write_snapshot('a.mod', 'digest', make_table(), [(0, 1), (1, 2)], [1, 2], parser='moves/1', root=root)
+    assert read_snapshot('a.mod', 'digest', parser='moves/1', root=root) is not None
+    assert read_snapshot('a.mod', 'digest', parser='moves/2', root=root) is None
+    assert read_snapshot('a.mod', 'digest', root=root) is None
@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+from rapid_symbols import SymbolTable, declared_names, parse_aggregate, scan_declarations
+from robtarget_batch import RobtargetTable
+from target_pipeline import Pipeline
+
+MODULE = """MODULE Cell1
+    LOCAL CONST robtarget pHome:=[[500,0,600],[0,0,1,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];
+    PERS wobjdata wTable:=[FALSE,TRUE,"",[[1000,200,0],[1,0,0,0]],[[0,0,0],[1,0,0,0]]];
+    TASK PERS tooldata tGripper:=[TRUE,[[0,0,150],[1,0,0,0]],[2,[0,0,50],[1,0,0,0],0,0,0]];
+    CONST robtarget pLong:=[[1,2,3],[1,0,0,0],
+        [0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];
+    PROC main()
+        VAR robtarget pTemp;
+        MoveJ pHome, v1000, z50, tool0;
+    ENDPROC
+    FUNC num Twice(num x)
+        RETURN 2 * x;
+    ENDFUNC
+ENDMODULE
+"""
+
+
+def test_scan_declarations_fields():
+    module, symbols = scan_declarations(MODULE, 'cell1.mod')
+    assert module == 'Cell1'
+    by_name = {symbol.name: symbol for symbol in symbols}
+    assert set(by_name) == {'pHome', 'wTable', 'tGripper', 'pLong', 'pTemp'}
+
+    home = by_name['pHome']
+    assert (home.type, home.scope, home.storage, home.routine, home.first_line) == ('robtarget', 'LOCAL', 'CONST', '', 2)
+    start, end = home.value_span
+    assert MODULE[start:end] == home.value
+
+    assert by_name['tGripper'].scope == 'TASK'
+    assert by_name['wTable'].storage == 'PERS'
+    assert (by_name['pLong'].first_line, by_name['pLong'].last_line) == (5, 6)
+    assert by_name['pTemp'].routine == 'main'
+    assert by_name['pTemp'].value is None
+
+
+def test_module_name_defaults_to_file_name():
+    module, _ = scan_declarations('CONST robtarget p1:=[[0,0,0],[1,0,0,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];',
+                                  'C:/backup/Station.mod')
+    assert module == 'Station'
+
+
+def test_parse_aggregate():
+    assert parse_aggregate('[TRUE,[1,-2.5],"a b",name]') == [True, [1.0, -2.5], 'a b', 'name']
+    with pytest.raises(ValueError):
+        parse_aggregate('[1,2')
+
+
+def test_declared_names_include_routines_and_all_types():
+    assert declared_names(MODULE) >= {'phome', 'wtable', 'tgripper', 'plong', 'ptemp', 'main', 'twice'}
+
+
+def test_update_text_skips_unchanged_text():
+    table = SymbolTable()
+    assert table.update_text('a.mod', MODULE)
+    assert not table.update_text('a.mod', MODULE)
+    assert table.update_text('a.mod', MODULE.replace('pLong', 'pShort'))
+    assert table.lookup('plong') == []
+    assert [symbol.name for symbol in table.lookup('PSHORT')] == ['pShort']
+
+
+def test_lookup_respects_local_scope():
+    table = SymbolTable()
+    table.update_text('a.mod', MODULE)
+    table.update_text('b.mod', 'MODULE B\nENDMODULE\n')
+    assert table.lookup('pHome', key='a.mod')
+    assert table.lookup('pHome', key='b.mod') == []
+    assert [symbol.name for symbol in table.lookup('pLong', key='b.mod')] == ['pLong']
+
+
+def test_robtarget_table_skips_declarations_without_literal():
+    table = SymbolTable()
+    table.update_text('a.mod', MODULE)
+    targets, spans, lines = table.robtarget_table('a.mod')
+    assert targets.names == ['pHome', 'pLong']
+    assert lines == [2, 5]
+    assert targets.scopes == ['LOCAL CONST', 'CONST']
+    np.testing.assert_array_equal(targets.positions[1], [1, 2, 3])
+
+
+def test_frames():
+    table = SymbolTable()
+    table.update_text('a.mod', MODULE)
+    assert table.frames('wobjdata') == {'wTable': {'position': [1000.0, 200.0, 0.0],
+                                                   'orientation': [1.0, 0.0, 0.0, 0.0]}}
+    assert table.frames('tooldata')['tGripper']['position'] == [0.0, 0.0, 150.0]
+
+
+def test_declarations_without_storage_class():
+    table = SymbolTable()
+    table.update_text('paste', "robtarget p1:=[[1,0,0],[1,0,0,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];\n"
+                               "LOCAL robtarget p2 := [[2,0,0],[1,0,0,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];\n"
+                               "CONST robtarget p3:=[[3,0,0],[1,0,0,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];\n")
+    targets, _, _ = table.robtarget_table('paste')
+    assert targets.names == ['p1', 'p2', 'p3']
+    assert targets.scopes == ['', 'LOCAL', 'CONST']
+    assert [symbol.storage for symbol in table.symbols('paste')] == ['', '', 'CONST']
+    assert declared_names("robtarget p1:=[[1,0,0]];\nMoveL p9, v100, z10, tool0;") == {'p1'}
+
+
+def test_copy_results_output_pastes_back_in():
+    rng = np.random.default_rng(0)
+    orientations = rng.normal(size=(5, 4))
+    orientations /= np.linalg.norm(orientations, axis=1, keepdims=True)
+    table = RobtargetTable([f"p{number}" for number in range(5)], ['', 'LOCAL CONST', '', 'PERS', ''],
+                           rng.uniform(-1000, 1000, (5, 3)), orientations,
+                           rng.integers(-2, 3, (5, 4)), [[9e9] * 6] * 4 + [[10, 9e9, 9e9, 9e9, 9e9, 9e9]])
+    # What TargetConverterApp.copy_results puts on the clipboard
+    copied = "\n".join(line for lines in Pipeline.from_table(table).format(default_scope='') for line in lines)
+
+    symbols = SymbolTable()
+    symbols.update_text('paste', copied)
+    pasted, _, _ = symbols.robtarget_table('paste')
+
+    assert pasted.names == table.names
+    assert pasted.scopes == table.scopes
+    np.testing.assert_allclose(pasted.positions, table.positions, atol=0.005)
+    np.testing.assert_allclose(pasted.orientations, table.orientations, atol=5e-7)
+    np.testing.assert_array_equal(pasted.configs, table.configs)
+    np.testing.assert_array_equal(pasted.external_axes, table.external_axes)
+
+
+def test_literal_values_of_each_type():
+    table = SymbolTable()
+    table.update_text('a.mod', MODULE + """MODULE Extra
+    CONST num nLift:=125.5;
+    VAR num nCount;
+    CONST speeddata vGlue:=[120,200,5000,1000];
+    CONST zonedata zStop:=[TRUE,0,0,0,0,0,0];
+ENDMODULE
+""")
+    assert table.literal_values('num') == {'nLift': 125.5}
+    assert table.literal_values('speeddata') == {'vGlue': [120.0, 200.0, 5000.0, 1000.0]}
+    assert table.literal_values('zonedata')['zStop'][0] is True
+    robtargets = table.literal_values('robtarget')
+    assert set(robtargets) == {'pHome', 'pLong'}
+    assert robtargets['pLong'][0] == [1.0, 2.0, 3.0]
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from robot_kinematics import (ROBOT_MODELS, config_data, forward_kinematics, inverse_kinematics, matrix_to_rapid,
+                              quadrant, rapid_to_matrix, validate_targets)
+
+
+def random_joints(model, count, seed=1):
+    rng = np.random.default_rng(seed)
+    lower, upper = np.degrees(model.joint_limits[:, 0]), np.degrees(model.joint_limits[:, 1])
+    # Stay clear of the wrist singularity and of the +-180 wrap
+    joints = rng.uniform(np.maximum(lower, -170), np.minimum(upper, 170), size=(count, 6))
+    joints[:, 4] = np.where(np.abs(joints[:, 4]) < 5, 20.0, joints[:, 4])
+    return joints
+
+
+@pytest.mark.parametrize('name', list(ROBOT_MODELS))
+def test_inverse_kinematics_recovers_forward_kinematics(name):
+    model = ROBOT_MODELS[name]
+    joints = random_joints(model, 200)
+    positions, orientations = forward_kinematics(model, joints)
+    solutions = inverse_kinematics(model, positions, orientations)
+    assert solutions.shape == (200, 8, 6)
+
+    # Every solution that exists reaches the same flange pose
+    flat = solutions.reshape(-1, 6)
+    valid = ~np.isnan(flat).any(axis=1)
+    check_positions, check_orientations = forward_kinematics(model, flat[valid])
+    np.testing.assert_allclose(check_positions, np.repeat(positions, 8, axis=0)[valid], atol=1e-6)
+    dots = np.abs(np.sum(check_orientations * np.repeat(orientations, 8, axis=0)[valid], axis=1))
+    np.testing.assert_allclose(dots, 1.0, atol=1e-9)
+
+    # One of them is the joint set the pose came from
+    difference = np.abs((solutions - joints[:, None] + 180) % 360 - 180).max(axis=-1)
+    assert np.all(np.nanmin(difference, axis=1) < 1e-6)
+
+
+def test_validate_targets_keeps_consistent_configs():
+    model = ROBOT_MODELS['IRB 4600-60/2.05']
+    joints = random_joints(model, 100, seed=2)
+    positions, orientations = forward_kinematics(model, joints)
+    configs = config_data(model, joints)
+    result = validate_targets(model, positions, orientations, configs)
+    assert result['reachable'].all() and result['within_limits'].all() and result['config_ok'].all()
+    np.testing.assert_array_equal(result['configs'], configs)
+
+
+def test_validate_targets_rewrites_wrong_configs_and_flags_unreachable():
+    model = ROBOT_MODELS['IRB 2400-10']
+    joints = random_joints(model, 10, seed=3)
+    positions, orientations = forward_kinematics(model, joints)
+    positions = np.vstack([positions, [[9000.0, 0.0, 0.0]]])
+    orientations = np.vstack([orientations, [[1.0, 0.0, 0.0, 0.0]]])
+    configs = np.vstack([config_data(model, joints), [[0, 0, 0, 0]]])
+    wrong = configs.copy()
+    wrong[:10, 0] += 2
+
+    result = validate_targets(model, positions, orientations, wrong)
+    assert result['reachable'].tolist() == [True] * 10 + [False]
+    assert not result['config_ok'][:10].any()
+    np.testing.assert_array_equal(result['configs'][:10], configs[:10])
+    # An unreachable target keeps the config it had
+    np.testing.assert_array_equal(result['configs'][10], wrong[10])
+    assert np.isnan(result['joints'][10]).all()
+
+
+def test_validate_targets_with_a_tool():
+    model = ROBOT_MODELS['IRB 6700-200/2.60']
+    joints = random_joints(model, 50, seed=4)
+    flange_positions, flange_orientations = forward_kinematics(model, joints)
+    tool = {'position': [0.0, 50.0, 250.0], 'orientation': [0.9238795, 0.0, 0.3826834, 0.0]}
+    # TCP pose = flange pose * tool frame
+    flange = rapid_to_matrix(flange_orientations)
+    tcp_positions = flange_positions + flange @ np.array(tool['position'])
+    tcp_matrices = flange @ rapid_to_matrix(tool['orientation'])[0]
+    result = validate_targets(model, tcp_positions, matrix_to_rapid(tcp_matrices), config_data(model, joints),
+                              tool=tool)
+    assert result['config_ok'].all()
+
+
+def test_quadrant():
+    assert quadrant([0, 89.9, 90, -0.1, -90, -90.1, 180]).tolist() == [0, 0, 1, -1, -1, -2, 2]
@@ -0,0 +1,113 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from robtarget_batch import (EXTERNAL_AXIS_UNSET, RobtargetTable, format_pose, parse_literal_block,
+                             parse_robtarget_literal, quaternion_multiply, transform_robtargets)
+from Target_converter import transform_robtarget
+
+LITERAL = '[[100.5,-20,3.25],[0.707107,0,0.707107,0],[0,-1,2,1],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]]'
+
+
+def random_quaternions(rng, count):
+    quaternions = rng.normal(size=(count, 4))
+    return quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+
+
+def test_parse_robtarget_literal():
+    pos, ori, cfg, ext = parse_robtarget_literal(LITERAL)
+    assert pos == [100.5, -20.0, 3.25]
+    assert ori == [0.707107, 0.0, 0.707107, 0.0]
+    assert cfg == [0, -1, 2, 1]
+    assert ext == [9e9] * 6
+
+
+def test_parse_literal_block_matches_row_parser():
+    other = '[[1,2,3],[1,0,0,0],[1,1,1,1],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]]'
+    block = parse_literal_block([LITERAL, other])
+    assert block.shape == (2, 17)
+    for row, literal in zip(block, [LITERAL, other]):
+        expected = [value for part in parse_robtarget_literal(literal) for value in part]
+        np.testing.assert_array_equal(row, expected)
+
+
+def test_parse_literal_block_rejects_irregular_literals():
+    assert parse_literal_block([LITERAL, '[[1,2,3],[1,0,0,0],[0,0,0,0],[9E+09]]']) is None
+    assert parse_literal_block([LITERAL, '[[Offs(p1,0,0,10)]]']) is None
+    assert parse_literal_block([]).shape == (0, 17)
+
+
+def test_table_from_records_pads_external_axes():
+    table = RobtargetTable.from_records([('p1', 'LOCAL CONST', [[1, 2, 3], [1, 0, 0, 0], [0, 0, 0, 0], [5.0]])])
+    assert len(table) == 1
+    assert table.index_of('p1') == 0
+    assert table.index_of('p2') is None
+    assert table.external_axes[0].tolist() == [5.0] + [EXTERNAL_AXIS_UNSET] * 5
+    assert table.row(0)[0] == [1.0, 2.0, 3.0]
+
+
+def test_table_take_keeps_order_and_names():
+    table = RobtargetTable(['a', 'b', 'c'], None, [[0, 0, 0], [1, 1, 1], [2, 2, 2]])
+    taken = table.take([2, 0])
+    assert taken.names == ['c', 'a']
+    assert taken.positions[:, 0].tolist() == [2.0, 0.0]
+    assert 'b' not in taken and 'c' in taken
+
+
+def test_table_pickle_rebuilds_name_index():
+    table = RobtargetTable(['a', 'b'], ['', 'LOCAL'], [[0, 0, 0], [1, 2, 3]])
+    restored = pickle.loads(pickle.dumps(table))
+    assert restored.index_of('b') == 1
+    assert restored.scopes == ['', 'LOCAL']
+    np.testing.assert_array_equal(restored.positions, table.positions)
+    assert table.nbytes() >= table.positions.nbytes
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_transform_robtargets_matches_single_target_transform(seed):
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(-2000, 2000, (20, 3))
+    orientations = random_quaternions(rng, 20)
+    frames = [{'position': rng.uniform(-500, 500, 3).tolist(), 'orientation': q.tolist()}
+              for q in random_quaternions(rng, 2)]
+
+    new_positions, new_orientations = transform_robtargets(positions, orientations, *frames)
+
+    for position, orientation, new_position, new_orientation in zip(positions, orientations,
+                                                                     new_positions, new_orientations):
+        expected = transform_robtarget([position, orientation, [0, 0, 0, 0], [9e9] * 6], *frames)
+        np.testing.assert_allclose(new_position, expected[0], atol=1e-9)
+        # q and -q are the same rotation
+        sign = np.sign(np.dot(new_orientation, expected[1]))
+        np.testing.assert_allclose(new_orientation, sign * np.asarray(expected[1]), atol=1e-9)
+
+
+def test_transform_robtargets_round_trip():
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(-1000, 1000, (50, 3))
+    orientations = random_quaternions(rng, 50)
+    frame_a = {'position': [100, -50, 20], 'orientation': random_quaternions(rng, 1)[0].tolist()}
+    frame_b = {'position': [0, 0, 0], 'orientation': [0, 0, 0, 1]}
+    there = transform_robtargets(positions, orientations, frame_a, frame_b)
+    back_positions, back_orientations = transform_robtargets(*there, frame_b, frame_a)
+    np.testing.assert_allclose(back_positions, positions, atol=1e-9)
+    np.testing.assert_allclose(np.abs(np.sum(back_orientations * orientations, axis=1)), 1.0, atol=1e-9)
+
+
+def test_transform_robtargets_empty():
+    positions, orientations = transform_robtargets(np.empty((0, 3)), np.empty((0, 4)),
+                                                   {'position': [0, 0, 0], 'orientation': [0, 0, 0, 1]},
+                                                   {'position': [1, 0, 0], 'orientation': [0, 0, 0, 1]})
+    assert positions.shape == (0, 3) and orientations.shape == (0, 4)
+
+
+def test_quaternion_multiply_identity_and_normalization():
+    quaternion = np.array([[0.0, 0.0, 2.0, 0.0]])
+    np.testing.assert_allclose(quaternion_multiply([0, 0, 0, 1], quaternion), [[0, 0, 1, 0]])
+
+
+def test_format_pose_writes_unset_axes_as_9e09():
+    text = format_pose([1, 2, 3], [1, 0, 0, 0], [0, -1, 0, 1], [9e9, 10, 9e9, 9e9, 9e9, 9e9])
+    assert text == ('[[1.00, 2.00, 3.00], [1.000000, 0.000000, 0.000000, 0.000000], [0, -1, 0, 1], '
+                    '[9E+09, 10.00, 9E+09, 9E+09, 9E+09, 9E+09]]')
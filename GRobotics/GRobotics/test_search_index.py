@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from search_index import BackgroundIndexer, SearchIndex
+
+WELD = """MODULE Weld
+    CONST robtarget pWeldStart:=[[0,0,0],[1,0,0,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];
+    PROC weld_seam()
+        MoveL pWeldStart, v100, fine, tool0;
+        SetDO doWeld, 1;
+    ENDPROC
+ENDMODULE
+"""
+
+GRIP = """MODULE Grip
+    PROC grip_part()
+        SetDO doGrip, 1;
+        MoveL pWeldStart, v100, fine, tool0;
+    ENDPROC
+ENDMODULE
+"""
+
+
+@pytest.fixture
+def cell(tmp_path):
+    (tmp_path / 'Weld.mod').write_text(WELD)
+    (tmp_path / 'Grip.mod').write_text(GRIP)
+    (tmp_path / 'notes.txt').write_text('SetDO doWeld')
+    return tmp_path
+
+
+@pytest.fixture
+def index(cell):
+    index = SearchIndex()
+    index.update_directory(str(cell))
+    return index
+
+
+def places(hits):
+    return [(os.path.basename(hit.path), hit.line, hit.kind) for hit in hits]
+
+
+def test_words_are_and_ed_on_the_same_line(index):
+    hits, total = index.search('setdo doweld')
+    assert total == 1 and places(hits) == [('Weld.mod', 5, '')]
+    assert hits[0].text == 'SetDO doWeld, 1;'
+    assert index.search('setdo pweldstart')[1] == 0
+
+
+def test_prefix_and_limit(index):
+    hits, total = index.search('do*', limit=1)
+    assert total == 2 and len(hits) == 1
+    assert sorted(places(index.search('MoveL pWeld*')[0])) == [('Grip.mod', 4, ''), ('Weld.mod', 4, '')]
+
+
+def test_kind_terms_return_declarations(index):
+    assert places(index.search('kind:proc')[0]) == [('Grip.mod', 2, 'proc'), ('Weld.mod', 3, 'proc')]
+    assert places(index.search('pweld* kind:robtarget')[0]) == [('Weld.mod', 2, 'robtarget')]
+    assert index.search('grip* kind:robtarget')[1] == 0
+
+
+def test_regular_expressions(index):
+    assert places(index.search('re:^do(weld|grip)$')[0]) == [('Grip.mod', 3, ''), ('Weld.mod', 5, '')]
+    assert places(index.search('setdo re:grip')[0]) == [('Grip.mod', 3, '')]
+    with pytest.raises(ValueError):
+        index.search('re:(')
+
+
+def test_only_changed_files_are_reindexed(index, cell):
+    assert index.update_directory(str(cell)) == []
+    (cell / 'Grip.mod').write_text(GRIP.replace('doGrip', 'doVacuum'))
+    (cell / 'Weld.mod').unlink()
+    changed = index.update_directory(str(cell))
+    assert sorted(os.path.basename(path) for path in changed) == ['Grip.mod', 'Weld.mod']
+    assert len(index) == 1
+    assert index.search('dogrip')[1] == 0 and index.search('dovacuum')[1] == 1
+    assert index.search('kind:robtarget')[1] == 0
+
+
+def test_background_indexer(cell):
+    indexer = BackgroundIndexer()
+    indexer.submit(str(cell))
+    indexer.submit(str(cell / 'Missing.mod'))
+    assert indexer.wait(timeout=10)
+    assert not indexer.busy() and indexer.errors == []
+    assert len(indexer.index) == 2
+    indexer.stop()
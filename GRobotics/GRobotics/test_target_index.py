@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from robtarget_batch import RobtargetTable
+from target_index import TargetIndex
+
+
+def sample_table(count=200):
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(-1000, 1000, (count, 3))
+    configs = rng.integers(-1, 2, (count, 4)).astype(np.int32)
+    names = [f"{'pPick' if i % 3 == 0 else 'pPlace'}{i}" for i in range(count)]
+    return RobtargetTable(names, None, positions, np.tile([1.0, 0, 0, 0], (count, 1)), configs, None)
+
+
+def test_in_box_matches_brute_force():
+    table = sample_table()
+    lower, upper = np.array([-200, -500, 0]), np.array([600, 300, 900])
+    expected = np.flatnonzero(np.all((table.positions >= lower) & (table.positions <= upper), axis=1))
+    np.testing.assert_array_equal(TargetIndex(table).in_box(lower, upper), expected)
+    # Corners given in either order describe the same box
+    np.testing.assert_array_equal(TargetIndex(table).in_box(upper, lower), expected)
+
+
+def test_within_and_nearest_match_brute_force():
+    table = sample_table()
+    index = TargetIndex(table)
+    point = np.array([100.0, -50.0, 20.0])
+    distances = np.linalg.norm(table.positions - point, axis=1)
+    np.testing.assert_array_equal(index.within(point, 400), np.flatnonzero(distances <= 400))
+    np.testing.assert_array_equal(index.nearest(point, 5), np.argsort(distances)[:5])
+    assert len(index.nearest(point, 1000)) == len(table)
+
+
+def test_config_and_name_prefix():
+    table = sample_table()
+    index = TargetIndex(table)
+    np.testing.assert_array_equal(index.with_config('cf4', 1), np.flatnonzero(table.configs[:, 1] == 1))
+    assert len(index.with_config('cf1', 7)) == 0
+    rows = index.with_prefix('ppick')
+    assert list(rows) == sorted(rows)
+    assert {table.names[i] for i in rows} == {name for name in table.names if name.startswith('pPick')}
+
+
+def test_query_ands_its_terms():
+    table = sample_table()
+    index = TargetIndex(table)
+    both = index.query('box:-1000,-1000,-1000,0,1000,1000 cf1=0 name:pPlace')
+    for row in both:
+        assert table.positions[row, 0] <= 0 and table.configs[row, 0] == 0
+        assert table.names[row].startswith('pPlace')
+    assert set(both) == (set(index.in_box(np.array([-1000, -1000, -1000]), np.array([0, 1000, 1000])))
+                         & set(index.with_config('cf1', 0)) & set(index.with_prefix('pPlace')))
+    np.testing.assert_array_equal(index.query(''), np.arange(len(table)))
+    # A bare word is a name prefix
+    np.testing.assert_array_equal(index.query('pPick'), index.with_prefix('pPick'))
+
+
+@pytest.mark.parametrize('query', ['box:1,2,3', 'near:a,b,c', 'within:0,0,0', 'spin:1,2,3'])
+def test_malformed_terms_raise(query):
+    with pytest.raises(ValueError):
+        TargetIndex(sample_table(10)).query(query)
+
+
+def test_empty_table():
+    index = TargetIndex(RobtargetTable())
+    assert len(index.query('near:0,0,0,3 cf1=0')) == 0
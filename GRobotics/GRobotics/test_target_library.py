@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from robtarget_batch import RobtargetTable
+from target_library import TargetLibrary
+
+
+def table_of(names, positions):
+    count = len(names)
+    orientations = np.tile([0.0, 0.0, 1.0, 0.0], (count, 1))
+    configs = np.tile([0, -1, 2, 1], (count, 1)).astype(np.int32)
+    return RobtargetTable(names, ['CONST'] * count, positions, orientations, configs, None)
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = TargetLibrary(str(tmp_path / 'library.db'))
+    yield library
+    library.close()
+
+
+def test_robtargets_round_trip(library):
+    table = table_of(['p1', 'p2'], [[1, 2, 3], [4.5, -5, 6]])
+    library.save_robtargets('Cell', table, module='Part')
+    loaded = library.load_robtargets('Cell', 'Part')
+    assert loaded.names == ['p1', 'p2'] and loaded.scopes == ['CONST', 'CONST']
+    np.testing.assert_array_equal(loaded.positions, table.positions)
+    np.testing.assert_array_equal(loaded.orientations, table.orientations)
+    np.testing.assert_array_equal(loaded.configs, table.configs)
+    np.testing.assert_array_equal(loaded.external_axes, table.external_axes)
+    assert library.cells() == ['Cell'] and library.modules('Cell') == ['Part']
+
+
+def test_saving_again_replaces_targets_and_their_spatial_entries(library):
+    library.save_robtargets('Cell', table_of(['p1', 'p2'], [[0, 0, 0], [100, 0, 0]]), module='Part')
+    library.save_robtargets('Cell', table_of(['p1'], [[500, 500, 500]]), module='Part')
+    assert len(library.load_robtargets('Cell')) == 2
+    assert library.in_box('Cell', np.array([-10, -10, -10]), np.array([10, 10, 10])).names == []
+    assert library.in_box('Cell', np.array([490, 490, 490]), np.array([510, 510, 510])).names == ['p1']
+
+
+def test_find_and_in_box_stay_inside_a_cell(library):
+    library.save_robtargets('A', table_of(['p1', 'p2'], [[0, 0, 0], [50, 50, 50]]), module='M1')
+    library.save_robtargets('A', table_of(['p1'], [[20, 20, 20]]), module='M2')
+    library.save_robtargets('B', table_of(['p1'], [[10, 10, 10]]), module='M1')
+    assert len(library.find('A', 'p1')) == 2
+    assert library.in_box('A', np.array([60, 60, 60]), np.array([-1, -1, -1])).names == ['p1', 'p2', 'p1']
+    assert library.in_box('B', np.array([0, 0, 0]), np.array([30, 30, 30])).names == ['p1']
+
+
+def test_frames_round_trip(library):
+    frames = {'wTable': {'position': [1000.0, 200.0, 0.0], 'orientation': [1.0, 0.0, 0.0, 0.0]}}
+    library.save_frames('Cell', frames)
+    assert library.load_frames('Cell') == frames
+    assert library.load_frames('Cell', 'tooldata') == {}
+    with pytest.raises(ValueError):
+        library.save_frames('Cell', frames, kind='loaddata')
+
+
+def test_delete_cell(library):
+    library.save_robtargets('Cell', table_of(['p1'], [[0, 0, 0]]))
+    library.delete_cell('Cell')
+    assert library.cells() == []
+    assert len(library.load_robtargets('Cell')) == 0
+    assert library.connection.execute("SELECT COUNT(*) FROM robtargets_rtree").fetchone()[0] == 0
@@ -0,0 +1,47 @@
+from rapid_symbols import SymbolTable, declared_names
+from target_naming import TargetNamer, pose_keys
+
+UNSET = '[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]'
+
+
+def literal(x, extra=''):
+    return f"[[{x},0,500],[0,0,1,0],[0,0,0,0],{UNSET}]{extra}"
+
+
+def namer_for(text, **options):
+    symbols = SymbolTable()
+    symbols.update_text('Part.mod', text)
+    return TargetNamer(symbols, 'Part.mod', **options)
+
+
+def test_pose_keys_ignore_how_a_pose_is_written():
+    keys = pose_keys([literal(100), literal('100.0000001'), literal('1E2'),
+                      f"[ [100, 0, 500], [-0, 0, 1, 0], [0,0,0,0], {UNSET} ]", literal(101), literal('nX')])
+    assert keys[0] == keys[1] == keys[2] == keys[3]
+    assert keys[4] != keys[0]
+    assert keys[5] is None
+
+
+def test_new_names_skip_every_declared_name_whatever_its_case():
+    text = """MODULE Part
+    CONST robtarget P_10:=[[0,0,0],[1,0,0,0],[0,0,0,0],[9E+09,9E+09,9E+09,9E+09,9E+09,9E+09]];
+    PERS num p_20:=1;
+    PROC p_30()
+    ENDPROC
+ENDMODULE
+"""
+    # Routines are reserved the way the parser tool does it
+    namer = namer_for(text, reserved=declared_names(text) | {'p_50'})
+    assert [namer.allocate() for _ in range(3)] == ['p_40', 'p_60', 'p_70']
+
+
+def test_assign_reuses_declared_and_earlier_names_for_equal_poses():
+    namer = namer_for(f"""MODULE Part
+    CONST robtarget pHome:={literal(100)};
+    PROC main()
+        VAR robtarget pLocal:={literal(200)};
+    ENDPROC
+ENDMODULE
+""", base_name='pt', start=1, step=1)
+    assert namer.assign([literal('100.0'), literal(200), literal(300), literal('3E2'), literal('nX'), literal('nX')]) == [
+        ('pHome', False), ('pt1', True), ('pt2', True), ('pt2', False), ('pt3', True), ('pt4', True)]
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from robtarget_batch import RobtargetTable
+from target_index import TargetIndex
+from target_pipeline import Pipeline
+
+
+def grid_table(count=50):
+    rng = np.random.default_rng(7)
+    positions = rng.uniform(-1000, 1000, (count, 3))
+    orientations = np.tile([1.0, 0.0, 0.0, 0.0], (count, 1))
+    configs = np.zeros((count, 4), dtype=np.int32)
+    configs[::2, 0] = 1
+    return RobtargetTable([f"p{i}" for i in range(count)], None, positions, orientations, configs, None)
+
+
+@pytest.mark.parametrize('query', ['near:0,0,0,5', 'near:100,-200,50,7 cf1=1', 'cf1=0 near:0,0,0,4'])
+def test_near_is_over_the_whole_source(query):
+    table = grid_table()
+    expected = table.take(TargetIndex(table).query(query))
+    filtered = Pipeline.from_table(table, chunk_size=8).filter(query).tables()
+    assert sorted(filtered.names) == sorted(expected.names)
+
+
+def test_near_hits_come_out_closest_first():
+    table = grid_table()
+    filtered = Pipeline.from_table(table, chunk_size=8).filter('near:0,0,0,6').tables()
+    distances = np.linalg.norm(filtered.positions, axis=1)
+    assert len(filtered) == 6
+    assert np.all(np.diff(distances) >= 0)
+
+
+def test_other_queries_still_stream_per_chunk():
+    table = grid_table()
+    filtered = Pipeline.from_table(table, chunk_size=8).filter('box:-500,-500,-500,500,500,500').tables()
+    assert filtered.names == [table.names[i] for i in TargetIndex(table).query('box:-500,-500,-500,500,500,500')]
+
+
+def test_two_near_terms_are_rejected():
+    with pytest.raises(ValueError):
+        Pipeline.from_table(grid_table(), chunk_size=8).filter('near:0,0,0,2 near:1,1,1,2').run()
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+import tool_lifecycle
+from tool_lifecycle import ToolManager, default_budget
+
+MB = 1024 * 1024
+
+
+class FakeTool:
+    """Stands in for a tool widget: holds rows, reports their size and saves them on eviction."""
+
+    def __init__(self, size=0):
+        self.rows = []
+        self.size = size
+        self.closed = self.deleted = False
+
+    def memory_usage(self):
+        return self.size
+
+    def snapshot_state(self):
+        return {'rows': self.rows, 'size': self.size}
+
+    def restore_state(self, state):
+        self.rows = state['rows']
+        self.size = state['size']
+
+    def close(self):
+        self.closed = True
+
+    def deleteLater(self):
+        self.deleted = True
+
+
+class PlainTool(FakeTool):
+    snapshot_state = None
+
+
+def manager_of(tmp_path, budget, **factories):
+    return ToolManager(factories, budget=budget, state_dir=str(tmp_path / 'state'))
+
+
+def test_closed_tools_are_evicted_least_recently_used_first(tmp_path):
+    manager = manager_of(tmp_path, 300 * MB, **{name: (lambda: FakeTool(100 * MB)) for name in 'abc'})
+    tools = {name: manager.get(name) for name in 'abc'}
+    manager.opened('c')
+    manager.get('a')
+    # a was used after b, and c is open, so only b has to go
+    manager.set_budget(250 * MB)
+    assert manager.enforce_budget() == 200 * MB
+    assert manager.evicted() == ['b'] and 'b' not in manager and manager.evictions == 1
+    assert tools['b'].closed and tools['b'].deleted
+    assert manager.peek('b') is None
+
+
+def test_an_evicted_tool_comes_back_with_its_state(tmp_path):
+    manager = manager_of(tmp_path, 0, parser=lambda: FakeTool(10 * MB))
+    manager.get('parser').rows = [1, 2, 3]
+    manager.closed('parser')
+    assert manager.evicted() == ['parser']
+    assert len(os.listdir(tmp_path / 'state')) == 1
+
+    manager.opened('parser')
+    tool = manager.get('parser')
+    assert tool.rows == [1, 2, 3] and not tool.closed
+    assert manager.evicted() == [] and os.listdir(tmp_path / 'state') == []
+
+
+def test_open_unmeasured_and_unsnapshottable_tools_stay(tmp_path):
+    manager = manager_of(tmp_path, 0, open=lambda: FakeTool(MB), idle=lambda: FakeTool(0), plain=lambda: PlainTool(MB))
+    for name in ('open', 'idle', 'plain'):
+        manager.get(name)
+    manager.opened('open')
+    assert manager.enforce_budget() == 2 * MB
+    assert manager.evicted() == [] and manager.evictions == 0
+
+
+def test_a_failed_snapshot_keeps_the_tool_loaded(tmp_path):
+    class Unpicklable(FakeTool):
+        def snapshot_state(self):
+            return lambda: None
+
+    manager = manager_of(tmp_path, 0, tool=lambda: Unpicklable(MB))
+    tool = manager.get('tool')
+    assert not manager.evict('tool')
+    assert manager.peek('tool') is tool and not tool.closed
+    assert os.listdir(tmp_path / 'state') == []
+
+
+def test_discard_snapshots(tmp_path):
+    manager = manager_of(tmp_path, MB, tool=lambda: FakeTool(2 * MB))
+    manager.get('tool')
+    manager.set_budget(0)
+    manager.discard_snapshots()
+    assert manager.evicted() == [] and os.listdir(tmp_path / 'state') == []
+    assert manager.get('tool').rows == []
+
+
+@pytest.mark.parametrize('value, budget', [(None, 512 * MB), ('2048', 2048 * MB), ('lots', 512 * MB)])
+def test_default_budget(monkeypatch, value, budget):
+    if value is None:
+        monkeypatch.delenv(tool_lifecycle.BUDGET_ENV, raising=False)
+    else:
+        monkeypatch.setenv(tool_lifecycle.BUDGET_ENV, value)
+    assert default_budget() == budget
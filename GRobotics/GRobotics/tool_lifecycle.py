@@ -0,0 +1,147 @@
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+
+from app_logging import get_logger
+
+logger = get_logger('tools')
+
+# Estimated memory all tools together may hold before closed ones are evicted
+DEFAULT_MEMORY_BUDGET_MB = 512
+# Overrides the default budget, e.g. GROBOTICS_TOOL_BUDGET_MB=2048
+BUDGET_ENV = 'GROBOTICS_TOOL_BUDGET_MB'
+STATE_DIR = os.path.join(os.path.expanduser('~'), '.grobotics', 'tool_state')
+
+
+def default_budget():
+    """The memory budget in bytes, from BUDGET_ENV if it is set to a number."""
+    try:
+        megabytes = int(os.environ.get(BUDGET_ENV, DEFAULT_MEMORY_BUDGET_MB))
+    except ValueError:
+        megabytes = DEFAULT_MEMORY_BUDGET_MB
+    return megabytes * 1024 * 1024
+
+
+class ToolManager:
+    """Creates tools on first use and evicts closed ones when their memory exceeds a budget.
+
+    A tool can be evicted if it has snapshot_state() and restore_state(state); its
+    memory_usage() estimate, in bytes, counts towards the budget. When the estimates of
+    all live tools exceed the budget, tools whose tab is closed are pickled to a snapshot
+    file and destroyed, least recently used first. get() rebuilds an evicted tool from
+    its snapshot, so reopening its tab shows the same data.
+    """
+
+    def __init__(self, factories, budget=None, state_dir=STATE_DIR):
+        self.factories = factories  # tool name -> callable creating the tool
+        self.budget = default_budget() if budget is None else budget
+        self.state_dir = state_dir
+        self.evictions = 0
+        self._live = OrderedDict()  # tool name -> instance, least recently used first
+        self._open = set()          # tools shown in a tab or detached window
+        self._snapshots = {}        # tool name -> snapshot file of an evicted tool
+
+    def __contains__(self, name):
+        return name in self._live
+
+    def get(self, name):
+        """Returns the tool, creating or restoring it if needed, and marks it as just used."""
+        tool = self._live.get(name)
+        if tool is None:
+            tool = self._live[name] = self.factories[name]()
+            path = self._snapshots.pop(name, None)
+            if path is not None:
+                self._restore(name, tool, path)
+        self._live.move_to_end(name)
+        return tool
+
+    def peek(self, name):
+        """The live tool, or None; never creates or restores one."""
+        return self._live.get(name)
+
+    def items(self):
+        return list(self._live.items())
+
+    def evicted(self):
+        return list(self._snapshots)
+
+    def opened(self, name):
+        self._open.add(name)
+        if name in self._live:
+            self._live.move_to_end(name)
+        self.enforce_budget()
+
+    def closed(self, name):
+        self._open.discard(name)
+        self.enforce_budget()
+
+    def memory_usage(self, name):
+        tool = self._live.get(name)
+        usage = getattr(tool, 'memory_usage', None)
+        return usage() if usage is not None else 0
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.enforce_budget()
+
+    def enforce_budget(self):
+        """Evicts closed tools, least recently used first, until the estimate fits the budget.
+
+        Returns the estimated bytes the live tools hold afterwards.
+        """
+        usage = {name: self.memory_usage(name) for name in self._live}
+        total = sum(usage.values())
+        for name in list(self._live):
+            if total <= self.budget:
+                break
+            if name in self._open or not usage[name]:
+                continue
+            if self.evict(name):
+                total -= usage[name]
+        return total
+
+    def evict(self, name):
+        """Pickles a tool's state to a snapshot file and destroys the tool; False if it cannot be."""
+        tool = self._live.get(name)
+        if tool is None or not hasattr(tool, 'snapshot_state'):
+            return False
+        os.makedirs(self.state_dir, exist_ok=True)
+        handle, path = tempfile.mkstemp(prefix='tool_', suffix='.pickle', dir=self.state_dir)
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump(tool.snapshot_state(), file, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            os.remove(path)
+            logger.error(f"Could not snapshot {name}, keeping it loaded: {e}")
+            return False
+        usage = self.memory_usage(name)
+        del self._live[name]
+        self._snapshots[name] = path
+        self.evictions += 1
+        tool.close()
+        tool.deleteLater()
+        logger.info(f"Released {name} (~{usage / 1e6:.1f} MB) to a {os.path.getsize(path) / 1e6:.1f} MB snapshot")
+        return True
+
+    def _restore(self, name, tool, path):
+        try:
+            with open(path, 'rb') as file:
+                tool.restore_state(pickle.load(file))
+            logger.info(f"Restored {name} from its snapshot")
+        except Exception as e:
+            logger.error(f"Could not restore {name}, it starts empty: {e}")
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def discard_snapshots(self):
+        """Deletes the snapshot files of evicted tools, e.g. when the application exits."""
+        for path in self._snapshots.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._snapshots.clear()
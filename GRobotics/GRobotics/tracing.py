@@ -0,0 +1,144 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+# Set to a file path to trace the whole session and write the timeline there on exit
+TRACE_ENV = 'GROBOTICS_TRACE'
+# Events kept in memory; the oldest are dropped first
+MAX_EVENTS = 1000000
+# A counter adds a sample to the timeline at most this often (in microseconds)
+COUNTER_SAMPLE_INTERVAL_US = 10000
+
+_enabled = False
+_events = deque(maxlen=MAX_EVENTS)  # Chrome trace event dicts
+_counters = {}
+_counter_samples = {}  # counter -> time of its last timeline sample
+_thread_names = {}
+_lock = threading.Lock()
+_NULL_SPAN = nullcontext()
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def clear():
+    with _lock:
+        _events.clear()
+        _counters.clear()
+        _counter_samples.clear()
+
+
+def _now():
+    return time.perf_counter_ns() // 1000
+
+
+def _thread_id():
+    thread = threading.current_thread()
+    if thread.ident not in _thread_names:
+        _thread_names[thread.ident] = thread.name
+    return thread.ident
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now()
+        return self
+
+    def __exit__(self, *exc_info):
+        event = {'name': self.name, 'ph': 'X', 'ts': self.start, 'dur': _now() - self.start,
+                 'pid': os.getpid(), 'tid': _thread_id()}
+        if self.args:
+            event['args'] = self.args
+        _events.append(event)
+        return False
+
+
+def span(name, /, **args):
+    """Context manager timing a block as a named span; a shared no-op when tracing is off."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name=None):
+    """Decorator running a function inside a span named after it."""
+    def decorate(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(span_name, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def event(name, /, **args):
+    """Records an instant event, e.g. a state change worth seeing on the timeline."""
+    if not _enabled:
+        return
+    _events.append({'name': name, 'ph': 'i', 's': 't', 'ts': _now(), 'pid': os.getpid(),
+                    'tid': _thread_id(), 'args': args})
+
+
+def count(name, value=1):
+    """Adds to a named counter; the timeline gets a sample at most every COUNTER_SAMPLE_INTERVAL_US."""
+    if not _enabled:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + value
+        now = _now()
+        if now - _counter_samples.get(name, -COUNTER_SAMPLE_INTERVAL_US) >= COUNTER_SAMPLE_INTERVAL_US:
+            _counter_samples[name] = now
+            _events.append({'name': name, 'ph': 'C', 'ts': now, 'pid': os.getpid(), 'args': {'value': total}})
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def dump(path):
+    """Writes the recorded timeline as Chrome trace JSON (chrome://tracing, Perfetto); returns the event count."""
+    pid = os.getpid()
+    now = _now()
+    with _lock:
+        events = list(_events)
+        # A final sample per counter, so every total shows up even if it was not sampled lately
+        events.extend({'name': name, 'ph': 'C', 'ts': now, 'pid': pid, 'args': {'value': total}}
+                      for name, total in _counters.items())
+    events.extend({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': ident, 'args': {'name': thread_name}}
+                  for ident, thread_name in list(_thread_names.items()))
+    with open(path, 'w') as file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                   'otherData': {'counters': counters()}}, file)
+    return len(events)
+
+
+if os.environ.get(TRACE_ENV):
+    enable()
+    atexit.register(dump, os.environ[TRACE_ENV])